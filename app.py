@@ -288,16 +288,18 @@ def split_html_into_pages(html_content, num_pages, doc=None, pdf_path=None):
 
     return pages
 
-def split_json_into_pages(json_str, num_pages, doc=None, pdf_path=None, html_content=None):
+def split_json_into_pages(json_str, num_pages, doc=None, pdf_path=None, html_content=None, json_obj=None):
     """
     Split JSON content based on DOCX page boundaries if available,
     fall back to PDF, then equal division.
+    Pass the already simplified document as json_obj to avoid re-parsing json_str.
     """
     if num_pages <= 1:
         return [json_str]
 
     try:
-        json_obj = json.loads(json_str)
+        if json_obj is None:
+            json_obj = json.loads(json_str)
 
         # Navigate to the body VALUE array
         if isinstance(json_obj, dict) and 'VALUE' in json_obj:
@@ -527,10 +529,10 @@ def upload_file():
 
                 if pdf_created_successfully and pdf_path and os.path.exists(pdf_path):
                     html_pages = split_html_into_pages(html_content, num_pages, doc=doc, pdf_path=pdf_path)
-                    json_pages = split_json_into_pages(json_str, num_pages, doc=doc, pdf_path=pdf_path, html_content=html_content)
+                    json_pages = split_json_into_pages(json_str, num_pages, doc=doc, pdf_path=pdf_path, html_content=html_content, json_obj=simplified_json)
                 else:
                     html_pages = split_html_into_pages(html_content, num_pages, doc=doc)
-                    json_pages = split_json_into_pages(json_str, num_pages, doc=doc, html_content=html_content)
+                    json_pages = split_json_into_pages(json_str, num_pages, doc=doc, html_content=html_content, json_obj=simplified_json)
 
                 # Now clean up PDF and uploaded file
                 if pdf_path and os.path.exists(pdf_path):
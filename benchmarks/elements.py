@@ -0,0 +1,77 @@
+"""
+Benchmark: memory and time per element object created while iterating over a
+large body
+
+Usage: python benchmarks/elements.py [paragraphs]
+
+Every element yielded for the body, its paragraphs and their runs is kept
+alive so that tracemalloc reports the memory retained by the element
+objects themselves.
+"""
+import sys
+import time
+import tracemalloc
+from docx.oxml import parse_xml
+from simplify_docx import Simplifier
+from simplify_docx.iterators import xml_iter
+
+PARAGRAPH = (
+    "<w:p><w:pPr/><w:r><w:rPr/><w:t>Lorem</w:t></w:r>"
+    "<w:r><w:rPr/><w:t>ipsum</w:t><w:tab/></w:r>"
+    "<w:r><w:t>sit</w:t><w:br/></w:r>"
+    "<w:r><w:rPr/><w:t>dolor</w:t></w:r></w:p>"
+)
+
+
+def make_body(paragraphs: int):
+    """
+    Build a body with ``paragraphs`` paragraphs of several runs each
+    """
+    return parse_xml(
+        '<w:body xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        + PARAGRAPH * paragraphs
+        + "</w:body>"
+    )
+
+
+def collect(body, iterators):
+    """
+    Create (and keep) the element objects for the body
+    """
+    out = []
+    for par in xml_iter(body, "CT_Body", iterators=iterators):
+        out.append(par)
+        out.extend(par)
+    return out
+
+
+def main(paragraphs: int = 20000) -> None:
+    """
+    Report the retained memory and creation time per element object
+    """
+    body = make_body(paragraphs)
+    iterators = Simplifier().iterators
+
+    # lxml proxies are created (and cached) on first access; create them
+    # before measuring so that only the element objects are counted
+    keep = collect(body, iterators)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    start = time.perf_counter()
+    elements = collect(body, iterators)
+    elapsed = time.perf_counter() - start
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    retained = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    count = len(elements)
+    print(
+        "%d elements: %.1f bytes/element, %.2f us/element"
+        % (count, retained / count, elapsed / count * 1e6)
+    )
+    del keep
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,50 @@
+"""
+Benchmark: simplifying a single paragraph split into many runs, which should
+scale linearly with the number of runs
+
+Usage: python benchmarks/merge_runs.py [runs ...]
+"""
+import sys
+import time
+from docx.oxml import parse_xml
+from simplify_docx import Simplifier
+from simplify_docx.elements import paragraph
+
+RUN = '<w:r><w:rPr/><w:t xml:space="preserve">%s </w:t></w:r>'
+
+
+def make_paragraph(runs: int):
+    """
+    Build a paragraph of ``runs`` runs, with white space only runs at each end
+    """
+    padding = RUN % "  "
+    return parse_xml(
+        '<w:p xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        + padding * 10
+        + "".join(RUN % ("word%d" % i) for i in range(runs))
+        + padding * 10
+        + "</w:p>"
+    )
+
+
+def main(*counts: int) -> None:
+    """
+    Report the time per run of ``paragraph.to_json`` for each paragraph size
+    """
+    # the paragraph is not part of a document, so it has no styles
+    simplifier = Simplifier(
+        {"include-paragraph-indent": False, "include-paragraph-numbering": False}
+    )
+    for runs in counts or (5000, 10000, 20000, 50000):
+        par = make_paragraph(runs)
+        best = float("inf")
+        for _ in range(3):
+            start = time.perf_counter()
+            out = paragraph(par, simplifier.iterators).to_json(None, simplifier.options)
+            best = min(best, time.perf_counter() - start)
+        assert len(out["VALUE"]) == 1
+        print("%6d runs: %7.3f s, %.2f us/run" % (runs, best, best / runs * 1e6))
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,68 @@
+"""
+Benchmark: simplifying a body holding tables nested within table cells to
+a given depth
+
+Usage: python benchmarks/nested_tables.py [depth ...]
+
+Each table has one row of two cells: the first holds a paragraph and the
+second a paragraph followed by the next table.
+"""
+import sys
+import time
+from lxml import etree
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls, qn
+from simplify_docx import Simplifier
+from simplify_docx.elements import body
+
+
+def paragraph(parent, text: str) -> None:
+    """
+    Append a paragraph of one run to ``parent``
+    """
+    run = etree.SubElement(etree.SubElement(parent, qn("w:p")), qn("w:r"))
+    etree.SubElement(run, qn("w:t")).text = text
+
+
+def make_body(depth: int):
+    """
+    Build a body holding tables nested ``depth`` deep
+
+    The tree is built directly since libxml2 refuses to parse documents
+    nested more than a few hundred levels deep.
+    """
+    root = parse_xml("<w:body %s/>" % nsdecls("w"))
+    parent = root
+    for i in range(depth):
+        tbl = etree.SubElement(parent, qn("w:tbl"))
+        etree.SubElement(tbl, qn("w:tblPr"))
+        row = etree.SubElement(tbl, qn("w:tr"))
+        paragraph(etree.SubElement(row, qn("w:tc")), "cell %d" % i)
+        parent = etree.SubElement(row, qn("w:tc"))
+        paragraph(parent, "level %d" % i)
+    return root
+
+
+def main(*depths: int) -> None:
+    """
+    Report the time per table of ``body.to_json`` for each nesting depth
+    """
+    simplifier = Simplifier(
+        {"include-paragraph-indent": False, "include-paragraph-numbering": False}
+    )
+    for depth in depths or (10, 30, 100, 1000):
+        root = make_body(depth)
+        best = float("inf")
+        try:
+            for _ in range(3):
+                start = time.perf_counter()
+                body(root, simplifier.iterators).to_json(None, simplifier.options)
+                best = min(best, time.perf_counter() - start)
+        except RecursionError:
+            print("%5d deep: RecursionError" % depth)
+            continue
+        print("%5d deep: %8.4f s, %.1f us/table" % (depth, best, best / depth * 1e6))
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
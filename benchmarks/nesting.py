@@ -0,0 +1,58 @@
+"""
+Benchmark: iterating over the runs of a paragraph whose content is nested
+inside deeply nested (flattened) hyperlinks and simple fields
+
+Usage: python benchmarks/nesting.py [depth ...]
+
+Each level of nesting holds one run, so a paragraph nested ``depth`` deep
+yields the contents of ``depth`` runs.
+"""
+import sys
+import time
+from lxml import etree
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls, qn
+from simplify_docx import Simplifier
+from simplify_docx.iterators import xml_iter
+
+LEVELS = ("w:hyperlink", "w:fldSimple")
+
+
+def make_paragraph(depth: int):
+    """
+    Build a paragraph whose content is nested ``depth`` levels deep
+
+    The tree is built directly since libxml2 refuses to parse documents
+    nested more than a few hundred levels deep.
+    """
+    par = parse_xml('<w:p %s/>' % nsdecls("w"))
+    parent = par
+    for i in range(depth):
+        parent = etree.SubElement(parent, qn(LEVELS[i % 2]))
+        run = etree.SubElement(parent, qn("w:r"))
+        etree.SubElement(run, qn("w:t")).text = "x"
+    return par
+
+
+def main(*depths: int) -> None:
+    """
+    Report the time per run iterated over by ``xml_iter`` for each nesting depth
+    """
+    iterators = Simplifier().iterators
+    for depth in depths or (10, 100, 1000, 5000):
+        par = make_paragraph(depth)
+        best = float("inf")
+        try:
+            for _ in range(3):
+                start = time.perf_counter()
+                count = sum(1 for _ in xml_iter(par, "CT_P", iterators=iterators))
+                best = min(best, time.perf_counter() - start)
+        except RecursionError:
+            print("%6d deep: RecursionError" % depth)
+            continue
+        assert count == depth
+        print("%6d deep: %8.4f s, %.2f us/run" % (depth, best, best / depth * 1e6))
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,86 @@
+"""
+Benchmark: peak RSS and wall time of ``iter_simplify_file()`` compared with
+``simplify(docx.Document(path))``
+
+Usage: python benchmarks/streaming.py [paragraphs] [path]
+
+A document with ``paragraphs`` paragraphs (and a table every 100 paragraphs)
+is generated at ``path`` unless it already exists, and each mode is run in a
+fresh interpreter so that peak RSS is measured independently.
+"""
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from io import BytesIO
+from zipfile import ZipFile, ZIP_DEFLATED
+import docx
+
+PARAGRAPH = (
+    '<w:p><w:pPr><w:ind w:left="720"/></w:pPr>'
+    "<w:r><w:t xml:space=\"preserve\">Lorem ipsum dolor sit amet, </w:t></w:r>"
+    "<w:r><w:rPr><w:b/></w:rPr><w:t>consectetur</w:t></w:r>"
+    "<w:r><w:t xml:space=\"preserve\"> adipiscing elit %d.</w:t></w:r></w:p>"
+)
+TABLE = (
+    "<w:tbl><w:tblPr/><w:tblGrid><w:gridCol/><w:gridCol/></w:tblGrid>"
+    + ("<w:tr>" + "<w:tc><w:p><w:r><w:t>cell</w:t></w:r></w:p></w:tc>" * 2 + "</w:tr>") * 3
+    + "</w:tbl>"
+)
+
+RUN = """
+import resource, sys, time, warnings
+warnings.simplefilter("ignore")
+import docx
+from simplify_docx import simplify, iter_simplify_file
+start = time.perf_counter()
+if sys.argv[1] == "simplify":
+    blocks = len(simplify(docx.Document(sys.argv[2]))["VALUE"][0]["VALUE"])
+else:
+    blocks = sum(1 for _ in iter_simplify_file(sys.argv[2]))
+elapsed = time.perf_counter() - start
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+print("%-20s %8d blocks %8.2f s %9.1f MB peak RSS" % (sys.argv[1], blocks, elapsed, rss))
+"""
+
+
+def make_document(path: str, paragraphs: int) -> None:
+    """
+    Generate a large document from the python-docx default template
+    """
+    template = BytesIO()
+    docx.Document().save(template)
+
+    with ZipFile(template) as src, ZipFile(path, "w", ZIP_DEFLATED) as dst:
+        for item in src.infolist():
+            data = src.read(item.filename)
+            if item.filename == "word/document.xml":
+                xml = data.decode("utf-8")
+                head, tail = re.split(r"<w:sectPr", xml, maxsplit=1)
+                body = "".join(
+                    (PARAGRAPH % i) + (TABLE if i % 100 == 99 else "")
+                    for i in range(paragraphs)
+                )
+                data = (head + body + "<w:sectPr" + tail).encode("utf-8")
+            dst.writestr(item, data)
+
+
+def main(paragraphs: int = 500000, path: str = "") -> None:
+    """
+    Run both modes on the same document
+    """
+    if not path:
+        path = os.path.join(tempfile.gettempdir(), "simplify-docx-%d.docx" % paragraphs)
+    if not os.path.exists(path):
+        make_document(path, paragraphs)
+    with ZipFile(path) as package:
+        size = package.getinfo("word/document.xml").file_size
+    print("word/document.xml: %.1f MB" % (size / 1024.0 / 1024.0))
+
+    for mode in ("simplify", "iter_simplify_file"):
+        subprocess.run([sys.executable, "-c", RUN, mode, path], check=True)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) if i == 0 else arg for i, arg in enumerate(sys.argv[1:])))
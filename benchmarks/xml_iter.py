@@ -0,0 +1,52 @@
+"""
+Micro-benchmark: per-node cost of ``xml_iter`` dispatch on a large body
+
+Usage: python benchmarks/xml_iter.py [paragraphs]
+"""
+import sys
+import time
+from docx.oxml import parse_xml
+from simplify_docx import Simplifier
+from simplify_docx.iterators import xml_iter
+
+PARAGRAPH = (
+    "<w:p><w:pPr/><w:bookmarkStart/><w:r><w:rPr/><w:t>Lorem</w:t></w:r>"
+    "<w:proofErr/><w:r><w:rPr/><w:t>ipsum</w:t><w:tab/></w:r>"
+    "<w:r><w:rPr/><w:t>dolor</w:t></w:r><w:bookmarkEnd/></w:p>"
+)
+
+
+def make_body(paragraphs: int):
+    """
+    Build a body with ``paragraphs`` paragraphs of several runs each
+    """
+    return parse_xml(
+        '<w:body xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        + PARAGRAPH * paragraphs
+        + "</w:body>"
+    )
+
+
+def main(paragraphs: int = 20000, repeat: int = 5) -> None:
+    """
+    Iterate over every paragraph and run of the body and report the best time
+    """
+    body = make_body(paragraphs)
+    iterators = Simplifier().iterators
+    nodes = sum(1 for _ in body.iter()) - 1
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for par in xml_iter(body, "CT_Body", iterators=iterators):
+            for _ in par:
+                pass
+        best = min(best, time.perf_counter() - start)
+
+    print(
+        "%d nodes: %.3f s, %.3f us/node" % (nodes, best, best / nodes * 1e6)
+    )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -67,6 +67,6 @@ setup(
         "six>=1.12.0,<2",
         "wincertstore==0.2",
     ],
-    extras_require={':python_version=="2.6"': ["argparse"]},
-    entry_points={"console_scripts": ["loadify = loadify:loadify"]},
+    extras_require={':python_version=="2.6"': ["argparse"], "numeric": ["numpy"]},
+    entry_points={"console_scripts": ["simplify-docx = simplify_docx.cli:main"]},
 )
@@ -1,18 +1,27 @@
 """
 Coerce Docx Documents to JSON
 
-Not thread safe! (but could be if build_iterators returned the built iterator
-definitions and passed them around...)
+``simplify()`` and ``Simplifier`` instances are thread safe: each
+``Simplifier`` owns its built iterator definitions and passes them explicitly
+to the elements it creates, so several threads may convert documents
+concurrently with different options.  A ``Simplifier`` also owns the memo of
+the related parts (e.g. altChunks) it has simplified, and the pool of worker
+processes started when ``related-parts-workers`` is more than 1, which is
+stopped by ``Simplifier.close()``.  The module level functions share one
+``Simplifier`` per set of options (see ``get_simplifier()``).
 """
 
-from typing import Union, Dict, Optional, Type, Any
+from typing import Union, Dict, Optional, Any, Generator, IO
+from .version import __version__
 from .types.fragment import documentPart
-from .utils.walk import walk
-from .utils.friendly_names import apply_friendly_names
+from .utils.walk import walk, walk_many
+from .utils.index import document_index
+from .utils.friendly_names import apply_friendly_names, get_type_names
 from .elements import document
-from .utils.set_options import set_options as __set_options__
-
-__version__ = "0.1.0"
+from .simplifier import Simplifier, get_simplifier, __default_options__
+from .batch import simplify_many, BatchResult
+from .cache import result_cache
+from .incremental import incremental_result
 
 # --------------------------------------------------
 # Main API
@@ -21,64 +30,65 @@ def simplify(doc: documentPart, options: Optional[Dict[str, Any]] = None):
     """
     Coerce Docx Documents to JSON
     """
+    return get_simplifier(options).simplify(doc)
 
-    # SET OPTIONS
-    _options: Dict[str, Any]
-    if options:
-        _options = dict(__default_options__, **options)
-    else:
-        _options = __default_options__
-    __set_options__(_options)
 
-    out = document(doc.element).to_json(doc, _options)
+def iter_simplify(
+    doc: documentPart, options: Optional[Dict[str, Any]] = None
+) -> Generator[Dict[str, Any], None, None]:
+    """
+    Coerce Docx Documents to JSON, yielding each top-level block of the
+    document body (paragraph, table, altChunk, ...) as soon as it is complete
+    """
+    return get_simplifier(options).iter_simplify(doc)
 
-    if _options.get("friendly-name", True):
-        apply_friendly_names(out)
 
-    return out
+def iter_simplify_file(
+    docx_file: Union[str, IO[bytes]], options: Optional[Dict[str, Any]] = None
+) -> Generator[Dict[str, Any], None, None]:
+    """
+    Coerce a .docx file to JSON, streaming the document part and yielding each
+    top-level block of the document body as soon as it is complete
+    """
+    return get_simplifier(options).iter_simplify_file(docx_file)
 
 
-# --------------------------------------------------
-# Default Options
-# --------------------------------------------------
-__default_options__: Dict[str, Union[str, bool, int, float]] = {
-    # general
-    "friendly-names": True,
-    # flattening special content
-    "flatten-hyperlink": True,
-    "flatten-smartTag": True,
-    "flatten-customXml": True,
-    "flatten-simpleField": True,
-    "merge-consecutive-text": True,
-    "flatten-inner-spaces": False,
-    # possibly meaningful style:
-    "include-paragraph-indent": True,
-    "include-paragraph-numbering": True,
-    # ignoring invisible things
-    "ignore-joiners": True,
-    "ignore-left-to-right-mark": False,
-    "ignore-right-to-left-mark": False,
-    "ignore-empty-table-description": True,
-    "ignore-empty-table-caption": True,
-    "ignore-empty-paragraphs": True,
-    "ignore-empty-text": True,
-    "remove-trailing-white-space": True,
-    "remove-leading-white-space": True,
-    # forms
-    "use-checkbox-default": True,
-    "greedy-text-input": True,
-    "checkbox-as-text": False,
-    "dropdown-as-text": False,
-    "simplify-dropdown": True,
-    "simplify-textinput": True,
-    "simplify-checkbox": True,
-    "flatten-generic-field": True,
-    "trim-dropdown-options": True,
-    # special symbols
-    "empty-as-text": False,
-    "symbol-as-text": True,
-    "special-characters-as-text": True,
-    "dumb-quotes": True,
-    "dumb-hyphens": True,
-    "dumb-spaces": True,
-}
+def simplify_to_stream(
+    doc: Union[documentPart, str, IO[bytes]],
+    fp: IO[str],
+    options: Optional[Dict[str, Any]] = None,
+    indent: Optional[int] = None,
+) -> None:
+    """
+    Coerce a Docx Document to JSON, writing each top-level block to the text
+    file object ``fp`` as soon as it is complete.  ``doc`` may also be the
+    path of (or a binary file object containing) a .docx file, which is then
+    streamed as by ``iter_simplify_file()``.
+    """
+    return get_simplifier(options).simplify_to_stream(doc, fp, indent)
+
+
+def simplify_to_jsonl(
+    doc: Union[documentPart, str, IO[bytes]],
+    fp: IO[str],
+    options: Optional[Dict[str, Any]] = None,
+) -> int:
+    """
+    Coerce a Docx Document to JSON Lines, writing each top-level block of the
+    document body to the text file object ``fp`` on a line of its own.
+    ``doc`` may also be the path of (or a binary file object containing) a
+    .docx file.  Returns the number of lines written.
+    """
+    return get_simplifier(options).simplify_to_jsonl(doc, fp)
+
+
+def simplify_incremental(
+    doc: documentPart,
+    previous: Optional[incremental_result] = None,
+    options: Optional[Dict[str, Any]] = None,
+) -> incremental_result:
+    """
+    Coerce a Docx Document to JSON, re-using the simplified paragraphs and
+    tables of a ``previous`` result whose XML is unchanged
+    """
+    return get_simplifier(options).simplify_incremental(doc, previous)
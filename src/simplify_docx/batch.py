@@ -0,0 +1,375 @@
+"""
+Simplify many documents in parallel
+"""
+import os
+import traceback
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    TimeoutError as FuturesTimeout,
+    as_completed,
+    wait,
+)
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from multiprocessing import get_context
+from typing import (
+    Any,
+    Deque,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+import docx
+from .cache import result_cache
+from .simplifier import Simplifier
+from .workers import init_worker, worker_state
+
+Source = Union[str, bytes]
+
+
+class BatchResult(NamedTuple):
+    """
+    The outcome of simplifying one document of a batch
+    """
+
+    index: int  # the position of the document in the input
+    path: Optional[str]  # the path of the document (``None`` for bytes)
+    value: Optional[Dict[str, Any]]  # the simplified document
+    error: Optional[str]  # the formatted traceback if simplification failed
+
+
+def _make_worker(
+    options: Optional[Dict[str, Any]], cache_dir: Optional[str] = None
+) -> Tuple[Simplifier, Optional[result_cache]]:
+    """
+    Build the simplifier (and result cache) for the requested options
+    """
+    return Simplifier(options), None if cache_dir is None else result_cache(cache_dir)
+
+
+def _simplify_chunk(
+    chunk: List[Tuple[int, Source]],
+    simplifier: Optional[Simplifier] = None,
+    cache: Optional[result_cache] = None,
+) -> List[BatchResult]:
+    """
+    Simplify a chunk of documents, capturing per-document errors.  Worker
+    processes use the simplifier and cache built by ``init_worker()``.
+    """
+    if simplifier is None:
+        simplifier, cache = worker_state()
+
+    out: List[BatchResult] = []
+    for index, source in chunk:
+        path = source if isinstance(source, str) else None
+        try:
+            if cache is not None:
+                key = cache.key(source, simplifier.options)
+                value = cache.get(key)
+                if value is None:
+                    doc = docx.Document(path if path is not None else BytesIO(source))
+                    value = simplifier.simplify(doc)
+                    cache.put(key, value)
+            else:
+                doc = docx.Document(path if path is not None else BytesIO(source))
+                value = simplifier.simplify(doc)
+        except Exception:  # pylint: disable=broad-except
+            out.append(BatchResult(index, path, None, traceback.format_exc()))
+        else:
+            out.append(BatchResult(index, path, value, None))
+    return out
+
+
+def _chunks(
+    sources: Iterable[Source], chunksize: int
+) -> Iterator[List[Tuple[int, Source]]]:
+    """
+    Group the (numbered) sources into chunks
+    """
+    chunk: List[Tuple[int, Source]] = []
+    for index, source in enumerate(sources):
+        chunk.append((index, source))
+        if len(chunk) >= chunksize:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def simplify_many(
+    sources: Iterable[Source],
+    options: Optional[Dict[str, Any]] = None,
+    max_workers: Optional[int] = None,
+    chunksize: int = 1,
+    ordered: bool = True,
+    cache_dir: Optional[str] = None,
+    timeout: Optional[float] = None,
+) -> Generator[BatchResult, None, None]:
+    """
+    Simplify many documents using a pool of worker processes
+
+    :param sources: Paths to .docx files, or the contents of .docx files
+    :type sources: Iterable[Union[str, bytes]]
+    :param options: Optional. Overrides for ``__default_options__``
+    :type options: Dict[str, Any]
+    :param max_workers: Optional. The number of worker processes (defaults to
+            the number of CPUs). With a single worker the documents are
+            simplified in the calling process.
+    :type max_workers: int
+    :param chunksize: The number of documents sent to a worker at a time
+    :type chunksize: int
+    :param ordered: If ``True`` results are yielded in the order of
+            ``sources``, otherwise they are yielded as they are completed
+    :type ordered: bool
+    :param cache_dir: Optional. The directory of a ``result_cache`` shared
+            by the workers
+    :type cache_dir: str
+    :param timeout: Optional. The longest time (in seconds) to wait for the
+            results of a chunk, after which the documents in flight are
+            simplified again (and those which still take too long fail)
+    :type timeout: float
+
+    :return: A generator of ``BatchResult``s, one per source. Documents which
+            fail to simplify have a ``None`` value and the formatted traceback
+            as their ``error``; they do not interrupt the batch.  If a worker
+            process dies, the pool is restarted and the documents which were
+            in flight are simplified again.
+    :return type: Generator[BatchResult, None, None]
+
+    The worker processes are spawned, so (as on Windows and macOS) a script
+    which calls ``simplify_many()`` with more than one worker must guard
+    its entry point with ``if __name__ == "__main__":``.
+    """
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    if max_workers == 1:
+        # THE CALLER'S PROCESS MAY RUN OTHER BATCHES, SO THE MODULE'S WORKER
+        # STATE IS NOT USED
+        simplifier, cache = _make_worker(options, cache_dir)
+        for chunk in _chunks(sources, chunksize):
+            for result in _simplify_chunk(chunk, simplifier, cache):
+                yield result
+        return
+
+    # bound the number of chunks in flight so that sources (which may be
+    # large byte strings) are not all submitted at once
+    max_pending = 4 * max_workers
+    chunks = _chunks(sources, chunksize)
+
+    pool = _worker_pool(max_workers, options, cache_dir, timeout)
+    try:
+        if ordered:
+            pending: Deque[_task] = deque()
+            for chunk in chunks:
+                pending.append(pool.submit(chunk))
+                if len(pending) >= max_pending:
+                    for result in pool.results(pending.popleft(), pending):
+                        yield result
+            while pending:
+                for result in pool.results(pending.popleft(), pending):
+                    yield result
+            return
+
+        running: Set[_task] = set()
+        for chunk in chunks:
+            running.add(pool.submit(chunk))
+            if len(running) >= max_pending:
+                for result in pool.completed(running):
+                    yield result
+        while running:
+            for result in pool.completed(running):
+                yield result
+    finally:
+        pool.shutdown()
+
+
+class _task:
+    """
+    A chunk of documents submitted to a ``_worker_pool``
+    """
+
+    __slots__ = ("chunk", "future", "recovered")
+
+    def __init__(self, chunk: List[Tuple[int, Source]], future: Future):
+        self.chunk = chunk
+        self.future = future
+        # THE RESULTS OF A CHUNK WHICH WAS IN FLIGHT WHEN THE POOL BROKE
+        self.recovered: Optional[List[BatchResult]] = None
+
+
+class _worker_pool:
+    """
+    A pool of worker processes which is replaced when it breaks (e.g. when
+    a worker is killed while simplifying a document) or when a chunk takes
+    longer than ``timeout``.  The documents which were in flight are then
+    simplified again, so that only the documents which break the pool on
+    their own are reported as failed.
+
+    The workers are spawned rather than forked, since the pool may be
+    replaced while the threads of the previous pool are still running.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        options: Optional[Dict[str, Any]],
+        cache_dir: Optional[str],
+        timeout: Optional[float] = None,
+    ):
+        self.max_workers = max_workers
+        self.options = options
+        self.cache_dir = cache_dir
+        self.timeout = timeout
+        self.executor = self._start()
+
+    def _start(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=get_context("spawn"),
+            initializer=init_worker,
+            initargs=(
+                Simplifier,
+                self.options,
+                None if self.cache_dir is None else result_cache(self.cache_dir),
+            ),
+        )
+
+    def _restart(self) -> None:
+        # A WORKER WHICH IS STUCK ON A DOCUMENT WOULD NEVER EXIT
+        for process in list((self.executor._processes or {}).values()):  # pylint: disable=protected-access
+            process.terminate()
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.executor = self._start()
+
+    def submit(self, chunk: List[Tuple[int, Source]]) -> _task:
+        """
+        Submit a chunk of documents
+        """
+        return _task(chunk, self.executor.submit(_simplify_chunk, chunk))
+
+    def results(self, task: _task, pending: Iterable[_task] = ()) -> List[BatchResult]:
+        """
+        Wait for the results of a chunk.  If the pool has broken (or the
+        chunk has timed out), the pool is replaced and the chunk, along with
+        the other chunks in flight (``pending``), is recovered.
+        """
+        if task.recovered is not None:
+            return task.recovered
+        try:
+            return task.future.result(timeout=self.timeout)
+        except (BrokenProcessPool, FuturesTimeout):
+            self._recover((task,) + tuple(pending))
+            return task.recovered
+        except Exception:  # pylint: disable=broad-except
+            # E.G. A RESULT WHICH COULD NOT BE SENT BACK FROM THE WORKER
+            return _failed(task.chunk)
+
+    def completed(self, running: Set[_task]) -> List[BatchResult]:
+        """
+        Wait for at least one of the ``running`` chunks to complete, removing
+        the completed chunks from ``running`` and returning their results
+        """
+        futures = {task.future: task for task in running}
+        done, _ = wait(futures, timeout=self.timeout, return_when=FIRST_COMPLETED)
+        if not done:
+            # NONE OF THE CHUNKS COMPLETED IN TIME
+            self._recover(running)
+            done = set(futures)
+        out: List[BatchResult] = []
+        for future in done:
+            task = futures[future]
+            running.discard(task)
+            out.extend(self.results(task, running))
+        return out
+
+    def _recover(self, tasks: Iterable[_task]) -> None:
+        """
+        Replace the pool and simplify the documents of each of ``tasks``
+        which did not complete: all together, and then one at a time if the
+        pool breaks again
+        """
+        unfinished: List[_task] = []
+        for task in tasks:
+            future = task.future
+            # ONLY A SETTLED FUTURE IS INSPECTED: THE OTHERS MAY NEVER SETTLE
+            if task.recovered is None and not (
+                future.done()
+                and not future.cancelled()
+                and not isinstance(future.exception(), BrokenProcessPool)
+            ):
+                unfinished.append(task)
+        self._restart()
+
+        items = [item for task in unfinished for item in task.chunk]
+        done, errors = self._run(items)
+        if errors:
+            self._restart()
+            for item in items:
+                if item[0] in done:
+                    continue
+                _done, _errors = self._run([item])
+                done.update(_done)
+                if _errors:
+                    done[item[0]] = _failed([item], _errors[item[0]])[0]
+                    self._restart()
+
+        for task in unfinished:
+            task.recovered = [done[index] for index, _ in task.chunk]
+
+    def _run(
+        self, items: List[Tuple[int, Source]]
+    ) -> Tuple[Dict[int, BatchResult], Dict[int, str]]:
+        """
+        Simplify each of ``items`` on its own, returning the results of the
+        documents which completed and the error of those which did not
+        (because the pool broke or the time ran out) by index
+        """
+        futures = {self.executor.submit(_simplify_chunk, [item]): item for item in items}
+        done: Dict[int, BatchResult] = {}
+        errors: Dict[int, str] = {}
+        try:
+            for future in as_completed(futures, timeout=self.timeout):
+                item = futures[future]
+                try:
+                    done.update((result.index, result) for result in future.result())
+                except BrokenProcessPool:
+                    errors[item[0]] = traceback.format_exc()
+                except Exception:  # pylint: disable=broad-except
+                    done.update((result.index, result) for result in _failed([item]))
+        except FuturesTimeout:
+            error = "TimeoutError: no result within %s seconds\n" % self.timeout
+            errors.update((index, error) for index, _ in items if index not in done)
+        return done, errors
+
+    def shutdown(self) -> None:
+        """
+        Stop the worker processes
+        """
+        self.executor.shutdown(wait=True)
+
+
+def _failed(chunk: List[Tuple[int, Source]], error: Optional[str] = None) -> List[BatchResult]:
+    """
+    The results of a chunk which could not be simplified by a worker, with
+    ``error`` (by default the formatted traceback of the exception being
+    handled)
+    """
+    if error is None:
+        error = traceback.format_exc()
+    return [
+        BatchResult(index, source if isinstance(source, str) else None, None, error)
+        for index, source in chunk
+    ]
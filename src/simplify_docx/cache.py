@@ -0,0 +1,267 @@
+"""
+A content-addressed on-disk cache of simplified documents
+"""
+import gzip
+import hashlib
+import json
+import os
+import posixpath
+import tempfile
+from collections import deque
+from io import BytesIO
+from zipfile import ZipFile
+from typing import Any, Dict, IO, Iterator, List, Optional, Tuple, Union
+
+import docx
+from .simplifier import get_simplifier, __default_options__
+from .version import __version__
+from .utils.package import (
+    related_targets,
+    RT_OFFICE_DOCUMENT,
+    RT_STYLES,
+    RT_NUMBERING,
+    RT_ALT_CHUNK,
+    RT_SUB_DOCUMENT,
+    RT_CONTENT_PART,
+)
+
+Source = Union[str, bytes, IO[bytes]]
+
+# the parts which (along with the main document part and its relationships)
+# determine the simplified output
+__content_reltypes__ = (
+    RT_STYLES,
+    RT_NUMBERING,
+    RT_ALT_CHUNK,
+    RT_SUB_DOCUMENT,
+    RT_CONTENT_PART,
+)
+
+# the related parts whose own relationships (e.g. the styles and numbering
+# of a subDoc) are followed in turn
+__document_reltypes__ = (RT_ALT_CHUNK, RT_SUB_DOCUMENT, RT_CONTENT_PART)
+
+__suffix__ = ".json.gz"
+
+
+def _content_parts(zipfile: ZipFile) -> Iterator[str]:
+    """
+    The names of the package parts on which the simplified document depends:
+    the main document part, and (recursively) the parts related to it and
+    to its related documents, with the relationships of each document
+    """
+    document_path = related_targets(zipfile, "", RT_OFFICE_DOCUMENT)[0]
+    seen = {document_path}
+    documents = deque([document_path])
+    while documents:
+        partname = documents.popleft()
+        base, name = posixpath.split(partname)
+        yield partname
+        yield posixpath.join(base, "_rels", name + ".rels")
+        for reltype in __content_reltypes__:
+            for target in related_targets(zipfile, partname, reltype):
+                if target in seen:
+                    continue
+                seen.add(target)
+                if reltype in __document_reltypes__:
+                    documents.append(target)
+                else:
+                    yield target
+
+
+def package_digest(source: Source) -> str:
+    """
+    A hash of the contents of the package parts on which the simplified
+    document depends (the main document part and its relationships, styles,
+    numbering, altChunk, subDoc and contentPart parts, and the relationships,
+    styles and numbering of those parts in turn)
+    """
+    fh: Any = BytesIO(source) if isinstance(source, bytes) else source
+    if hasattr(fh, "seek"):
+        fh.seek(0)
+    digest = hashlib.sha256()
+    with ZipFile(fh) as zipfile:
+        for name in _content_parts(zipfile):
+            try:
+                data = zipfile.read(name)
+            except KeyError:
+                data = b""
+            digest.update(name.encode("utf-8") + b"\0")
+            digest.update(b"%d\0" % len(data))
+            digest.update(data)
+    if hasattr(fh, "seek"):
+        fh.seek(0)
+    return digest.hexdigest()
+
+
+def options_digest(options: Optional[Dict[str, Any]] = None) -> str:
+    """
+    A hash of the complete (canonical) options and the library version
+    """
+    canonical = json.dumps(
+        [__version__, dict(__default_options__, **(options or {}))], sort_keys=True
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class result_cache:
+    """
+    Caches simplified documents on disk, keyed by the contents of the parts
+    of the .docx package which determine the output, the options and the
+    library version, so that re-simplifying an unchanged document costs a
+    hash and a read.
+
+    Entries are stored gzip compressed and written atomically, so the cache
+    may be shared by several processes.  When the total size of the entries
+    exceeds ``max_bytes`` the least recently used entries are evicted.  Each
+    instance keeps a running total of the size of the entries, which counts
+    only its own writes after the directory was first scanned; entries
+    written by other instances are counted when the directory is scanned
+    again to evict entries.
+
+    :param directory: The cache directory (created if needed)
+    :type directory: str
+    :param max_bytes: The size limit of the cache
+    :type max_bytes: int
+    :param compresslevel: The gzip compression level
+    :type compresslevel: int
+    """
+
+    def __init__(
+        self, directory: str, max_bytes: int = 256 << 20, compresslevel: int = 6
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.compresslevel = compresslevel
+        self._size: Optional[int] = None
+        self._options_digests: Dict[str, str] = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, source: Source, options: Optional[Dict[str, Any]] = None) -> str:
+        """
+        The cache key of a .docx file (path, contents or binary file object)
+        simplified with ``options``
+        """
+        canonical = json.dumps(options or {}, sort_keys=True)
+        try:
+            _options = self._options_digests[canonical]
+        except KeyError:
+            _options = self._options_digests[canonical] = options_digest(options)
+        return hashlib.sha256(
+            (package_digest(source) + _options).encode("ascii")
+        ).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + __suffix__)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        The cached simplified document, or ``None``
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as fh:
+                value = json.loads(gzip.decompress(fh.read()))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, EOFError):
+            # A CORRUPT ENTRY
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        """
+        Store a simplified document
+        """
+        data = gzip.compress(
+            json.dumps(value, separators=(",", ":")).encode("utf-8"),
+            compresslevel=self.compresslevel,
+        )
+        path = self._path(key)
+        try:
+            # THE SIZE OF THE ENTRY BEING REPLACED, IF ANY
+            replaced = os.stat(path).st_size
+        except OSError:
+            replaced = 0
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            self._remove(tmp)
+            raise
+
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self._entries())
+        else:
+            self._size += len(data) - replaced
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def simplify(
+        self, source: Source, options: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Simplify a .docx file (path, contents or binary file object), using
+        the cached result when the relevant parts are unchanged
+        """
+        key = self.key(source, options)
+        value = self.get(key)
+        if value is None:
+            value = get_simplifier(options).simplify(
+                docx.Document(BytesIO(source) if isinstance(source, bytes) else source)
+            )
+            self.put(key, value)
+        return value
+
+    def _entries(self) -> List[Tuple[str, int, float]]:
+        """
+        The ``(path, size, last use)`` of each entry
+        """
+        out = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(__suffix__):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                out.append((entry.path, stat.st_size, stat.st_mtime))
+        return out
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used entries until the cache is within
+        ``max_bytes``
+        """
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        size = sum(entry[1] for entry in entries)
+        for path, entry_size, _ in entries:
+            if size <= self.max_bytes:
+                break
+            if self._remove(path):
+                size -= entry_size
+        self._size = size
+
+    def clear(self) -> None:
+        """
+        Remove every entry
+        """
+        for path, _, _ in self._entries():
+            self._remove(path)
+        self._size = 0
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.remove(path)
+        except OSError:
+            return False
+        return True
@@ -0,0 +1,327 @@
+"""
+Command line interface: convert .docx files, directory trees or globs to JSON
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from .batch import simplify_many
+from .simplifier import __default_options__
+
+MANIFEST = ".simplify-docx.json"
+
+
+def _glob_root(pattern: str) -> str:
+    """
+    The leading directories of a glob which hold no wildcards
+    """
+    parts = pattern.split(os.sep)
+    for i, part in enumerate(parts):
+        if glob.has_magic(part):
+            parts = parts[:i]
+            break
+    else:
+        parts = parts[:-1]
+    return os.sep.join(parts) or (os.sep if pattern.startswith(os.sep) else ".")
+
+
+def _iter_inputs(inputs: Sequence[str]) -> Iterator[Tuple[str, str]]:
+    """
+    Expand files, directories (recursively) and globs into
+    ``(path, relative path)`` pairs.  Paths are relative to the directory or
+    to the leading directories of the glob, and files named directly are
+    relative to the common directory of all such files.  Each file is
+    yielded once, however many inputs it matches.
+    """
+    files = [item for item in inputs if os.path.isfile(item)]
+    try:
+        files_root = os.path.commonpath(
+            [os.path.dirname(os.path.abspath(item)) for item in files]
+        )
+    except ValueError:
+        # NO FILES, OR FILES ON DIFFERENT DRIVES
+        files_root = None
+
+    seen = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            found = []
+            for root, _, names in os.walk(item):
+                for name in sorted(names):
+                    if name.lower().endswith(".docx") and not name.startswith("~$"):
+                        found.append(os.path.join(root, name))
+            root = item
+        elif os.path.isfile(item):
+            found = [item]
+            root = files_root
+        else:
+            found = sorted(glob.glob(item, recursive=True))
+            if not found:
+                print("simplify-docx: no such file: %s" % item, file=sys.stderr)
+            found = [path for path in found if os.path.isfile(path)]
+            root = _glob_root(item)
+
+        for path in found:
+            real = os.path.realpath(path)
+            if real in seen:
+                continue
+            seen.add(real)
+            if root is None:
+                yield path, os.path.basename(path)
+            else:
+                yield path, os.path.relpath(os.path.abspath(path), os.path.abspath(root))
+
+
+def _sha256(path: str) -> str:
+    """
+    The hex digest of a file's contents
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _load_manifest(path: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Load the record of previously converted files
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def _source_record(source: str, options_id: str) -> Dict[str, Any]:
+    """
+    The modification time and size of ``source``, and the options it is
+    converted with
+    """
+    stat = os.stat(source)
+    return {"mtime": stat.st_mtime_ns, "size": stat.st_size, "options": options_id}
+
+
+def _is_up_to_date(
+    entry: Optional[Dict[str, Any]], source: str, target: str, options_id: str
+) -> Tuple[bool, Dict[str, Any]]:
+    """
+    Check whether ``target`` was converted from the current contents of
+    ``source`` with the current options.  The (cheap) modification time and
+    size are compared first, and the file is only hashed if they differ.
+    """
+    record = _source_record(source, options_id)
+    if entry is None or not os.path.exists(target) or entry.get("options") != options_id:
+        return False, record
+    if entry.get("mtime") == record["mtime"] and entry.get("size") == record["size"]:
+        record["sha256"] = entry.get("sha256")
+        return True, record
+    record["sha256"] = _sha256(source)
+    return entry.get("sha256") == record["sha256"], record
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Entry point for the ``simplify-docx`` console script
+    """
+    # pylint: disable=too-many-locals, too-many-branches, too-many-statements
+
+    parser = argparse.ArgumentParser(
+        prog="simplify-docx",
+        description="Convert .docx files to simplified JSON documents",
+    )
+    parser.add_argument(
+        "inputs", nargs="+", help=".docx files, directories (searched recursively) or globs"
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="output directory for --format json (default: the current "
+        "directory) or output file for --format jsonl (default: stdout)",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=("json", "jsonl"),
+        default="json",
+        help="one .json file per document, or one JSON line per document",
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1, help="number of worker processes"
+    )
+    parser.add_argument(
+        "--chunksize", type=int, default=1, help="documents sent to a worker at a time"
+    )
+    parser.add_argument(
+        "--options",
+        help="JSON object overriding the default options (or @file to read it from a file)",
+    )
+    parser.add_argument("--indent", type=int, default=None, help="JSON indentation")
+    parser.add_argument(
+        "--cache",
+        metavar="DIR",
+        help="cache simplified documents in DIR, keyed by their contents and the options",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="convert every document, even if its output is up to date",
+    )
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.chunksize < 1:
+        parser.error("--chunksize must be at least 1")
+
+    options: Optional[Dict[str, Any]] = None
+    if args.options:
+        try:
+            if args.options.startswith("@"):
+                with open(args.options[1:], "r", encoding="utf-8") as fh:
+                    options = json.load(fh)
+            else:
+                options = json.loads(args.options)
+        except OSError as error:
+            parser.error("cannot read --options: %s" % error)
+        except ValueError as error:
+            parser.error("--options is not valid JSON: %s" % error)
+        if not isinstance(options, dict):
+            parser.error("--options must be a JSON object")
+        unknown = sorted(set(options) - set(__default_options__))
+        if unknown:
+            parser.error("unknown options: %s" % ", ".join(unknown))
+    options_id = json.dumps(dict(__default_options__, **(options or {})), sort_keys=True)
+
+    inputs = list(_iter_inputs(args.inputs))
+    start = time.perf_counter()
+    converted = skipped = failed = 0
+    total_bytes = 0
+
+    if args.format == "json":
+        outdir = args.output or "."
+
+        # INPUTS FROM DIFFERENT DIRECTORIES OR GLOBS MAY SHARE A RELATIVE PATH
+        outputs: Dict[str, List[str]] = {}
+        for path, relpath in inputs:
+            outputs.setdefault(
+                os.path.normcase(os.path.splitext(relpath)[0]), []
+            ).append(path)
+        clashes = [paths for paths in outputs.values() if len(paths) > 1]
+        if clashes:
+            parser.error(
+                "inputs with the same output file: %s"
+                % "; ".join(", ".join(paths) for paths in clashes)
+            )
+
+        manifest_path = os.path.join(outdir, MANIFEST)
+        manifest = _load_manifest(manifest_path)
+        records: Dict[str, Dict[str, Any]] = {}
+        keys: Dict[str, str] = {}
+        targets: Dict[str, str] = {}
+
+        todo: List[str] = []
+        for path, relpath in inputs:
+            key = os.path.splitext(relpath)[0] + ".json"
+            target = os.path.join(outdir, key)
+            if args.force:
+                up_to_date, record = False, _source_record(path, options_id)
+            else:
+                up_to_date, record = _is_up_to_date(
+                    manifest.get(key), path, target, options_id
+                )
+            if up_to_date:
+                manifest[key] = record
+                skipped += 1
+                continue
+            if record.get("sha256") is None:
+                # HASH THE SOURCE BEFORE IT IS CONVERTED, SO THAT A FILE WHICH
+                # IS EDITED DURING THE RUN IS NOT RECORDED AS UP TO DATE
+                record["sha256"] = _sha256(path)
+            records[path] = record
+            keys[path] = key
+            targets[path] = target
+            todo.append(path)
+
+        try:
+            for result in simplify_many(
+                todo,
+                options,
+                max_workers=args.jobs,
+                chunksize=args.chunksize,
+                ordered=False,
+                cache_dir=args.cache,
+            ):
+                record = records[result.path]
+                if result.error is not None:
+                    failed += 1
+                    print(
+                        "simplify-docx: failed to convert %s\n%s" % (result.path, result.error),
+                        file=sys.stderr,
+                    )
+                    manifest.pop(keys[result.path], None)
+                    continue
+                target = targets[result.path]
+                os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+                with open(target, "w", encoding="utf-8") as fh:
+                    json.dump(result.value, fh, indent=args.indent)
+                manifest[keys[result.path]] = record
+                converted += 1
+                total_bytes += record["size"]
+        finally:
+            os.makedirs(outdir, exist_ok=True)
+            with open(manifest_path, "w", encoding="utf-8") as fh:
+                json.dump(manifest, fh, indent=1, sort_keys=True)
+
+    else:
+        out = (
+            open(args.output, "w", encoding="utf-8")  # pylint: disable=consider-using-with
+            if args.output and args.output != "-"
+            else sys.stdout
+        )
+        try:
+            for result in simplify_many(
+                [path for path, _ in inputs],
+                options,
+                max_workers=args.jobs,
+                chunksize=args.chunksize,
+                cache_dir=args.cache,
+            ):
+                if result.error is not None:
+                    failed += 1
+                    print(
+                        "simplify-docx: failed to convert %s\n%s" % (result.path, result.error),
+                        file=sys.stderr,
+                    )
+                    continue
+                out.write(json.dumps({"path": result.path, "document": result.value}))
+                out.write("\n")
+                converted += 1
+                total_bytes += os.path.getsize(result.path)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+
+    elapsed = time.perf_counter() - start
+    print(
+        "simplify-docx: %d converted, %d up to date, %d failed in %.2f s "
+        "(%.1f docs/s, %.2f MB/s)"
+        % (
+            converted,
+            skipped,
+            failed,
+            elapsed,
+            converted / elapsed if elapsed else 0.0,
+            total_bytes / 1048576.0 / elapsed if elapsed else 0.0,
+        ),
+        file=sys.stderr,
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,7 +8,7 @@ from .body import body
 from .document import document, altChunk, subDoc, contentPart
 from .table import table, tr, tc
 from .run_contents import text, simpleTextElement, SymbolChar, empty
-from .form import fldChar, checkBox, ddList, textInput, ffData
+from .form import fldChar, checkBox, ddList, textInput, ffData, field_assembler
 from .paragraph import  (
         EG_PContent,
         paragraph,
@@ -16,4 +16,5 @@ from .paragraph import  (
         fldSimple,
         customXml,
         smartTag,
+        paragraph_assembler,
 )
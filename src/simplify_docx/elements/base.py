@@ -1,10 +1,24 @@
 """
 base classes for the docx elements
 """
-from typing import Optional, Dict, Any, Sequence, Generator, Iterator
+from typing import (
+    Optional,
+    Dict,
+    Any,
+    Sequence,
+    Iterator,
+    List,
+    Tuple,
+    TYPE_CHECKING,
+)
 from docx.oxml.shared import CT_String, CT_OnOff, CT_DecimalNumber
 from docx.shared import  Twips
 from ..types import xmlFragment
+from ..utils.friendly_names import get_type_names
+
+if TYPE_CHECKING:
+    from ..iterators.generic import ElementHandlers # pylint: disable=cyclic-import
+    from .paragraph import paragraph_assembler # pylint: disable=cyclic-import
 
 # --------------------------------------------------
 # Base Classes
@@ -19,21 +33,35 @@ class el:
     """
     Abstract base class for docx element
     """
+    __slots__ = ("fragment", "iterators", "_props", "__type__")
     __type__: str
-    parent: "el"
     fragment: xmlFragment
     __iter_name__: Optional[str] = None
     __iter_xpath__: Optional[str] = None
-    __props__: Optional[Sequence[str]]
-    props: Dict[str, Any]
+    __props__: Optional[Sequence[str]] = None
+    _props: Dict[str, Any]
+    iterators: Optional[Dict[str, "ElementHandlers"]]
 
-    def __init__(self, x: xmlFragment):
+    def __init__(self,
+            x: xmlFragment,
+            iterators: Optional[Dict[str, "ElementHandlers"]] = None):
         self.fragment = x
-        __props__ = getattr(self, "__props__", None)
-        if __props__:
-            self.props = {}
-            for prop in __props__:
-                self.props[prop] = getattr(x, prop)
+        self.iterators = iterators
+
+    @property
+    def props(self) -> Dict[str, Any]:
+        """
+        The ``__props__`` of the element, which are only read from the
+        fragment the first time they are needed
+        """
+        try:
+            return self._props
+        except AttributeError:
+            pass
+        x = self.fragment
+        props = {prop: getattr(x, prop) for prop in self.__props__ or ()}
+        self._props = props
+        return props
 
     def to_json(self,
             doc, # pylint: disable=unused-argument
@@ -43,9 +71,9 @@ class el:
         coerce an object to JSON
         """
 
-        out = {"TYPE": self.__type__}
+        out = {"TYPE": get_type_names(options)[self.__type__]}
 
-        if hasattr(self, "__props__"):
+        if self.__props__:
             for key, prop in self.props.items():
                 if prop is None:
                     continue
@@ -53,14 +81,14 @@ class el:
             #return dict(self.props, **out)
         return out
 
-    def __iter__(self) -> Generator['el', None, None]:
+    def __iter__(self) -> Iterator['el']:
         from ..iterators import xml_iter
         node: xmlFragment = (self.fragment
                              if self.__iter_xpath__ is None
                              else self.fragment.xpath(self.__iter_xpath__))
-        for elt in xml_iter(node,
-                            self.__iter_name__ if self.__iter_name__ else self.__type__):
-            yield elt
+        return xml_iter(node,
+                        self.__iter_name__ if self.__iter_name__ else self.__type__,
+                        iterators=self.iterators)
 
     def simplify(self, options: Dict[str, str]) -> 'el': # pylint: disable=unused-argument
         """
@@ -79,7 +107,7 @@ def get_val(x):
     """
     Extract the value from a simple property
     """
-    if isinstance(x, (str,bool)):
+    if isinstance(x, (str, bool, int)):
         return x
     if isinstance(x, list):
         return [get_val(elt) for elt in x]
@@ -94,15 +122,78 @@ class container(el):
     Represents an object that can contain other objects
     """
 
+    __slots__ = ()
     def to_json(self,
             doc,
             options: Dict[str, str],
             super_iter: Optional[Iterator] = None) -> Dict[str, Any]:
         """Coerce a container object to JSON
+
+        Nested containers which are serialized by this method are handled
+        with an explicit stack of frames rather than by recursion, so that
+        deeply nested content (e.g. tables within tables) costs neither
+        Python frames nor a chain of generators per level.
+        """
+        stack: List[Tuple[container, Dict[str, Any], Iterator[el], Optional["paragraph_assembler"]]] = [
+            self._open_json(doc, options, super_iter)
+        ]
+        while True:
+            current, out, children, blocks = stack[-1]
+            for elt in children:
+                if type(elt).to_json is container.to_json:
+                    if blocks is not None:
+                        for JSON in blocks.flush(elt):
+                            current._accept_json(out, JSON, options) # pylint: disable=protected-access
+                    # SERIALIZE THE NESTED CONTAINER BEFORE THE REMAINING CHILDREN
+                    stack.append(elt._open_json(doc, options)) # pylint: disable=protected-access
+                    break
+                if blocks is None:
+                    current._accept_json(out, elt.to_json(doc, options), options) # pylint: disable=protected-access
+                else:
+                    for JSON in blocks.feed(elt):
+                        current._accept_json(out, JSON, options) # pylint: disable=protected-access
+            else:
+                if blocks is not None:
+                    for JSON in blocks.flush():
+                        current._accept_json(out, JSON, options) # pylint: disable=protected-access
+                stack.pop()
+                JSON = current._close_json(out, doc, options) # pylint: disable=protected-access
+                if not stack:
+                    return JSON
+                parent = stack[-1]
+                parent[0]._accept_json(parent[1], JSON, options) # pylint: disable=protected-access
+
+    def _open_json(self,
+            doc,
+            options: Dict[str, str],
+            super_iter: Optional[Iterator] = None,
+            ) -> Tuple['container', Dict[str, Any], Iterator[el], Optional["paragraph_assembler"]]:
+        """
+        Start coercing the container to JSON, returning its stack frame: the
+        container, its (incomplete) JSON, the iterator over its children and
+        the ``paragraph_assembler`` which coerces them to JSON (or ``None``
+        if each child is coerced on its own)
+        """
+        out: Dict[str, Any] = el.to_json(self, doc, options, super_iter)
+        out["VALUE"] = []
+        return self, out, iter(self), None
+
+    def _accept_json(self,
+            out: Dict[str, Any],
+            JSON: Dict[str, Any],
+            options: Dict[str, str], # pylint: disable=unused-argument
+            ) -> None:
+        """
+        Add the JSON of a child to the container's JSON
+        """
+        out["VALUE"].append(JSON)
+
+    def _close_json(self,
+            out: Dict[str, Any],
+            doc, # pylint: disable=unused-argument
+            options: Dict[str, str], # pylint: disable=unused-argument
+            ) -> Dict[str, Any]:
+        """
+        Finish coercing the container to JSON, once its children are done
         """
-        out: Dict[str, Any] = super(container, self,).to_json(doc, options, super_iter)
-        out.update({
-                "TYPE": self.__type__,
-                "VALUE": [ elt.to_json(doc, options) for elt in self],
-                })
         return out
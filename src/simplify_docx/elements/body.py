@@ -1,9 +1,11 @@
 """
 The body element
 """
-from typing import Dict, Any, Optional, Iterator
-from more_itertools import peekable
-from .base import container
+from typing import Dict, Any, Optional, Iterable, Iterator, Generator
+from .base import container, el
+from .paragraph import paragraph_assembler
+from ..related import related_documents, part_documents, get_session
+from ..utils.friendly_names import get_type_names
 
 
 class body(container):
@@ -11,6 +13,7 @@ class body(container):
     A document body element
     """
 
+    __slots__ = ()
     __type__ = "CT_Body"
 
     def to_json(
@@ -19,19 +22,53 @@ class body(container):
         """
         Coerce a container object to JSON
         """
-        contents = []
-        iter_me = peekable(self)
-        for elt in iter_me:
-            JSON = elt.to_json(doc, options, iter_me)
+        out: Dict[str, Any] = {
+            "TYPE": get_type_names(options)[self.__type__],
+            "VALUE": list(self.iter_json(doc, options)),
+        }
+        return out
+
+    def iter_json(
+        self,
+        doc,
+        options: Dict[str, str] = None,
+        assembler: Optional[paragraph_assembler] = None,
+        blocks: Optional[Iterable[el]] = None,
+    ) -> Generator[Dict[str, Any], None, None]:
+        """
+        Coerce the contents of the body to JSON, yielding each top-level block
+        as soon as it is complete
+
+        :param assembler: Optional. The ``paragraph_assembler`` which coerces
+                the blocks to JSON (a new one by default)
+        :type assembler: paragraph_assembler
+        :param blocks: Optional. The elements of the body, if they are not
+                read from the body element (e.g. when the document part is
+                streamed)
+        :type blocks: Iterable[el]
+        """
+        PARAGRAPH = get_type_names(options)["CT_P"]
+
+        workers = options.get("related-parts-workers", 0)
+        if workers and workers > 1:
+            # SIMPLIFY THE RELATED PARTS (E.G. ALTCHUNKS) IN PARALLEL FIRST
+            get_session(self.iterators, options).simplify_parts(
+                related_documents(doc, self.fragment)
+                if blocks is None
+                else part_documents(doc),
+                workers,
+            )
+
+        if assembler is None:
+            assembler = paragraph_assembler(doc, options)
+
+        for JSON in assembler.iter_json(self if blocks is None else blocks):
 
             if (
-                JSON["TYPE"] == "CT_P"
+                JSON["TYPE"] == PARAGRAPH
                 and options.get("ignore-empty-paragraphs", False)
                 and not JSON["VALUE"]
             ):
                 continue
 
-            contents.append(JSON)
-
-        out: Dict[str, Any] = {"TYPE": self.__type__, "VALUE": contents}
-        return out
+            yield JSON
@@ -2,12 +2,16 @@
 The body element
 """
 from typing import Dict, Any, Optional, Iterator
+from docx.oxml.ns import qn
 from .base import container
+from ..related import get_session
+from ..utils.friendly_names import get_type_names
 
 class document(container):
     """
     A document body element
     """
+    __slots__ = ()
     __type__ = "CT_Document"
 
 
@@ -16,6 +20,7 @@ class CT_Rel(container):
     A document body element
     """
 
+    __slots__ = ()
     __type__ = "CT_Rel"
     __name__ = "CT_Rel"
 
@@ -25,14 +30,18 @@ class CT_Rel(container):
         """
         Coerce a container object to JSON
         """
-        chunkId = self.fragment.rId
+        # python-docx HAS NO ELEMENT CLASS (AND SO NO rId PROPERTY) FOR THESE
+        chunkId = self.fragment.get(qn("r:id"))
         chunkPart = doc.part.related_parts[chunkId]
         chunkDoc = chunkPart.element
-        chunkDoc.element.body.getchildren()
 
         return {
-            "TYPE": self.__name__,
-            "VALUE": document(chunkPart.element.element).to_json(chunkDoc, options),
+            "TYPE": get_type_names(options)[self.__name__],
+            # PARTS WITH THE SAME CONTENTS ARE ONLY SIMPLIFIED ONCE
+            "VALUE": get_session(self.iterators, options).simplify_part(
+                chunkDoc,
+                lambda: document(chunkDoc.element, self.iterators).to_json(chunkDoc, options),
+            ),
         }
 
 
@@ -41,6 +50,7 @@ class subDoc(CT_Rel):
     A nested sub-document
     """
 
+    __slots__ = ()
     __name__ = "subDoc"
 
 
@@ -49,6 +59,7 @@ class contentPart(CT_Rel):
     A content part
     """
 
+    __slots__ = ()
     __name__ = "contentPart"
 
 
@@ -57,4 +68,5 @@ class altChunk(CT_Rel):
     An alternate format chunk
     """
 
+    __slots__ = ()
     __type__ = "CT_AltChunk"
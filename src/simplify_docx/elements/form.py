@@ -1,45 +1,134 @@
 """
 Form Field Data
 """
-from typing import Dict, Any, Sequence, Optional, Iterator
+from typing import Dict, Any, Sequence, Optional, Iterator, Iterable, List, Callable
 from warnings import warn
+from docx.oxml.ns import qn
 from ..types import xmlFragment
 from . import el
 from .base import get_val
+from ..utils.friendly_names import get_type_names
 
+__val__ = qn("w:val")
 
-class checkBox(el):
+
+def _on_off(value: Optional[str]) -> bool:
+    """
+    Read an ``ST_OnOff`` value, which is on when it is omitted
+    """
+    return value not in ("0", "false", "off")
+
+
+def _attribute(name: str, convert: Callable[[str], Any] = str) -> Callable[[xmlFragment], Any]:
+    """
+    Read the attribute ``name`` of an element
+    """
+    key = qn(name)
+
+    def read(x: xmlFragment) -> Any:
+        value = x.get(key)
+        return None if value is None else convert(value)
+
+    return read
+
+
+def _child(name: str, convert: Callable[[str], Any] = str) -> Callable[[xmlFragment], Any]:
+    """
+    Read the ``w:val`` attribute of the child element ``name``
+    """
+    tag = qn(name)
+
+    def read(x: xmlFragment) -> Any:
+        child = x.find(tag)
+        if child is None:
+            return None
+        value = child.get(__val__)
+        if value is None and convert is not _on_off:
+            return None
+        return convert(value)
+
+    return read
+
+
+def _list_entries(x: xmlFragment) -> List[str]:
+    """
+    Read the entries of a drop-down list
+    """
+    return [entry.get(__val__) for entry in x.iterfind(qn("w:listEntry"))]
+
+
+class form_el(el):
+    """
+    Base class for the form field elements, whose properties are read from
+    the raw XML by their ``__readers__`` (python-docx has no classes for the
+    form field elements)
+    """
+
+    __slots__ = ()
+    __readers__: Dict[str, Callable[[xmlFragment], Any]] = {}
+
+    @property
+    def props(self) -> Dict[str, Any]:
+        try:
+            return self._props
+        except AttributeError:
+            pass
+        x = self.fragment
+        props = {prop: read(x) for prop, read in self.__readers__.items()}
+        self._props = props
+        return props
+
+
+class checkBox(form_el):
     """
     The ffData checkBox attribute
     """
 
+    __slots__ = ()
     __type__ = "CT_FFCheckBox"
     __props__ = ["default", "checked"]
+    __readers__ = {
+        "default": _child("w:default", _on_off),
+        "checked": _child("w:checked", _on_off),
+    }
 
 
-class ddList(el):
+class ddList(form_el):
     """
     The ffData ddList attribute
     """
 
+    __slots__ = ()
     __type__ = "CT_FFDDList"
     __props__ = ["default", "result", "listEntry_lst"]
+    __readers__ = {
+        "default": _child("w:default", int),
+        "result": _child("w:result", int),
+        "listEntry_lst": _list_entries,
+    }
 
 
-class textInput(el):
+class textInput(form_el):
     """
     The ffData textInput attribute
     """
 
+    __slots__ = ()
     __type__ = "CT_FFTextInput"
     __props__ = ["default", "type_", "format_"]
+    __readers__ = {
+        "default": _child("w:default"),
+        "type_": _child("w:type"),
+        "format_": _child("w:format"),
+    }
 
 
-class ffData(el):
+class ffData(form_el):
     """
     The ffData element
     """
 
+    __slots__ = ("checkBox", "ddList", "textInput")
     __props__ = [
         "name",
         "label",
@@ -51,34 +140,46 @@ class ffData(el):
         "helpText",
         "statusText",
     ]
+    __readers__ = {
+        "name": _child("w:name"),
+        "label": _child("w:label", int),
+        "tabIndex": _child("w:tabIndex", int),
+        "enabled": _child("w:enabled", _on_off),
+        "calcOnExit": _child("w:calcOnExit", _on_off),
+        "entryMacro": _child("w:entryMacro"),
+        "exitMacro": _child("w:exitMacro"),
+        "helpText": _child("w:helpText"),
+        "statusText": _child("w:statusText"),
+    }
     __type__: str = "CT_FFData"
 
-    def __init__(self, x: xmlFragment):
-        super(ffData, self).__init__(x)
+    checkBox: Optional[checkBox]
+    ddList: Optional[ddList]
+    textInput: Optional[textInput]
 
-        _checkBox = x.checkBox
-        if _checkBox is not None:
-            self.checkBox = checkBox(_checkBox)
+    def __init__(self, x: xmlFragment, iterators=None):
+        super(ffData, self).__init__(x, iterators)
 
-        _ddList = x.ddList
-        if _ddList is not None:
-            self.ddList = ddList(_ddList)
+        _checkBox = x.find(qn("w:checkBox"))
+        self.checkBox = None if _checkBox is None else checkBox(_checkBox)
 
-        _textInput = x.textInput
-        if _textInput is not None:
-            self.textInput = textInput(_textInput)
+        _ddList = x.find(qn("w:ddList"))
+        self.ddList = None if _ddList is None else ddList(_ddList)
+
+        _textInput = x.find(qn("w:textInput"))
+        self.textInput = None if _textInput is None else textInput(_textInput)
 
     def to_json(self, doc, options, super_iter: Optional[Iterator] = None):
 
         out = super(ffData, self).to_json(doc, options, super_iter)
 
-        if self.fragment.checkBox is not None:
+        if self.checkBox is not None:
             out["checkBox"] = self.checkBox.to_json(doc, options)
 
-        if self.fragment.ddList is not None:
+        if self.ddList is not None:
             out["ddList"] = self.ddList.to_json(doc, options)
 
-        if self.fragment.textInput is not None:
+        if self.textInput is not None:
             out["textInput"] = self.textInput.to_json(doc, options)
 
         return out
@@ -90,34 +191,38 @@ class ffData(el):
         return self.fragment
 
 
-class fldChar(el):
+class fldChar(form_el):
     """
     Form Field Data
     """
 
-    __type__: str = "fldChar"
+    __slots__ = ("status", "fieldCodes", "fieldResults", "_ffData", "ffData")
+    __type__: str
     __props__ = ["fldCharType", "fldLock", "dirty"]
+    __readers__ = {
+        "fldCharType": _attribute("w:fldCharType"),
+        "fldLock": _attribute("w:fldLock", _on_off),
+        "dirty": _attribute("w:dirty", _on_off),
+    }
 
     fieldCodes: Sequence[el]
     fieldResults: Sequence[el]
     ffData: Optional[ffData]
 
-    def __init__(self, x: xmlFragment):
-        super(fldChar, self).__init__(x)
+    def __init__(self, x: xmlFragment, iterators=None):
+        super(fldChar, self).__init__(x, iterators)
 
         self.status = "fieldCodes"
         self.fieldCodes = []
         self.fieldResults = []
-        self._ffData = x.ffData
-
-        _ffData = x.ffData
+        self._ffData = _ffData = x.find(qn("w:ffData"))
         if _ffData is not None:
             self.ffData = ffData(_ffData)
-            if x.ffData.checkBox is not None:
+            if self.ffData.checkBox is not None:
                 self.__type__ = "Checkbox"
-            elif x.ffData.ddList is not None:
+            elif self.ffData.ddList is not None:
                 self.__type__ = "DropDown"
-            elif x.ffData.textInput is not None:
+            elif self.ffData.textInput is not None:
                 self.__type__ = "TextInput"
             else:
                 warn(
@@ -135,15 +240,17 @@ class fldChar(el):
         out = super(fldChar, self).to_json(doc, options, super_iter)
         from .paragraph import merge_run_contents
 
+        names = get_type_names(options)
+
         if self.__type__ == "Checkbox":
             checked = self.ffData.checkBox.props["checked"]
             if checked is None and options.get("use-checkbox-default", True):
                 checked = self.ffData.checkBox.props["default"]
-            value = None if checked is None else checked.val
+            value = checked
 
             if options.get("checkbox-as-text", False):
                 out.update(
-                    {"TYPE": "CT_Text", "VALUE": "[%s:%s]" % (self.__type__, value)}
+                    {"TYPE": names["CT_Text"], "VALUE": "[%s:%s]" % (self.__type__, value)}
                 )
                 return out
 
@@ -154,28 +261,29 @@ class fldChar(el):
                 return out
 
         elif self.__type__ == "DropDown":
-            _values = self.ffData.ddList.props["listEntry_lst"]
+            props = self.ffData.ddList.props
+            _values = props["listEntry_lst"]
 
             if options.get("trim-dropdown-options", True):
-                for _value in _values:
-                    _value.val = _value.val.strip()
+                _values = [_value.strip() for _value in _values]
+                props = dict(props, listEntry_lst=_values)
 
             if not _values:
                 value = None
             else:
-                _result = self.ffData.ddList.props["result"]
-                _default = self.ffData.ddList.props["default"]
+                _result = props["result"]
+                _default = props["default"]
                 if _result is None:
                     if _default is None:
-                        value = _values[0].val
+                        value = _values[0]
                     else:
-                        value = _values[_default.val].val
+                        value = _values[_default]
                 else:
-                    value = _values[_result.val].val
+                    value = _values[_result]
 
             if options.get("dropdown-as-text", False):
                 out.update(
-                    {"TYPE": "CT_Text", "VALUE": "[%s:%s]" % (self.__type__, value)}
+                    {"TYPE": names["CT_Text"], "VALUE": "[%s:%s]" % (self.__type__, value)}
                 )
                 return out
 
@@ -184,7 +292,7 @@ class fldChar(el):
                 out["VALUE"] = value
                 _update_from(
                     out,
-                    self.ffData.ddList.props,
+                    props,
                     ["default", "result", "listEntry_lst"],
                 )
                 out["options"] = out.pop("listEntry_lst")
@@ -192,7 +300,7 @@ class fldChar(el):
 
         elif self.__type__ == "TextInput":
 
-            _contents = [elt.to_json(doc, options) for elt in self.fieldResults]
+            _contents = self._contents_json(self.fieldResults, doc, options)
             contents = merge_run_contents(_contents, options)
             value = contents[0]["VALUE"] if len(contents) == 1 else contents
 
@@ -203,7 +311,7 @@ class fldChar(el):
                     )
                 out.update(
                     {
-                        "TYPE": "CT_Text",
+                        "TYPE": names["CT_Text"],
                         "VALUE": "[%s:%s]" % (contents[0]["VALUE"] if contents else ""),
                     }
                 )
@@ -221,20 +329,20 @@ class fldChar(el):
 
         else:
 
-            _contents = [elt.to_json(doc, options) for elt in self.fieldResults]
+            _contents = self._contents_json(self.fieldResults, doc, options)
             value = merge_run_contents(_contents, options)
             if options.get("flatten-generic-field", True):
                 out["VALUE"] = value
                 del out["fldCharType"]
                 return out
 
-        _contents = [elt.to_json(doc, options) for elt in self.fieldResults]
+        _contents = self._contents_json(self.fieldResults, doc, options)
         contents = merge_run_contents(_contents, options)
-        codes = [elt.to_json(doc, options) for elt in self.fieldCodes]
+        codes = self._contents_json(self.fieldCodes, doc, options)
 
         out.update(
             {
-                "TYPE": self.__type__,
+                "TYPE": names[self.__type__],
                 "VALUE": value,
                 "ffData": self.ffData.to_json(doc, options),
                 "fieldCodes": codes,
@@ -244,18 +352,27 @@ class fldChar(el):
 
         return out
 
+    def _contents_json(
+        self, elements: Sequence[el], doc, options: Dict[str, str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Coerce the field codes or results to JSON
+        """
+        out: List[Dict[str, Any]] = []
+        for elt in elements:
+            append_json(out, elt, elt.to_json(doc, options), options)
+        return out
+
     def update(self, other: el) -> bool:
         """
-        Update an incomplete field character
+        Update an incomplete field character.  A ``begin`` field character
+        is a complete field nested in this one.
         """
 
         if self.status == "complete":
             RuntimeError("Logic Error: Updating a completed field data")
 
         if isinstance(other, fldChar):
-            if other.props["fldCharType"] == "begin":
-                raise RuntimeError("Unhandled nesting of data fields")
-
             if other.props["fldCharType"] == "separate":
                 self.status = "fieldResults"
                 return False
@@ -270,6 +387,86 @@ class fldChar(el):
         return False
 
 
+class field_assembler:
+    """
+    Collects the contents of a paragraph (or of consecutive paragraphs) in a
+    single pass, assembling each complex field (``w:fldChar`` begin ...
+    separate ... end) into its ``fldChar`` element.
+
+    The open fields are kept on a stack, so that a field nested in the codes
+    or results of another (e.g. a REF within an IF) is collected into the
+    enclosing field.
+
+    :param doc: The document
+    :param options: The simplification options
+    :type options: Dict[str, str]
+    """
+
+    __slots__ = ("doc", "options", "contents", "fields")
+
+    contents: List[Dict[str, Any]]
+    fields: List[fldChar]
+
+    def __init__(self, doc, options: Dict[str, str]):
+        self.doc = doc
+        self.options = options
+        # THE JSON OF THE CONTENTS WHICH ARE COMPLETE
+        self.contents = []
+        # THE OPEN FIELDS, INNERMOST LAST
+        self.fields = []
+
+    def extend(self, elements: Iterable[el]) -> None:
+        """
+        Add the contents of a paragraph
+        """
+        doc = self.doc
+        options = self.options
+        fields = self.fields
+        for elt in elements:
+            if isinstance(elt, fldChar):
+                _type = elt.props["fldCharType"]
+                if _type == "begin":
+                    fields.append(elt)
+                    continue
+                if not fields:
+                    warn("Ignoring a '%s' field character outside of a field" % _type)
+                    continue
+                if _type == "separate":
+                    fields[-1].status = "fieldResults"
+                    continue
+                if _type == "end":
+                    field = fields.pop()
+                    field.status = "complete"
+                    if fields:
+                        # A FIELD NESTED IN THE ENCLOSING FIELD
+                        fields[-1].update(field)
+                    else:
+                        append_json(self.contents, field, field.to_json(doc, options), options)
+                    continue
+
+            if fields:
+                fields[-1].update(elt)
+            else:
+                self.contents.append(elt.to_json(doc, options))
+
+
+def append_json(
+    contents: List[Dict[str, Any]], elt: el, JSON: Dict[str, Any], options: Dict[str, str]
+) -> None:
+    """
+    Append the JSON of an element to ``contents``, flattening generic fields
+    (when ``flatten-generic-field`` is set) into their results
+    """
+    if (
+        isinstance(elt, fldChar)
+        and JSON.get("TYPE", None) == "generic-field"
+        and options.get("flatten-generic-field", True)
+    ):
+        contents.extend(JSON.get("VALUE", []))
+    else:
+        contents.append(JSON)
+
+
 def _update_from(x: Dict[str, Any], y: Dict[str, Any], attrs: Sequence[str]) -> None:
     """
     A utility function for copying attributes from one object to another
@@ -1,76 +1,52 @@
 """
 Elements which inherit from EG_PContent
 """
-from typing import Optional, Dict, List, Any, Sequence, Iterator
+from typing import Optional, Dict, List, Any, Sequence, Iterable, Iterator, Generator
 from warnings import warn
-from . import el, container
-from .form import fldChar
-from ..utils.paragrapy_style import get_paragraph_ind
+from lxml import etree
+from docx.oxml.ns import qn
+from . import container
+from .base import el
+from .form import field_assembler
+from .run_contents import simpleTextElement
+from ..utils.friendly_names import get_type_names
+from ..utils.paragrapy_style import (
+    get_paragraph_properties,
+    indentation_json,
+    numbering_json,
+    spacing_json,
+)
 
 class EG_PContent(container):
     """
     Base class for elements which with  EG_PContent
     """
 
+    __slots__ = ()
     def to_json(
         self, doc, options: Dict[str, str], super_iter: Optional[Iterator] = None
     ) -> Dict[str, Any]:
 
-        _fldChar = None
-        _fldChar: Optional[fldChar]
-        bare_contents = []
-
-        run_iterator = iter(self)
-        while True:
-
-            # ITERATE OVER THE PARAGRAPH CONTENTS
-            for elt in run_iterator:
-
-                if _fldChar is not None:
-                    finished: bool = _fldChar.update(elt)
-                    if finished:
-                        _fldchar_json = _fldChar.to_json(doc, options)
-
-                        if _fldchar_json.get(
-                            "TYPE", None
-                        ) == "generic-field" and options.get(
-                            "flatten-generic-field", True
-                        ):
-                            bare_contents.extend(_fldchar_json.get("VALUE", []))
-                        else:
-                            bare_contents.append(_fldchar_json)
-                        _fldChar = None
-                    continue
-
-                if isinstance(elt, fldChar):
-                    _fldChar = elt
-                    continue
-
-                bare_contents.append(elt.to_json(doc, options))
-
-            if _fldChar is not None:
-                # THE PARAGRAPH ENDED IN AN INCOMPLETE FORM-FIELD
-                if options.get("greedy-text-input", True):
-                    _next = super_iter.peek()
-                    if isinstance(super_iter.peek(), paragraph):
-                        # TODO: insert a line break into the text run...
-                        run_iterator = iter(super_iter.__next__())
-                    else:
-                        warn(
-                            "Paragraph ended with an un-closed form-field followed by a %s element: this may cause parsing to fail"
-                            % _next.__class__.__name__
-                        )
-                        break
-                else:
-                    warn(
-                        "Paragraph ended with an un-closed form-field: this may cause parsing to fail.  Consider setting 'greedy-text-input' to True."
-                    )
-                    break
-            else:
-                break
-
-        contents = merge_run_contents(bare_contents, options)
-        return {"TYPE": self.__type__, "VALUE": contents}
+        fields = field_assembler(doc, options)
+        fields.extend(self)
+        if fields.fields:
+            # THE ELEMENT ENDED IN AN INCOMPLETE FORM-FIELD, WHICH IS DROPPED
+            warn(
+                "%s ended with an un-closed form-field: this may cause parsing to fail"
+                % self.__class__.__name__
+            )
+        return self.contents_to_json(fields.contents, doc, options)
+
+    def contents_to_json(
+        self, contents: List[Dict[str, Any]], doc, options: Dict[str, str] # pylint: disable=unused-argument
+    ) -> Dict[str, Any]:
+        """
+        Coerce the element to JSON, given the JSON of its contents
+        """
+        return {
+            "TYPE": get_type_names(options)[self.__type__],
+            "VALUE": merge_run_contents(contents, options),
+        }
 
 
 def merge_run_contents(x: Sequence[Dict[str, Any]], options: Dict[str, str]):
@@ -78,112 +54,212 @@ def merge_run_contents(x: Sequence[Dict[str, Any]], options: Dict[str, str]):
     Merge a series of run contents as appropriate
     """
 
+    TEXT = get_type_names(options)["CT_Text"]
+    ignore_empty_text = options.get("ignore-empty-text", True)
+    merge_consecutive_text = options.get("merge-consecutive-text", True)
+
     out: List[Dict[str, Any]] = []
-    prev_data: Optional[Dict[str, Any]] = None
+    # the pieces of text to be joined into out[-1]["VALUE"] (empty unless
+    # out[-1] is text which may be merged with the text which follows it)
+    pieces: List[str] = []
     for data in x:
 
-        if (
-            options.get("ignore-empty-text", True)
-            and data["TYPE"] == "CT_Text"
-            and not data["VALUE"]
-        ):
+        is_text = data["TYPE"] == TEXT
+        if ignore_empty_text and is_text and not data["VALUE"]:
             continue
 
-        if not prev_data:
-            prev_data = data
-            out.append(data)
+        if pieces and is_text:
+            pieces.append(data["VALUE"])
             continue
 
-        if (
-            prev_data["TYPE"] == "CT_Text"
-            and data["TYPE"] == "CT_Text"
-            and options.get("merge-consecutive-text", True)
-        ):
-            prev_data["VALUE"] += data["VALUE"]
+        if len(pieces) > 1:
+            out[-1]["VALUE"] = "".join(pieces)
+        out.append(data)
+        pieces = [data["VALUE"]] if is_text and merge_consecutive_text else []
 
-        else:
-            prev_data = data
-            out.append(data)
+    if len(pieces) > 1:
+        out[-1]["VALUE"] = "".join(pieces)
 
     return out
 
 
-class numPr(el):
-    """
-    The paragraph numbering property
-    """
-
-    __type__ = "numPr"
-    __props__ = ["ilvl", "numId"]
-
-
-class indentation(el):
-    """
-    ``<w:ind>`` element, specifying paragraph indentation.
-    """
-
-    __type__ = "CT_Ind"
-    __props__ = ["left", "right", "firstLine", "hanging"]
-
-
 class paragraph(EG_PContent):  
     """ 
     Represents a simple paragraph
     """
 
+    __slots__ = ()
     __name__ = "CT_P"
     __type__ = "CT_P"
 
-    def to_json(
-        self, doc, options: Dict[str, str], super_iter: Optional[Iterator] = None
+    def contents_to_json(
+        self, contents: List[Dict[str, Any]], doc, options: Dict[str, str]
     ) -> Dict[str, Any]:
-        """Coerce a container object to JSON
+        """Coerce a paragraph to JSON, given the JSON of its contents
         """
-        out: Dict[str, Any] = super(paragraph, self).to_json(doc, options, super_iter)
+        out: Dict[str, Any] = super(paragraph, self).contents_to_json(contents, doc, options)
+
+        TEXT = get_type_names(options)["CT_Text"]
+
+        children: List[Dict[str, Any]] = out["VALUE"]
 
         if options.get("remove-leading-white-space", True):
-            children: List[Dict[str, Any]] = out["VALUE"]
-            while children:
-                if children[0]["TYPE"] != "CT_Text":
-                    break
-                first = children.pop(0)
-                first["VALUE"] = first["VALUE"].lstrip()
-                if first["VALUE"]:
-                    children.insert(0, first)
+            # DROP THE LEADING TEXT WHICH IS ALL WHITE SPACE, AND STRIP THE
+            # FIRST REMAINING TEXT
+            start = 0
+            while start < len(children) and children[start]["TYPE"] == TEXT:
+                value = children[start]["VALUE"].lstrip()
+                children[start]["VALUE"] = value
+                if value:
                     break
+                start += 1
+            del children[:start]
 
         if options.get("remove-trailing-white-space", True):
-            children = out["VALUE"]
-            while children:
-                if children[-1]["TYPE"] != "CT_Text":
-                    break
-                last = children.pop()
-                last["VALUE"] = last["VALUE"].rstrip()
-                if last["VALUE"]:
-                    children.append(last)
+            end = len(children)
+            while end and children[end - 1]["TYPE"] == TEXT:
+                value = children[end - 1]["VALUE"].rstrip()
+                children[end - 1]["VALUE"] = value
+                if value:
                     break
+                end -= 1
+            del children[end:]
 
-        if options.get("include-paragraph-indent", True):
-            _indent = get_paragraph_ind(self.fragment, doc)
-            if _indent is not None:
-                out["style"] = {"indent": indentation(_indent).to_json(doc, options)}
+        include_indent = options.get("include-paragraph-indent", True)
+        include_numbering = options.get("include-paragraph-numbering", True)
+        include_spacing = options.get("include-paragraph-spacing", False)
+        include_outline_level = options.get("include-paragraph-outline-level", False)
 
-        if (
-            options.get("include-paragraph-numbering", True)
-            and self.fragment.pPr is not None
-            and self.fragment.pPr.numPr is not None
-        ):
-            out["style"] = out.get("style", {})
-            out["style"]["numPr"] = numPr(self.fragment.pPr.numPr).to_json(doc, options)
+        if include_indent or include_numbering or include_spacing or include_outline_level:
+            props = get_paragraph_properties(self.fragment, doc)
+            style: Dict[str, Any] = {}
+
+            if include_indent:
+                _indent = indentation_json(props, options)
+                if _indent is not None:
+                    style["indent"] = _indent
+
+            if include_numbering:
+                _numPr = numbering_json(props, options)
+                if _numPr is not None:
+                    style["numPr"] = _numPr
+
+            if include_spacing:
+                _spacing = spacing_json(props, options)
+                if _spacing is not None:
+                    style["spacing"] = _spacing
+
+            if include_outline_level and props.outlineLvl is not None:
+                style["outlineLvl"] = int(props.outlineLvl)
+
+            if style:
+                out["style"] = style
 
         return out
 
 
+# THE LINE BREAK WHICH STANDS IN FOR THE END OF A PARAGRAPH WITHIN A FIELD
+__paragraph_break__ = simpleTextElement(etree.Element(qn("w:br")))
+
+
+class paragraph_assembler:
+    """
+    Coerces a sequence of blocks to JSON in a single pass.
+
+    A paragraph which ends within a complex field (e.g. a text input
+    containing line breaks) is continued, when ``greedy-text-input`` is set,
+    into the paragraphs which follow it, until the field is complete.  Those
+    paragraphs are merged into the first one, which is returned once it is
+    complete, and each paragraph mark within the results of the field
+    becomes a line break.
+
+    :param doc: The document
+    :param options: The simplification options
+    :type options: Dict[str, str]
+    """
+
+    __slots__ = ("doc", "options", "pending", "fields")
+
+    pending: Optional[paragraph]
+    fields: Optional[field_assembler]
+
+    def __init__(self, doc, options: Dict[str, str]):
+        self.doc = doc
+        self.options = options
+        # THE PARAGRAPH WAITING FOR THE END OF A FIELD, AND ITS CONTENTS
+        self.pending = None
+        self.fields = None
+
+    def feed(self, block: el) -> List[Dict[str, Any]]:
+        """
+        Coerce the next block to JSON, returning the JSON of the blocks which
+        are complete
+        """
+        if not isinstance(block, paragraph):
+            out = self.flush(block)
+            out.append(block.to_json(self.doc, self.options))
+            return out
+
+        if self.pending is not None:
+            field = self.fields.fields[-1]
+            if field.status == "fieldResults":
+                field.update(__paragraph_break__)
+            self.fields.extend(block)
+            if self.fields.fields:
+                return []
+            return [self._complete()]
+
+        fields = field_assembler(self.doc, self.options)
+        fields.extend(block)
+        if fields.fields:
+            if self.options.get("greedy-text-input", True):
+                self.pending = block
+                self.fields = fields
+                return []
+            warn(
+                "Paragraph ended with an un-closed form-field: this may cause parsing to fail.  Consider setting 'greedy-text-input' to True."
+            )
+        return [block.contents_to_json(fields.contents, self.doc, self.options)]
+
+    def flush(self, following: Optional[el] = None) -> List[Dict[str, Any]]:
+        """
+        Return the JSON of the paragraph waiting for the end of a field (if
+        any), dropping the incomplete field, when the paragraphs are followed
+        by ``following`` or by the end of the blocks
+        """
+        if self.pending is None:
+            return []
+        warn(
+            "Paragraph ended with an un-closed form-field followed by %s: this may cause parsing to fail"
+            % ("the end of its container" if following is None
+               else ("a %s element" % following.__class__.__name__))
+        )
+        return [self._complete()]
+
+    def iter_json(self, blocks: Iterable[el]) -> Generator[Dict[str, Any], None, None]:
+        """
+        Coerce each of the blocks to JSON, yielding each as soon as it is
+        complete
+        """
+        for block in blocks:
+            for JSON in self.feed(block):
+                yield JSON
+        for JSON in self.flush():
+            yield JSON
+
+    def _complete(self) -> Dict[str, Any]:
+        JSON = self.pending.contents_to_json(self.fields.contents, self.doc, self.options)
+        self.pending = None
+        self.fields = None
+        return JSON
+
+
 class hyperlink(EG_PContent):  
     """
     The hyperlink element
     """
 
+    __slots__ = ()
     __type__ = "CT_Hyperlink"
     __props__ = ["anchor", "docLocatoin", "history", "id", "tgtFrame", "tooltip"]
 
@@ -193,6 +269,7 @@ class fldSimple(EG_PContent):
     The SimpleField element
     """
 
+    __slots__ = ()
     __type__ = "CT_SimpleField"
     __props__ = ["instr", "fldLock", "dirty"]
 
@@ -202,6 +279,7 @@ class customXml(container):
     The customXml element
     """
 
+    __slots__ = ()
     __name__ = "CustomXmlRun"
     __type__ = "CT_CustomXmlRun"
     __props__ = ["element"]
@@ -212,6 +290,7 @@ class smartTag(container):
     The smartTag element
     """
 
+    __slots__ = ()
     __name__ = "CT_SmartTagRun"
     __type__ = "EG_PContent"
     __props__ = ["element", "uri"]
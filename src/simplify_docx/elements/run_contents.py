@@ -3,23 +3,137 @@
 Run level elements
 """
 import re
-from typing import Dict, Any, Iterator, Optional
+import unicodedata
+from functools import lru_cache
+from operator import itemgetter
+from typing import Dict, Any, Iterator, Optional, Callable, Tuple, Sequence
 from docx.oxml.ns import qn
 from ..types import xmlFragment
 from . import el  # , IncompatibleTypeError
+from ..utils.friendly_names import get_type_names
 
 RE_SPACES = re.compile("  +", re.IGNORECASE)
 
+# Text normalizations in order of application, along with their defaults.
+# Where a character appears in more than one translation, the first enabled
+# translation wins.
+__text_translations__: Sequence[Tuple[str, bool, Dict[str, str]]] = (
+    (
+        "dumb-quotes",
+        True,
+        {
+            u"\u2018": "'",
+            u"\u2019": "'",
+            u"\u201a": "'",
+            u"\u201b": "'",
+            u"\u201c": '"',
+            u"\u201d": '"',
+        },
+    ),
+    (
+        "dumb-spaces",
+        True,
+        {
+            u"\u2000": " ",
+            u"\u2001": " ",
+            u"\u2002": " ",
+            u"\u2003": " ",
+            u"\u2004": " ",
+            u"\u2005": " ",
+            u"\u2006": " ",
+            u"\u2007": " ",
+            u"\u2008": " ",
+            u"\u2009": " ",
+            u"\u200A": " ",
+            u"\u201B": " ",
+        },
+    ),
+    (
+        "dumb-hyphens",
+        True,
+        {
+            u"\u2010": "-",
+            u"\u2011": "-",
+            u"\u2012": "-",
+            u"\u2013": "-",
+            u"\u2014": "-",
+            u"\u2015": "-",
+            u"\u00A0": "-",
+        },
+    ),
+    ("ignore-joiners", True, {u"\u200C": "", u"\u200D": ""}),
+    ("ignore-left-to-right-mark", False, {u"\u200E": ""}),
+    ("ignore-right-to-left-mark", False, {u"\u200F": ""}),
+)
+
+__text_options__: Sequence[Tuple[str, bool]] = tuple(
+    (name, default) for name, default, _ in __text_translations__
+) + (("normalize-nfkc", False), ("flatten-inner-spaces", True))
+
+
+__get_text_key__ = itemgetter(*(name for name, _ in __text_options__))
+
+
+def get_text_normalizer(options: Dict[str, Any]) -> Callable[[str], str]:
+    """
+    Get the function which applies the enabled text normalizations to a
+    string.  The normalizer is compiled once per set of text option values.
+    """
+    try:
+        key = __get_text_key__(options)
+    except KeyError:
+        key = tuple(options.get(name, default) for name, default in __text_options__)
+    return __compile_text_normalizer__(key)
+
+
+@lru_cache(maxsize=32)
+def __compile_text_normalizer__(key: Tuple[Any, ...]) -> Callable[[str], str]:
+    """
+    Compile the enabled normalizations into a single translation table
+    (followed by optional NFKC normalization and inner-space flattening).
+
+    Every translated character is non-ASCII, so ASCII text skips the table
+    entirely.  Otherwise each character of the table which is present is
+    replaced in turn, which is faster in CPython than ``str.translate()``
+    (or a regex with a replacement function) because ``str.replace()`` uses
+    a fast search for single characters.
+    """
+    enabled = dict(zip((name for name, _ in __text_options__), key))
+
+    table: Dict[str, str] = {}
+    for name, _, translation in __text_translations__:
+        if enabled[name]:
+            for char, replacement in translation.items():
+                table.setdefault(char, replacement)
+
+    replacements = tuple(table.items())
+    nfkc = enabled["normalize-nfkc"]
+    flatten = enabled["flatten-inner-spaces"]
+
+    def normalize(value: str) -> str:
+        if not value.isascii():
+            for char, replacement in replacements:
+                if char in value:
+                    value = value.replace(char, replacement)
+            if nfkc:
+                value = unicodedata.normalize("NFKC", value)
+        if flatten:
+            value = RE_SPACES.sub(" ", value)
+        return value
+
+    return normalize
+
 
 class empty(el):
     """
     Generic for CT_Empty elements
     """
 
+    __slots__ = ()
     __type__: str
 
-    def __init__(self, x: xmlFragment):
-        super(empty, self).__init__(x)
+    def __init__(self, x: xmlFragment, iterators=None):
+        super(empty, self).__init__(x, iterators)
         self.__type__ = x.tag.split("}")[-1]
 
     def to_json(
@@ -29,9 +143,9 @@ class empty(el):
         coerce an object to JSON
         """
         if options.get("empty-as-text", False):
-            return {"TYPE": "CT_Text", "VALUE": "[w:%s]" % self.__type__}
+            return {"TYPE": get_type_names(options)["CT_Text"], "VALUE": "[w:%s]" % self.__type__}
 
-        return {"TYPE": "CT_Empty", "VALUE": "[w:%s]" % self.__type__}
+        return {"TYPE": get_type_names(options)["CT_Empty"], "VALUE": "[w:%s]" % self.__type__}
 
 
 # settings to be imported at a later time
@@ -47,11 +161,12 @@ class text(el):
     A Text element
     """
 
+    __slots__ = ("value",)
     __type__: str
     value: str
 
-    def __init__(self, x: xmlFragment):
-        super(text, self).__init__(x)
+    def __init__(self, x: xmlFragment, iterators=None):
+        super(text, self).__init__(x, iterators)
         self.__type__ = x.tag.split("}")[-1]
         if x.text is None:
             self.value = ""
@@ -64,57 +179,10 @@ class text(el):
         """
         coerce an object to JSON
         """
-
-        _value = self.value
-        if options.get("dumb-quotes", True):
-            _value = (
-                _value.replace(u"\u2018", "'")
-                .replace(u"\u2019", "'")
-                .replace(u"\u201a", "'")
-                .replace(u"\u201b", "'")
-            )
-            _value = _value.replace(u"\u201c", '"').replace(u"\u201d", '"')
-
-        if options.get("dumb-spaces", True):
-            _value = (
-                _value.replace(u"\u2000", " ")
-                .replace(u"\u2001", " ")
-                .replace(u"\u2002", " ")
-                .replace(u"\u2003", " ")
-                .replace(u"\u2004", " ")
-                .replace(u"\u2005", " ")
-                .replace(u"\u2006", " ")
-                .replace(u"\u2007", " ")
-                .replace(u"\u2008", " ")
-                .replace(u"\u2009", " ")
-                .replace(u"\u200A", " ")
-                .replace(u"\u201B", " ")
-            )
-
-        if options.get("dumb-hyphens", True):
-            _value = (
-                _value.replace(u"\u2010", "-")
-                .replace(u"\u2011", "-")
-                .replace(u"\u2012", "-")
-                .replace(u"\u2013", "-")
-                .replace(u"\u2014", "-")
-                .replace(u"\u2015", "-")
-                .replace(u"\u00A0", "-")
-            )
-
-        if options.get("ignore-joiners", True):
-            _value = _value.replace(u"\u200C", "").replace(u"\u200D", "")
-
-        if options.get("flatten-inner-spaces", True):
-            _value = RE_SPACES(" ", _value)
-
-        if options.get("ignore-left-to-right-mark", False):
-            _value = _value.replace(u"\u200E", "")
-
-        if options.get("ignore-right-to-left-mark", False):
-            _value = _value.replace(u"\u200F", "")
-
-        return {"TYPE": "CT_Text", "VALUE": _value}
+        return {
+            "TYPE": get_type_names(options)["CT_Text"],
+            "VALUE": get_text_normalizer(options)(self.value),
+        }
 
 
 class SymbolChar(el):
@@ -122,12 +190,13 @@ class SymbolChar(el):
     it's an element in which the font is significant.
     """
 
+    __slots__ = ("char", "font")
     __type__ = "SymbolChar"
     char: str
     font: str
 
-    def __init__(self, x):
-        super(SymbolChar, self).__init__(x)
+    def __init__(self, x, iterators=None):
+        super(SymbolChar, self).__init__(x, iterators)
         self.char = x.get(qn("w:char"))
         self.font = x.get(qn("w:font"))
 
@@ -138,9 +207,9 @@ class SymbolChar(el):
         coerce an object to JSON
         """
         if options.get("symbol-as-text", True):
-            return {"TYPE": "CT_Text", "VALUE": self.char}
+            return {"TYPE": get_type_names(options)["CT_Text"], "VALUE": self.char}
 
-        return {"TYPE": self.__type__, "VALUE": {"char": self.char, "font": self.font}}
+        return {"TYPE": get_type_names(options)[self.__type__], "VALUE": {"char": self.char, "font": self.font}}
 
 
 simpleTextElementText = {
@@ -168,13 +237,17 @@ class simpleTextElement(el):
     A simple text element represented by a CT_Empty
     """
 
-    def __init__(self, x: xmlFragment):
-        super(simpleTextElement, self).__init__(x)
+    __slots__ = ()
+    def __init__(self, x: xmlFragment, iterators=None):
+        super(simpleTextElement, self).__init__(x, iterators)
         self.__type__ = tagToTypeMap[x.tag]
 
     def to_json(self, doc, options=None, super_iter: Optional[Iterator] = None):
 
         if options.get("special-characters-as-text", True):
-            return {"TYPE": "CT_Text", "VALUE": simpleTextElementText[self.__type__]}
+            return {
+                "TYPE": get_type_names(options)["CT_Text"],
+                "VALUE": simpleTextElementText[self.__type__],
+            }
 
-        return {"TYPE": self.__type__}
+        return {"TYPE": get_type_names(options)[self.__type__]}
@@ -1,10 +1,13 @@
 """
 Table elements
 """
-from typing import Dict, Any, Optional, Iterator
-from more_itertools import peekable
+from typing import Dict, Any, Callable, Optional, Iterator, Iterable, List, Tuple
 from docx.oxml.ns import qn
 from . import container
+from .paragraph import paragraph_assembler
+from ..types import xmlFragment
+from ..utils.friendly_names import get_type_names
+from .run_contents import get_text_normalizer
 
 
 class tc(container):
@@ -12,30 +15,44 @@ class tc(container):
     A table cell
     """
 
+    __slots__ = ()
     __type__ = "CT_Tc"
     __friendly__ = "table-cell"
 
-    def to_json(
+    def _open_json(
         self, doc, options: Dict[str, str] = None, super_iter: Optional[Iterator] = None
-    ) -> Dict[str, Any]:
+    ):
         """
-        Coerce a container object to JSON
+        The cell's paragraphs are coerced to JSON by a ``paragraph_assembler``
+        so that form fields may span paragraphs
         """
-        contents = []
-        iter_me = peekable(self)
-        for elt in iter_me:
-            JSON = elt.to_json(doc, options, iter_me)
-
-            if (
-                JSON["TYPE"] == "CT_P"
-                and options.get("ignore-empty-paragraphs", False)
-                and not JSON["VALUE"]
-            ):
-                continue
+        out: Dict[str, Any] = {
+            "TYPE": get_type_names(options)[self.__type__],
+            "VALUE": [],
+        }
+        return self, out, iter(self), paragraph_assembler(doc, options)
 
-            contents.append(JSON)
+    def _accept_json(
+        self, out: Dict[str, Any], JSON: Dict[str, Any], options: Dict[str, str]
+    ) -> None:
+        if (
+            JSON["TYPE"] == get_type_names(options)["CT_P"]
+            and options.get("ignore-empty-paragraphs", False)
+            and not JSON["VALUE"]
+        ):
+            return
+        out["VALUE"].append(JSON)
 
-        out: Dict[str, Any] = {"TYPE": self.__type__, "VALUE": contents}
+    def _close_json(
+        self, out: Dict[str, Any], doc, options: Dict[str, str]
+    ) -> Dict[str, Any]:
+        if options.get("table-as-grid", False):
+            # THE CELL'S PLACE IN THE GRID, WHICH IS RESOLVED BY THE TABLE
+            tcPr = self.fragment.find(qn("w:tcPr"))
+            out["gridSpan"] = _int_val(tcPr, "w:gridSpan", 1)
+            vMerge = None if tcPr is None else tcPr.find(qn("w:vMerge"))
+            if vMerge is not None:
+                out["vMerge"] = vMerge.get(qn("w:val"), "continue")
         return out
 
 
@@ -44,23 +61,31 @@ class tr(container):
     A table row
     """
 
+    __slots__ = ()
     __type__ = "CT_Row"
     __friendly__ = "table-row"
 
+    def _close_json(
+        self, out: Dict[str, Any], doc, options: Dict[str, str]
+    ) -> Dict[str, Any]:
+        if options.get("table-as-grid", False):
+            trPr = self.fragment.find(qn("w:trPr"))
+            out["gridBefore"] = _int_val(trPr, "w:gridBefore", 0)
+        return out
+
 
 class table(container):
     """
     A Table object
     """
 
+    __slots__ = ()
     __type__ = "CT_Tbl"
     __friendly__ = "table"
 
-    def to_json(
-        self, doc, options: Dict[str, str] = None, super_iter: Optional[Iterator] = None
+    def _close_json(
+        self, out: Dict[str, Any], doc, options: Dict[str, str]
     ) -> Dict[str, Any]:
-        out = super(table, self).to_json(doc, options, super_iter)
-
         _caption = self.fragment.tblPr.find(qn("w:tblCaption"))
         if _caption is not None:
             if (not _caption.val) and options.get("ignore-empty-table-caption", True):
@@ -76,4 +101,237 @@ class table(container):
                 pass
             else:
                 out["tblDescription"] = _desc.val
+
+        if options.get("table-as-grid", False):
+            _resolve_grid(out, self.fragment, options)
         return out
+
+
+def _int_val(parent: Optional[xmlFragment], tag: str, default: int) -> int:
+    """
+    The integer ``w:val`` of the child ``tag`` of ``parent``
+    """
+    child = None if parent is None else parent.find(qn(tag))
+    if child is None:
+        return default
+    try:
+        return int(child.get(qn("w:val")))
+    except (TypeError, ValueError):
+        return default
+
+
+def _cell_text(cell: Dict[str, Any], names: Dict[str, str]) -> str:
+    """
+    The text of a cell: the text of each paragraph (or the rows of each
+    nested table) on its own line
+    """
+    PARAGRAPH = names["CT_P"]
+    TEXT = names["CT_Text"]
+    TABLE = names["CT_Tbl"]
+    lines = []
+    for block in cell["VALUE"]:
+        if block["TYPE"] == PARAGRAPH:
+            lines.append(
+                "".join(elt["VALUE"] for elt in block["VALUE"] if elt["TYPE"] == TEXT)
+            )
+        elif block["TYPE"] == TABLE:
+            lines.extend(
+                "\t".join(text or "" for text in row) for row in block["VALUE"]
+            )
+    return "\n".join(lines)
+
+
+def _resolve_grid(out: Dict[str, Any], tbl: xmlFragment, options: Dict[str, str]) -> None:
+    """
+    Replace the rows of a table's JSON with the text of its cells laid out
+    on the table grid (see ``grid_layout()``).  The merged cells are listed
+    in ``spans`` as ``[row, column, rows, columns]``.
+    """
+    names = get_type_names(options)
+    ROW = names["CT_Row"]
+    CELL = names["CT_Tc"]
+
+    grid = tbl.find(qn("w:tblGrid"))
+    matrix, cells, cols = grid_layout(
+        (
+            (
+                row.get("gridBefore", 0),
+                (
+                    (_cell_text(cell, names), cell.get("gridSpan", 1), cell.get("vMerge", None))
+                    for cell in row["VALUE"]
+                    if cell["TYPE"] == CELL
+                ),
+            )
+            for row in out["VALUE"]
+            if row["TYPE"] == ROW
+        ),
+        0 if grid is None else len(grid.findall(qn("w:gridCol"))),
+    )
+
+    del out["VALUE"]
+    out.update(
+        {
+            "rows": len(matrix),
+            "cols": cols,
+            "VALUE": matrix,
+            "spans": [cell for cell in cells if cell[2] > 1 or cell[3] > 1],
+        }
+    )
+
+
+GridRow = Tuple[int, Iterable[Tuple[str, int, Optional[str]]]]
+
+
+def grid_layout(
+    rows: Iterable[GridRow], cols: int = 0
+) -> Tuple[List[List[Optional[str]]], List[List[int]], int]:
+    """
+    Lay out the text of the cells of a table on the table grid.
+
+    Cells spanning several grid columns (``w:gridSpan``) or continuing the
+    cell above (``w:vMerge``) are merged, and their text is placed at the
+    top left of the merged cell; the other places which it covers (and the
+    places not covered by any cell) are ``None``.
+
+    :param rows: The ``w:gridBefore`` of each row, and the text,
+            ``w:gridSpan`` and ``w:vMerge`` value of each of its cells
+    :param cols: The number of columns in the ``w:tblGrid``
+    :return: The text of each place in the grid, the ``[row, column, rows,
+            columns]`` of each cell, and the number of columns
+    """
+    matrix: List[List[Optional[str]]] = []
+    # [ROW, COLUMN, ROWS, COLUMNS] OF EACH CELL
+    cells: List[List[int]] = []
+    # THE CELL WHICH COVERS EACH COLUMN OF THE PREVIOUS ROW
+    above: List[Optional[List[int]]] = []
+    for gridBefore, row in rows:
+        r = len(matrix)
+        texts: List[Optional[str]] = [None] * gridBefore
+        covering: List[Optional[List[int]]] = [None] * len(texts)
+        for text, span, vMerge in row:
+            c = len(texts)
+            span = max(span, 1)
+            anchor = above[c] if c < len(above) else None
+            if vMerge == "continue" and anchor is not None and anchor[1] == c:
+                # EXTEND THE CELL ABOVE INTO THIS ROW
+                anchor[2] = r - anchor[0] + 1
+                if text:
+                    top = matrix[anchor[0]]
+                    top[c] = text if not top[c] else top[c] + "\n" + text
+                texts.extend([None] * span)
+            else:
+                anchor = [r, c, 1, span]
+                cells.append(anchor)
+                texts.append(text)
+                texts.extend([None] * (span - 1))
+            covering.extend([anchor] * span)
+        matrix.append(texts)
+        above = covering
+        cols = max(cols, len(texts))
+
+    for texts in matrix:
+        texts.extend([None] * (cols - len(texts)))
+    return matrix, cells, cols
+
+
+# THE OPTIONS UNDER WHICH THE TEXT OF A PLAIN PARAGRAPH IS ITS STRIPPED TEXT
+__plain_text_options__ = (
+    "ignore-empty-text",
+    "merge-consecutive-text",
+    "remove-leading-white-space",
+    "remove-trailing-white-space",
+)
+
+
+# THE CHILDREN OF A TABLE, ROW, CELL AND PARAGRAPH WHICH HAVE NO TEXT
+__plain_ignored__ = frozenset(
+    qn(tag)
+    for tag in (
+        "w:tblPr",
+        "w:tblGrid",
+        "w:tblPrEx",
+        "w:pPr",
+        "w:proofErr",
+        "w:bookmarkStart",
+        "w:bookmarkEnd",
+    )
+)
+_TR, _TC, _P, _R, _T = qn("w:tr"), qn("w:tc"), qn("w:p"), qn("w:r"), qn("w:t")
+_TRPR, _TCPR, _RPR, _VMERGE = qn("w:trPr"), qn("w:tcPr"), qn("w:rPr"), qn("w:vMerge")
+
+
+def plain_text_grid(
+    tbl: xmlFragment, options: Dict[str, str]
+) -> Optional[Tuple[List[List[Optional[str]]], int]]:
+    """
+    The text of the cells of a table laid out on the table grid (as by the
+    ``table-as-grid`` option) and the number of columns, read directly from
+    the XML.  This is only possible when every cell holds nothing but
+    paragraphs of plain runs of text (no fields, revisions, nested tables,
+    tabs, etc.); ``None`` is returned for any other table.
+    """
+    if not all(options.get(name, True) for name in __plain_text_options__):
+        return None
+    normalize = get_text_normalizer(options)
+    ignore_empty = options.get("ignore-empty-paragraphs", False)
+
+    rows: List[GridRow] = []
+    for row in tbl:
+        if row.tag != _TR:
+            if row.tag in __plain_ignored__:
+                continue
+            return None
+        gridBefore = 0
+        cells: List[Tuple[str, int, Optional[str]]] = []
+        for cell in row:
+            if cell.tag == _TC:
+                _cell = _plain_cell(cell, normalize, ignore_empty)
+                if _cell is None:
+                    return None
+                cells.append(_cell)
+            elif cell.tag == _TRPR:
+                gridBefore = _int_val(cell, "w:gridBefore", 0)
+            elif cell.tag not in __plain_ignored__:
+                return None
+        rows.append((gridBefore, cells))
+
+    grid = tbl.find(qn("w:tblGrid"))
+    matrix, _, cols = grid_layout(
+        rows, 0 if grid is None else len(grid.findall(qn("w:gridCol")))
+    )
+    return matrix, cols
+
+
+def _plain_cell(
+    cell: xmlFragment, normalize: Callable[[str], str], ignore_empty: bool
+) -> Optional[Tuple[str, int, Optional[str]]]:
+    """
+    The text, ``w:gridSpan`` and ``w:vMerge`` value of a cell which holds
+    nothing but plain text, and ``None`` for any other cell
+    """
+    span, vMerge = 1, None
+    lines = []
+    for par in cell:
+        if par.tag != _P:
+            if par.tag != _TCPR:
+                return None
+            span = _int_val(par, "w:gridSpan", 1)
+            _vMerge = par.find(_VMERGE)
+            if _vMerge is not None:
+                vMerge = _vMerge.get(qn("w:val"), "continue")
+            continue
+        pieces = []
+        for run in par:
+            if run.tag != _R:
+                if run.tag in __plain_ignored__:
+                    continue
+                return None
+            for child in run:
+                if child.tag == _T:
+                    pieces.append(normalize(child.text or ""))
+                elif child.tag != _RPR:
+                    return None
+        line = "".join(pieces).strip()
+        if line or not ignore_empty:
+            lines.append(line)
+    return "\n".join(lines), span, vMerge
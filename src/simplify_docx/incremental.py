@@ -0,0 +1,156 @@
+"""
+Incremental re-simplification of edited documents
+"""
+import hashlib
+import json
+from typing import Any, Dict, List, NamedTuple, Optional
+from lxml import etree
+
+from .elements import document, body, paragraph, paragraph_assembler, table
+from .elements.base import el
+from .related import related_session
+from .utils.friendly_names import get_type_names
+from .utils.paragrapy_style import refresh_style_index, style_elements
+
+
+class incremental_result(NamedTuple):
+    """
+    A simplified document, along with what is needed to re-simplify it
+    incrementally after it has been edited
+    """
+
+    document: Dict[str, Any]  # the simplified document
+    blocks: Dict[bytes, str]  # the JSON text of the simplified blocks by block digest
+    context: str  # digest of the styles, numbering and options
+    reused: int  # the number of blocks reused (from the previous result or
+    # an identical block earlier in the document)
+    computed: int  # the number of blocks which were simplified
+
+
+def _digest(*parts: Optional[bytes]) -> bytes:
+    digest = hashlib.blake2b(digest_size=20)
+    for part in parts:
+        if part is None:
+            digest.update(b"\0")
+        else:
+            digest.update(b"%d\0" % len(part))
+            digest.update(part)
+    return digest.digest()
+
+
+def context_digest(doc, options: Dict[str, Any]) -> str:
+    """
+    A digest of everything besides the block itself which determines the
+    simplified form of a paragraph or table: the styles, the numbering and
+    the options
+    """
+    return _digest(
+        *(
+            None if element is None else etree.tostring(element)
+            for element in style_elements(doc)
+        ),
+        json.dumps(options, sort_keys=True).encode("utf-8"),
+    ).hex()
+
+
+class incremental_assembler(paragraph_assembler):
+    """
+    A ``paragraph_assembler`` which reuses the JSON of the paragraphs and
+    tables whose digest is among the ``known`` blocks (or those of an
+    identical block earlier in the document), and records the JSON of the
+    blocks in ``blocks``.
+
+    :param doc: The document
+    :param options: The simplification options
+    :type options: Dict[str, str]
+    :param session: The ``related_session`` of the simplification
+    :type session: related_session
+    :param known: The JSON text of the blocks of a previous result
+    :type known: Dict[bytes, str]
+    """
+
+    __slots__ = ("session", "known", "blocks", "reused", "computed")
+
+    def __init__(
+        self, doc, options: Dict[str, str], session: related_session, known: Dict[bytes, str]
+    ):
+        super().__init__(doc, options)
+        self.session = session
+        self.known = known
+        self.blocks: Dict[bytes, str] = {}
+        self.reused = 0
+        self.computed = 0
+
+    def block_digest(self, block: el) -> bytes:
+        """
+        A digest of the XML of a block and of the related parts (e.g.
+        subDocs) to which it refers
+        """
+        return _digest(
+            etree.tostring(block.fragment),
+            self.session.related_digest(self.doc, block.fragment),
+        )
+
+    def feed(self, block: el) -> List[Dict[str, Any]]:
+        key = None
+        if isinstance(block, (paragraph, table)):
+            key = self.block_digest(block)
+            if self.pending is None:
+                text = self.known.get(key) or self.blocks.get(key)
+                if text is not None:
+                    self.reused += 1
+                    self.blocks[key] = text
+                    # EACH USE OF A BLOCK GETS ITS OWN COPY
+                    return [json.loads(text)]
+
+        merged = self.pending is not None and isinstance(block, paragraph)
+        out = super().feed(block)
+        self.computed += 1
+        if key is not None and out and not merged and self.pending is None:
+            # THE LAST BLOCK IS THIS ONE, AND IT IS COMPLETE ON ITS OWN
+            self.blocks[key] = json.dumps(out[-1])
+        return out
+
+
+def incremental_simplify(
+    simplifier, doc, previous: Optional[incremental_result] = None
+) -> incremental_result:
+    """
+    Simplify a document, re-using the simplified paragraphs and tables of
+    ``previous`` whose XML is unchanged
+
+    Each top-level paragraph and table is identified by a digest of its XML
+    (which includes Word's ``w14:paraId`` and ``w14:textId`` stamps) and of
+    the related parts it refers to, and its previous JSON is reused whenever
+    the digest, the styles, the numbering and the options are all
+    unchanged.  Paragraphs joined by a form field which spans them are
+    always re-simplified.
+    """
+    options = simplifier.options
+    names = get_type_names(options)
+
+    context = context_digest(doc, options)
+    refresh_style_index(doc)
+    known = previous.blocks if previous is not None and previous.context == context else {}
+    iterators = simplifier.session_iterators()
+    assembler = incremental_assembler(doc, options, iterators.session, known)
+
+    children: List[Dict[str, Any]] = []
+    for elt in document(doc.element, iterators):
+        if isinstance(elt, body):
+            children.append(
+                {
+                    "TYPE": names["CT_Body"],
+                    "VALUE": list(elt.iter_json(doc, options, assembler)),
+                }
+            )
+        else:
+            children.append(elt.to_json(doc, options))
+
+    return incremental_result(
+        {"TYPE": names["CT_Document"], "VALUE": children},
+        assembler.blocks,
+        context,
+        assembler.reused,
+        assembler.computed,
+    )
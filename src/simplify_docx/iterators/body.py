@@ -27,7 +27,7 @@ register_iterator(
         qn("w:customXmlMoveToRangeStart"): "Ignoring Revision Tags",
         qn("w:customXmlMoveToRangeEnd"): "Ignoring Revision Tags",
     },
-    TAGS_TO_SKIP={qn("w:moveFromRangeStart"): ("id", qn("w:MoveFromRangeEnd"))},
+    TAGS_TO_SKIP={qn("w:moveFromRangeStart"): (qn("w:id"), qn("w:moveFromRangeEnd"))},
 )
 
 # RUN LEVEL LEMENTS
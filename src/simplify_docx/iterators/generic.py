@@ -3,6 +3,7 @@ Generic XML iterators
 """
 # pylint: disable=too-many-arguments, too-many-branches
 
+from bisect import bisect_right
 from warnings import warn
 from typing import (
         Optional,
@@ -14,11 +15,13 @@ from typing import (
         NewType,
         Callable,
         Generator,
-        List
+        List,
+        Any,
+        Iterable,
+        Iterator,
 )
 from ..elements.base import el
 from ..types import xmlFragment
-from ..utils.tag import get_tag
 from ..utils.warnings import UnexpectedElementWarning
 
 FragmentIterator = NewType('FragmentIterator',
@@ -36,8 +39,12 @@ class ElementHandlers(NamedTuple):
     TAGS_TO_WARN: Optional[Dict[str, str]]
     TAGS_TO_SKIP: Optional[Dict[str, Tuple[str, str]]]
     extends: Optional[Sequence[str]]
+    dispatch: Optional[Dict[str, Tuple[int, Any]]]
 
-ElementHandlers.__new__.__defaults__ = (None,)* 6 # https://stackoverflow.com/questions/11351032/
+ElementHandlers.__new__.__defaults__ = (None,)* 7 # https://stackoverflow.com/questions/11351032/
+
+# DISPATCH ACTIONS
+YIELD, NEST, YIELD_AND_NEST, WARN, IGNORE, SKIP = range(6)
 
 __definitions__: Dict[str, ElementHandlers] = {}
 __built__: Dict[str, ElementHandlers] = {}
@@ -50,17 +57,24 @@ def register_iterator(name: str,
                       TAGS_TO_SKIP: Dict[str, Tuple[str, str]] = None,
                       extends: Optional[Sequence[str]] = None,
                       check_name: bool = True,
+                      definitions: Optional[Dict[str, ElementHandlers]] = None,
                      ) -> None:
     """ 
     An opinionated iterator which ignores deleted and moved resources, and
     passes through in-line revision containers such as InsertedRun, and
     orientation elements like bookmarks, comments, and permissions
+
+    The iterator is registered globally unless a ``definitions`` dictionary is
+    provided.
     """
 
-    if check_name and name in __definitions__:
+    if definitions is None:
+        definitions = __definitions__
+
+    if check_name and name in definitions:
         raise ValueError("iterator named '%s' already registered" % name)
 
-    __definitions__[name] = ElementHandlers(
+    definitions[name] = ElementHandlers(
             TAGS_TO_YIELD,
             TAGS_TO_NEST,
             TAGS_TO_IGNORE,
@@ -69,21 +83,29 @@ def register_iterator(name: str,
             extends=extends
             )
 
-def build_iterators() -> None:
+def build_iterators(
+        definitions: Optional[Dict[str, ElementHandlers]] = None
+) -> Dict[str, ElementHandlers]:
     """
     Build the iterators for the current iteration
+
+    The resolved handlers are returned as a new dictionary which is not shared
+    with any other caller; use ``use_iterators()`` to make them the default
+    iterators for ``xml_iter()``.
     """
 
-    _resovled: List[str] = []
+    if definitions is None:
+        definitions = __definitions__
+
+    built: Dict[str, ElementHandlers] = {}
     def _resolve(x: str):
 
-        if x in _resovled:
+        if x in built:
             return
 
-        xdef = __definitions__[x]
+        xdef = definitions[x]
         if not xdef.extends:
-            __built__[x] = xdef
-            _resovled.append(x)
+            built[x] = xdef._replace(dispatch=compile_dispatch(xdef))
             return
 
         TAGS_TO_YIELD = dict(xdef.TAGS_TO_YIELD) if xdef.TAGS_TO_YIELD else {}
@@ -99,7 +121,7 @@ def build_iterators() -> None:
                 msg = "Iterator for '%s' depends on undefined group '%s'" % (x, dependency,)
                 raise RuntimeError(msg)
 
-            ddef = __built__[dependency]
+            ddef = built[dependency]
             if ddef.TAGS_TO_YIELD:
                 TAGS_TO_YIELD.update(ddef.TAGS_TO_YIELD)
             if ddef.TAGS_TO_NEST:
@@ -111,106 +133,202 @@ def build_iterators() -> None:
             if ddef.TAGS_TO_SKIP:
                 TAGS_TO_SKIP.update(ddef.TAGS_TO_SKIP)
 
-        __built__[x] = ElementHandlers(
+        xdef = ElementHandlers(
                 TAGS_TO_YIELD=TAGS_TO_YIELD,
                 TAGS_TO_NEST=TAGS_TO_NEST,
                 TAGS_TO_IGNORE=TAGS_TO_IGNORE,
                 TAGS_TO_WARN=TAGS_TO_WARN,
                 TAGS_TO_SKIP=TAGS_TO_SKIP,
                 )
+        built[x] = xdef._replace(dispatch=compile_dispatch(xdef))
 
-        _resovled.append(x)
-
-    for name in __definitions__:
+    for name in definitions:
         _resolve(name)
 
+    return built
 
-def xml_iter(
-        p: xmlFragment,
-        name: str,
-        msg: Optional[str] = None) -> Generator[el, None, None]:
+
+def compile_dispatch(handlers: ElementHandlers) -> Dict[str, Tuple[int, Any]]:
     """
-    Iterates over an XML node yielding an appropriate element (el)
+    Compile the handlers into a single ``tag -> (action, data)`` table, so
+    that each node is dispatched with a single lookup.  Where a tag appears
+    in several groups, the group tested first by the original sequential
+    dispatch (yield, nest, warn, ignore, skip) takes precedence.
     """
-
-    handlers = __built__[name]
-
-    # INIT PHASE
-    children = p.getchildren()
-    if not children:
+    dispatch: Dict[str, Tuple[int, Any]] = {}
+
+    # LOWEST PRECEDENCE FIRST
+    if handlers.TAGS_TO_SKIP:
+        for tag, data in handlers.TAGS_TO_SKIP.items():
+            dispatch[tag] = (SKIP, data)
+    if handlers.TAGS_TO_IGNORE:
+        for tag in handlers.TAGS_TO_IGNORE:
+            dispatch[tag] = (IGNORE, None)
+    if handlers.TAGS_TO_WARN:
+        for tag, msg in handlers.TAGS_TO_WARN.items():
+            dispatch[tag] = (WARN, msg)
+    if handlers.TAGS_TO_NEST:
+        for tag, name in handlers.TAGS_TO_NEST.items():
+            dispatch[tag] = (NEST, name)
+    if handlers.TAGS_TO_YIELD:
+        for tag, cls in handlers.TAGS_TO_YIELD.items():
+            if handlers.TAGS_TO_NEST and tag in handlers.TAGS_TO_NEST:
+                dispatch[tag] = (YIELD_AND_NEST, (cls, handlers.TAGS_TO_NEST[tag]))
+            else:
+                dispatch[tag] = (YIELD, cls)
+
+    return dispatch
+
+
+def use_iterators(built: Dict[str, ElementHandlers]) -> None:
+    """
+    Install a set of iterators previously returned by ``build_iterators()``
+    as the default iterators (not thread safe)
+    """
+    if built is __built__:
         return
+    __built__.clear()
+    __built__.update(built)
 
-    current: Optional[xmlFragment] = p.getchildren()[0]
 
-    # ITERATION PHASE
-    while current is not None:
+def xml_iter(
+        p: Optional[xmlFragment],
+        name: str,
+        msg: Optional[str] = None,
+        iterators: Optional[Dict[str, ElementHandlers]] = None,
+        nodes: Optional[Iterable[xmlFragment]] = None,
+) -> Generator[el, None, None]:
+    """
+    Iterates over an XML node yielding an appropriate element (el)
 
-        if msg is not None and current.tag not in handlers.TAGS_TO_IGNORE:
-            print(msg +
-                  ("" if current.prefix is None else (current.prefix + ":")) +
-                  current.tag)
+    ``iterators`` are the built iterators to use, which are passed on to the
+    yielded elements; the default iterators are used if omitted.
 
-        if handlers.TAGS_TO_YIELD \
-                and current.tag in handlers.TAGS_TO_YIELD:
-            # Yield all math tags
-            yield handlers.TAGS_TO_YIELD[current.tag](current)
+    ``nodes``, if given, are iterated over (lazily) instead of the children
+    of ``p``, e.g. the completed children of an element from
+    ``lxml.etree.iterparse``.
 
-            if handlers.TAGS_TO_NEST \
-                    and current.tag in handlers.TAGS_TO_NEST:
-                _msg = None if msg is None else ("  "+msg)
-                for elt in xml_iter(current, handlers.TAGS_TO_NEST[current.tag], _msg):
-                    yield elt
+    Nested tags (``TAGS_TO_NEST``) are descended into with an explicit stack
+    of frames rather than nested generators, so each element is yielded in
+    a single step however deeply it is nested.
+    """
 
-        elif handlers.TAGS_TO_NEST \
-                and current.tag in handlers.TAGS_TO_NEST:
-            _msg = None if msg is None else ("  "+msg)
-            for elt in xml_iter(current, handlers.TAGS_TO_NEST[current.tag], _msg):
-                yield elt
+    built = __built__ if iterators is None else iterators
 
+    # INIT PHASE
+    dispatch = built[name].dispatch
+    children: Sequence[xmlFragment]
+    stream: Optional[Iterator[xmlFragment]]
+    if nodes is None:
+        children = p.getchildren()
+        stream = None
+    else:
+        children = ()
+        stream = iter(nodes)
+    count = len(children)
+    ranges: Optional[Dict[Tuple[str, str], Dict[str, List[int]]]] = None
+    position = 0
+
+    # THE SUSPENDED PARENT FRAMES
+    stack: List[Tuple[Any, ...]] = []
 
-        elif handlers.TAGS_TO_WARN \
-                and current.tag in handlers.TAGS_TO_WARN:
-            # Skip these unhandled tags with a warning
-            warn("Skipping %s tag: %s" % (handlers.TAGS_TO_WARN[current.tag],
-                                          current.tag, ))
+    # ITERATION PHASE
+    while True:
 
+        if position < count:
+            current = children[position]
+            position += 1
+        else:
+            current = None if stream is None else next(stream, None)
+            if current is None:
+                if not stack:
+                    return
+                # RESUME THE PARENT FRAME
+                dispatch, children, count, ranges, position, msg, stream = stack.pop()
+                continue
+
+        tag = current.tag
+        action, data = dispatch.get(tag, (None, None))
 
-        elif handlers.TAGS_TO_IGNORE \
-                and current.tag in handlers.TAGS_TO_IGNORE:
+        if msg is not None and action != IGNORE:
+            print(msg +
+                  ("" if current.prefix is None else (current.prefix + ":")) +
+                  tag)
+
+        if action == YIELD:
+            yield data(current, iterators)
+
+        elif action == NEST or action == YIELD_AND_NEST:
+            if action == YIELD_AND_NEST:
+                yield data[0](current, iterators)
+                data = data[1]
+            # DESCEND INTO THE NESTED NODE
+            stack.append((dispatch, children, count, ranges, position, msg, stream))
+            dispatch = built[data].dispatch
+            children = current.getchildren()
+            count = len(children)
+            ranges = None
+            position = 0
+            msg = None if msg is None else ("  "+msg)
+            stream = None
+
+        elif action == IGNORE:
             # ignore paragraph properties, deleted content and meta tags
             # like bookmarks, permissions, comments, etc.
             pass
 
-        elif handlers.TAGS_TO_SKIP \
-                and current.tag in handlers.TAGS_TO_SKIP:
+        elif action == WARN:
+            # Skip these unhandled tags with a warning
+            warn("Skipping %s tag: %s" % (data, tag, ))
+
+        elif action == SKIP:
             # Skip over content that has been moved elsewhere
-            data = handlers.TAGS_TO_SKIP[current.tag]
-            current = skip_range(current, data[0], data[1])
-            if current is None:
-                return
+            if stream is not None:
+                # THE FOLLOWING NODES HAVE NOT BEEN READ YET
+                _id = current.get(data[0])
+                for current in stream:
+                    if current.tag == data[1] and current.get(data[0]) == _id:
+                        break
+                continue
+            if ranges is None:
+                ranges = {}
+            try:
+                ends = ranges[data]
+            except KeyError:
+                ends = ranges[data] = range_ends(children, data[0], data[1])
+            position = next_range_end(ends, current.get(data[0]), position - 1, count) + 1
 
         else:
-            warn("Skipping unexpected tag: %s" % (current.tag),
+            warn("Skipping unexpected tag: %s" % (tag),
                  UnexpectedElementWarning)
 
-        current = current.getnext()
 
-    return
-
-
-def skip_range(x: xmlFragment,
+def range_ends(children: Sequence[xmlFragment],
                id_attr: str,
-               waitfor: str) -> Optional[xmlFragment]:
+               waitfor: str) -> Dict[str, List[int]]:
     """
-    A utility which returns the element at the end of the range
+    Index the positions of the range end elements (with the Clark notation
+    tag ``waitfor``) among ``children`` by their ``id_attr``, in one pass
     """
+    ends: Dict[str, List[int]] = {}
+    for position, child in enumerate(children):
+        if child.tag == waitfor:
+            ends.setdefault(child.get(id_attr), []).append(position)
+    return ends
 
-    _id: str = x.attrib[id_attr]
-    current: Optional[xmlFragment] = x.getnext()
 
-    while True:
-        if current is None:
-            return current
-        if get_tag(current).tag == waitfor and current.attrib[id_attr] == _id:
-            return current
-        current = current.getnext()
+def next_range_end(ends: Dict[str, List[int]],
+                   _id: Optional[str],
+                   position: int,
+                   count: int) -> int:
+    """
+    The position of the first end of the range ``_id`` after ``position``
+    (or ``count`` if the range is not closed among the siblings)
+    """
+    positions = ends.get(_id)
+    if not positions:
+        return count
+    if positions[0] > position:
+        return positions[0]
+    i = bisect_right(positions, position)
+    return positions[i] if i < len(positions) else count
@@ -0,0 +1,250 @@
+"""
+Extraction of the numbers in tables as NumPy arrays
+
+NumPy is an optional dependency (``pip install simplify-docx[numeric]``),
+which is only needed by this module, so it is not imported by the package.
+"""
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional
+    np = None
+
+from .elements import body, document, table
+from .elements.table import plain_text_grid
+from .simplifier import Simplifier
+from .utils.paragrapy_style import refresh_style_index
+
+# THE CHARACTERS REMOVED FROM NUMBERS: THOUSANDS SEPARATORS AND CURRENCY SIGNS
+__ignored_characters__ = (
+    ",",
+    " ",
+    "\u00a0",
+    "\u2009",
+    "\u202f",
+    "$",
+    "\u20ac",
+    "\u00a3",
+    "\u00a5",
+)
+
+# CHARACTERS USED AS MINUS SIGNS: THE MINUS SIGN AND THE EN DASH
+__minus_signs__ = ("\u2212", "\u2013")
+
+
+class numeric_table(NamedTuple):
+    """
+    The text and numbers of a table laid out on its grid
+    """
+
+    text: Any  # numpy array of the (stripped) text of each place in the grid
+    values: Any  # numpy float array of the number in each place, or NaN
+    header_rows: int  # the number of header rows at the top of the table
+
+    @property
+    def header(self):
+        """
+        The text of the header rows
+        """
+        return self.text[: self.header_rows]
+
+    @property
+    def data(self):
+        """
+        The numbers below the header rows
+        """
+        return self.values[self.header_rows :]
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("Numeric table extraction requires numpy")
+
+
+def parse_numbers(text):
+    """
+    Parse an array of cell text into an array of floats (NaN where the text
+    is not a number), all at once.
+
+    Thousands separators and currency signs are ignored, numbers in
+    parentheses are negative and percentages are fractions, so that
+    ``"1,234.5"``, ``"$(12)"`` and ``"(45 %)"`` are ``1234.5``, ``-12``
+    and ``-0.45``.
+
+    :param text: An array of strings
+    :type text: numpy.ndarray
+    :return: The numbers, with the shape of ``text``
+    :return type: numpy.ndarray
+    """
+    _require_numpy()
+    return _parse_numbers(np.char.strip(np.asarray(text, dtype=str)))
+
+
+def _parse_numbers(text):
+    """
+    Parse an array of stripped strings into an array of floats
+    """
+    values = np.full(text.shape, np.nan)
+    if not text.size:
+        return values
+
+    # CURRENCY SIGNS AND SEPARATORS MAY SURROUND THE PARENTHESES OR PERCENT
+    # SIGN (E.G. "$(1,234)"), SO THEY ARE REMOVED FIRST
+    for old, new in [(sign, "-") for sign in __minus_signs__] + [
+        (character, "") for character in __ignored_characters__
+    ]:
+        # FINDING IS MUCH CHEAPER THAN REPLACING, AND MOST ARE NEVER FOUND
+        if (np.char.find(text, old) >= 0).any():
+            text = np.char.replace(text, old, new)
+
+    negative = (
+        np.char.startswith(text, "(")
+        & np.char.endswith(text, ")")
+        & (np.char.count(text, "(") == 1)
+        & (np.char.count(text, ")") == 1)
+    )
+    if negative.any():
+        text = np.where(negative, np.char.strip(text, "()"), text)
+
+    percent = np.char.endswith(text, "%")
+    if percent.any():
+        text = np.where(percent, np.char.rstrip(text, "%"), text)
+
+    # A NUMBER IS AN OPTIONAL SIGN FOLLOWED BY DIGITS WITH AT MOST ONE POINT
+    unsigned = np.char.lstrip(text, "+-")
+    numeric = (
+        (np.char.str_len(text) - np.char.str_len(unsigned) <= 1)
+        & (np.char.count(unsigned, ".") <= 1)
+        & np.char.isdecimal(np.char.replace(unsigned, ".", ""))
+    )
+    if not numeric.any():
+        return values
+
+    try:
+        values[numeric] = text[numeric].astype(float)
+    except ValueError:
+        # DIGITS WHICH NUMPY DOES NOT READ (E.G. NON-ASCII DIGITS)
+        for index in zip(*np.nonzero(numeric)):
+            try:
+                values[index] = float(text[index])
+            except ValueError:
+                pass
+    values[negative] = -values[negative]
+    values[percent] /= 100
+    return values
+
+
+def _header_rows(text, values) -> int:
+    """
+    The number of rows at the top of the table which hold no numbers other
+    than years (e.g. ``"", "2023", "2022"``), provided that a row below them
+    holds other numbers
+    """
+    numeric = ~np.isnan(values)
+    years = (
+        numeric
+        & (np.char.str_len(text) == 4)
+        & np.char.isdecimal(text)
+        & (values >= 1800)
+        & (values <= 2200)
+    )
+    rows = np.nonzero((numeric & ~years).any(axis=1))[0]
+    return int(rows[0]) if rows.size else 0
+
+
+def _grid_text(matrix: List[List[Optional[str]]], rows: int, cols: int):
+    """
+    The stripped text of each place in a grid of cell text
+    """
+    return np.char.strip(
+        np.array(
+            [["" if cell is None else cell for cell in row] for row in matrix],
+            dtype=str,
+        ).reshape(rows, cols)
+    )
+
+
+def _table_text(elt: table, doc, options: Dict[str, Any]):
+    """
+    The stripped text of each place in the grid of a table, which is read
+    directly from the XML when the table holds nothing but plain text
+    """
+    plain = plain_text_grid(elt.fragment, options)
+    if plain is not None:
+        matrix, cols = plain
+        return _grid_text(matrix, len(matrix), cols)
+    JSON = elt.to_json(doc, options)
+    return _grid_text(JSON["VALUE"], JSON["rows"], JSON["cols"])
+
+
+def grid_to_numeric(JSON: Dict[str, Any]) -> numeric_table:
+    """
+    Parse a simplified table (simplified with the ``table-as-grid`` option)
+    into arrays.  The places in the grid covered by a merged cell are
+    empty.
+
+    :param JSON: The simplified table
+    :type JSON: Dict[str, Any]
+    """
+    _require_numpy()
+    text = _grid_text(JSON["VALUE"], JSON["rows"], JSON["cols"])
+    values = _parse_numbers(text)
+    return numeric_table(text, values, _header_rows(text, values))
+
+
+def numeric_tables(
+    doc, options: Optional[Dict[str, Any]] = None
+) -> List[numeric_table]:
+    """
+    Parse each table in the body of a Docx Document into arrays
+
+    Only the tables at the top level of the body are returned; the text of
+    a nested table is part of the text of its cell.  The text of a table
+    which holds nothing but plain text is read directly from its XML (the
+    other tables are simplified), and the numbers in all the tables are
+    parsed at once.  Reading the cells still takes some microseconds each,
+    so a thousand tables of a few dozen cells take a few hundred
+    milliseconds.
+
+    :param doc: The document
+    :type doc: docx.document.Document
+    :param options: Optional. The simplification options
+    :type options: Dict[str, Any]
+    """
+    _require_numpy()
+    # THE PARAGRAPH STYLES ARE NOT NEEDED FOR THE TEXT OF THE CELLS
+    _options: Dict[str, Any] = {
+        "include-paragraph-indent": False,
+        "include-paragraph-numbering": False,
+    }
+    _options.update(options or {})
+    _options["table-as-grid"] = True
+    with Simplifier(_options) as simplifier:
+        texts = [
+            _table_text(elt, doc, simplifier.options)
+            for elt in _body_tables(doc, simplifier.session_iterators())
+        ]
+    if not texts:
+        return []
+
+    values = _parse_numbers(np.concatenate([text.ravel() for text in texts]))
+    out = []
+    start = 0
+    for text in texts:
+        _values = values[start : start + text.size].reshape(text.shape)
+        start += text.size
+        out.append(numeric_table(text, _values, _header_rows(text, _values)))
+    return out
+
+
+def _body_tables(doc, iterators) -> Sequence[table]:
+    """
+    The tables at the top level of the body
+    """
+    refresh_style_index(doc)
+    out = []
+    for elt in document(doc.element, iterators):
+        if isinstance(elt, body):
+            out.extend(block for block in elt if isinstance(block, table))
+    return out
@@ -0,0 +1,415 @@
+"""
+Shared processing of the parts related by altChunk, subDoc and contentPart
+elements
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from warnings import warn
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple
+from lxml import etree
+from docx.oxml.ns import qn
+
+from .types import xmlFragment
+from .utils.package import RT_ALT_CHUNK, RT_SUB_DOCUMENT, RT_CONTENT_PART
+from .utils.paragrapy_style import refresh_style_index, style_elements
+from .workers import init_worker, worker_state
+
+# THE ELEMENTS WHICH REFER TO A RELATED DOCUMENT PART, AND THEIR RELATIONSHIPS
+__related_tags__ = (qn("w:altChunk"), qn("w:subDoc"), qn("w:contentPart"))
+__related_reltypes__ = (RT_ALT_CHUNK, RT_SUB_DOCUMENT, RT_CONTENT_PART)
+
+# THE OPTIONS WHICH DO NOT AFFECT THE SIMPLIFIED PARTS
+__scheduling_options__ = ("related-parts-workers",)
+
+
+class part_memo:
+    """
+    A thread-safe, size-limited memo of the simplified related parts, keyed
+    by ``part_key()``.
+
+    The parts are stored as JSON text and parsed on each use, so that every
+    reference to a part gets its own copy.
+
+    :param max_bytes: The total length of JSON text kept
+    :type max_bytes: int
+    """
+
+    def __init__(self, max_bytes: int = 64 << 20):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[bytes, str]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: bytes) -> Optional[str]:
+        """
+        The JSON text of a part, or ``None``
+        """
+        with self._lock:
+            text = self._entries.get(key, None)
+            if text is not None:
+                self._entries.move_to_end(key)
+            return text
+
+    def put(self, key: bytes, text: str) -> None:
+        """
+        Store the JSON text of a part, evicting the least recently used
+        parts if needed
+        """
+        if len(text) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._entries[key] = text
+            self._size += len(text)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def __contains__(self, key: bytes) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def clear(self) -> None:
+        """
+        Remove every part
+        """
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+def part_key(chunkDoc, options: Dict[str, Any]) -> bytes:
+    """
+    A digest of everything which determines the simplified form of a related
+    part: the XML of the part, its styles and numbering, the parts which it
+    refers to in turn and the options.  Parts with identical contents share
+    a key.
+    """
+    return related_session(None, options).key(chunkDoc)
+
+
+def _canonical_options(options: Dict[str, Any]) -> bytes:
+    return json.dumps(
+        {k: v for k, v in options.items() if k not in __scheduling_options__},
+        sort_keys=True,
+    ).encode("utf-8")
+
+
+class related_parts:
+    """
+    The related parts simplified by a ``Simplifier``: a memo of their JSON,
+    which is shared by its simplifications, and the pool of worker processes
+    which simplifies them in parallel when ``related-parts-workers`` is more
+    than 1.  The pool is started the first time it is needed, and restarted
+    if the options have changed since.
+
+    :param factory: The class of the simplifier built by each worker process
+            (``Simplifier``), which must provide ``simplify_part_xml()``
+    :param max_bytes: The total length of JSON text kept in the memo
+    :type max_bytes: int
+    """
+
+    def __init__(self, factory: Callable[[Dict[str, Any]], Any], max_bytes: int = 64 << 20):
+        self.factory = factory
+        self.memo = part_memo(max_bytes)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_options: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def session(self, options: Dict[str, Any]) -> "related_session":
+        """
+        Start simplifying a document with ``options``
+        """
+        return related_session(self, options)
+
+    def executor(self, options: Dict[str, Any], max_workers: int) -> ProcessPoolExecutor:
+        """
+        The pool of worker processes for ``options``
+        """
+        canonical = json.dumps(options, sort_keys=True)
+        with self._lock:
+            if self._executor is not None and self._executor_options != canonical:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=max_workers,
+                    initializer=init_worker,
+                    # THE WORKERS DO NOT START POOLS OF THEIR OWN
+                    initargs=(self.factory, dict(options, **{"related-parts-workers": 0})),
+                )
+                self._executor_options = canonical
+            return self._executor
+
+    def discard_executor(self, executor: ProcessPoolExecutor) -> None:
+        """
+        Stop using a pool which has broken, so that the next one is started
+        afresh
+        """
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
+
+    def close(self) -> None:
+        """
+        Stop the worker processes, if they were started
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+class related_session:
+    """
+    The related parts of one simplification.  The key of each part is
+    computed at most once per simplification, and the parts are looked up
+    in (and added to) the memo of the ``related_parts`` which started the
+    session, if any.
+
+    :param parts: The related parts of the ``Simplifier``, or ``None``
+    :type parts: related_parts
+    :param options: The simplification options
+    :type options: Dict[str, Any]
+    """
+
+    def __init__(self, parts: Optional[related_parts], options: Dict[str, Any]):
+        self.parts = parts
+        self.options = options
+        self._canonical_options = _canonical_options(options)
+        # id(part document) -> (part document, digest), for the parts and the
+        # keys; the documents are kept so that their ids are not reused
+        self._digests: Dict[int, Tuple[Any, bytes]] = {}
+        self._keys: Dict[int, Tuple[Any, bytes]] = {}
+
+    def key(self, chunkDoc) -> bytes:
+        """
+        The memo key of a related part (see ``part_key()``)
+        """
+        try:
+            return self._keys[id(chunkDoc)][1]
+        except KeyError:
+            pass
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(self.digest(chunkDoc))
+        digest.update(self._canonical_options)
+        key = digest.digest()
+        self._keys[id(chunkDoc)] = (chunkDoc, key)
+        return key
+
+    def digest(self, chunkDoc) -> bytes:
+        """
+        A digest of the XML of a part, its styles and numbering and
+        (recursively) the parts which it refers to.  The XML is serialized
+        once per session, as it may have been edited since the previous one.
+        """
+        return self._part_digest(chunkDoc, set())
+
+    def related_digest(self, doc, fragment: xmlFragment) -> bytes:
+        """
+        A digest of the references to related parts within ``fragment`` and
+        the parts they refer to
+        """
+        return self._related_digest(doc, fragment, set())
+
+    def _part_digest(self, chunkDoc, active: Set[int]) -> bytes:
+        try:
+            return self._digests[id(chunkDoc)][1]
+        except KeyError:
+            pass
+        active.add(id(chunkDoc))
+        digest = hashlib.blake2b(digest_size=20)
+        for element in (chunkDoc.element,) + style_elements(chunkDoc):
+            data = b"" if element is None else etree.tostring(element)
+            digest.update(b"%d\0" % len(data))
+            digest.update(data)
+        digest.update(self._related_digest(chunkDoc, chunkDoc.element, active))
+        active.discard(id(chunkDoc))
+        out = digest.digest()
+        self._digests[id(chunkDoc)] = (chunkDoc, out)
+        return out
+
+    def _related_digest(self, doc, fragment: xmlFragment, active: Set[int]) -> bytes:
+        digest = hashlib.blake2b(digest_size=20)
+        for rId, target in _related_targets(doc, fragment):
+            digest.update((rId or "").encode("utf-8") + b"\0")
+            if target is None or id(target) in active:
+                # A MISSING PART, OR A CYCLE
+                digest.update(b"-\0")
+            else:
+                digest.update(self._part_digest(target, active))
+        return digest.digest()
+
+    def simplify_part(self, chunkDoc, simplify: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Simplify the document of a related part, at most once per part
+        contents and options
+
+        :param chunkDoc: The document of the related part
+        :param simplify: Simplifies the document of the part (after its
+                styles have been refreshed), if it is not in the memo
+        """
+        if self.parts is None:
+            refresh_style_index(chunkDoc)
+            return simplify()
+
+        key = self.key(chunkDoc)
+        text = self.parts.memo.get(key)
+        if text is not None:
+            return json.loads(text)
+        refresh_style_index(chunkDoc)
+        out = simplify()
+        self.parts.memo.put(key, json.dumps(out))
+        return out
+
+    def simplify_parts(self, documents: Iterable[Any], max_workers: int) -> int:
+        """
+        Simplify the documents of related parts in the pool of worker
+        processes, storing them in the memo used by ``simplify_part()``.
+        Parts which are already in the memo (or repeated) are simplified
+        once.  Parts which refer to parts of their own (which the workers
+        cannot reach) are left to be simplified when they are used, as are
+        parts which fail in a worker, which are reported with a warning.
+
+        :param documents: The documents of the related parts
+        :param max_workers: The number of worker processes
+        :type max_workers: int
+
+        :return: The number of parts simplified
+        :return type: int
+        """
+        if self.parts is None:
+            return 0
+        memo = self.parts.memo
+        pending: Dict[bytes, Any] = {}
+        for chunkDoc in documents:
+            if next(iter(_related_targets(chunkDoc, chunkDoc.element)), None):
+                continue
+            key = self.key(chunkDoc)
+            if key not in pending and key not in memo:
+                pending[key] = chunkDoc
+        if not pending:
+            return 0
+
+        executor = self.parts.executor(self.options, max_workers)
+        futures = {
+            executor.submit(
+                _simplify_part_xml,
+                *(
+                    None if element is None else etree.tostring(element)
+                    for element in (chunkDoc.element,) + style_elements(chunkDoc)
+                )
+            ): key
+            for key, chunkDoc in pending.items()
+        }
+        count = 0
+        for future in as_completed(futures):
+            try:
+                text = future.result()
+            except BrokenProcessPool as error:
+                self.parts.discard_executor(executor)
+                warn("The related parts worker pool broke (%s): the remaining parts will be simplified when they are used" % error)
+                break
+            except Exception as error:  # pylint: disable=broad-except
+                warn(
+                    "Simplifying a related part in a worker process failed (%s: %s): it will be simplified when it is used"
+                    % (error.__class__.__name__, error)
+                )
+                continue
+            memo.put(futures[future], text)
+            count += 1
+        return count
+
+
+class related_iterators(dict):
+    """
+    The built iterators of one simplification, along with its
+    ``related_session``.  The elements pass their iterators on to the
+    elements they contain, so every element of the simplification (including
+    those of its related parts) reaches the session through them.
+    """
+
+    __slots__ = ("session",)
+
+    def __init__(self, iterators: Dict[str, Any], session: related_session):
+        super().__init__(iterators)
+        self.session = session
+
+
+def get_session(iterators, options: Dict[str, Any]) -> related_session:
+    """
+    The ``related_session`` carried by ``iterators``, or a session without a
+    memo if there is none
+    """
+    session = getattr(iterators, "session", None)
+    if session is None:
+        return related_session(None, options)
+    return session
+
+
+def related_documents(doc, fragment: xmlFragment) -> Iterable[Any]:
+    """
+    The documents of the parts related to ``doc`` which are referred to
+    within ``fragment``, in document order
+    """
+    for _, target in _related_targets(doc, fragment):
+        if target is not None:
+            yield target
+
+
+def part_documents(doc) -> Iterable[Any]:
+    """
+    The documents of the parts related to ``doc`` by the relationships of
+    altChunk, subDoc and contentPart elements, whether or not they are
+    referred to (for when the body is not available up front, e.g. when it
+    is streamed)
+    """
+    try:
+        rels = doc.part.rels
+    except AttributeError:
+        return
+    for rel in rels.values():
+        if rel.reltype not in __related_reltypes__ or rel.is_external:
+            continue
+        try:
+            yield rel.target_part.element
+        except AttributeError:
+            continue
+
+
+def _related_targets(doc, fragment: xmlFragment) -> Iterable[Tuple[Optional[str], Any]]:
+    """
+    The relationship id and document (or ``None`` if it is not available) of
+    each reference to a related part within ``fragment``
+    """
+    try:
+        parts = doc.part.related_parts
+    except AttributeError:
+        parts = {}
+    for node in fragment.iter(*__related_tags__):
+        rId = node.get(qn("r:id"))
+        try:
+            yield rId, parts[rId].element
+        except (KeyError, AttributeError):
+            yield rId, None
+
+
+def _simplify_part_xml(
+    document_xml: bytes, styles_xml: Optional[bytes], numbering_xml: Optional[bytes]
+) -> str:
+    """
+    Simplify a related part sent to a worker process, returning its JSON text
+    """
+    simplifier, _ = worker_state()
+    return simplifier.simplify_part_xml(document_xml, styles_xml, numbering_xml)
@@ -0,0 +1,302 @@
+"""
+The ``Simplifier``, which coerces Docx Documents to JSON with a fixed set of
+options, and the default options
+"""
+import json
+import threading
+from collections import OrderedDict
+from typing import Union, Dict, Optional, Any, Generator, IO
+from docx.oxml import parse_xml
+from .types.fragment import documentPart
+from .utils.friendly_names import get_type_names
+from .elements import document, body, paragraph_assembler
+from .utils.set_options import get_iterators
+from .utils.package import detached_document, package_document, release
+from .utils.paragrapy_style import refresh_style_index
+from .utils.json_stream import json_writer
+from .iterators.generic import xml_iter
+from .related import related_parts, related_iterators
+from .incremental import incremental_simplify, incremental_result
+
+
+class Simplifier:
+    """
+    Coerce Docx Documents to JSON with a fixed set of options
+
+    :param options: Optional. Overrides for ``__default_options__``
+    :type options: Dict[str, Any]
+    """
+
+    options: Dict[str, Any]
+
+    def __init__(self, options: Optional[Dict[str, Any]] = None):
+        if options:
+            self.options = dict(__default_options__, **options)
+        else:
+            self.options = dict(__default_options__)
+        self.iterators = get_iterators(self.options)
+        self.related_parts = related_parts(type(self))
+
+    def __enter__(self) -> "Simplifier":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Stop the worker processes which simplify related parts, if they were
+        started.  The simplifier may still be used afterwards.
+        """
+        self.related_parts.close()
+
+    def session_iterators(self) -> related_iterators:
+        """
+        The built iterators for one simplification, which carry the state it
+        shares with the elements it creates (the keys of the related parts,
+        and this simplifier's memo and worker processes)
+        """
+        return related_iterators(
+            self.iterators, self.related_parts.session(self.options)
+        )
+
+    def simplify(self, doc: documentPart):
+        """
+        Coerce a Docx Document to JSON
+        """
+        refresh_style_index(doc)
+        return document(doc.element, self.session_iterators()).to_json(
+            doc, self.options
+        )
+
+    __call__ = simplify
+
+    def simplify_part_xml(
+        self,
+        document_xml: bytes,
+        styles_xml: Optional[bytes] = None,
+        numbering_xml: Optional[bytes] = None,
+    ) -> str:
+        """
+        Simplify a related part from the XML of its document, styles and
+        numbering (as sent to a worker process), returning its JSON text
+        """
+        chunkDoc = detached_document(
+            parse_xml(document_xml),
+            None if styles_xml is None else parse_xml(styles_xml),
+            None if numbering_xml is None else parse_xml(numbering_xml),
+        )
+        return json.dumps(self.simplify(chunkDoc))
+
+    def simplify_incremental(
+        self, doc: documentPart, previous: Optional[incremental_result] = None
+    ) -> incremental_result:
+        """
+        Coerce a Docx Document to JSON, re-using the simplified paragraphs and
+        tables of a ``previous`` result whose XML is unchanged.  The returned
+        ``incremental_result`` holds the document (``.document``) and the
+        number of blocks which were reused (``.reused``) and simplified
+        (``.computed``); pass it as ``previous`` after the next edit.
+        """
+        return incremental_simplify(self, doc, previous)
+
+    def iter_simplify(
+        self, doc: documentPart
+    ) -> Generator[Dict[str, Any], None, None]:
+        """
+        Coerce a Docx Document to JSON, yielding each top-level block of the
+        document body as soon as it is complete
+        """
+        refresh_style_index(doc)
+        for elt in document(doc.element, self.session_iterators()):
+            if not isinstance(elt, body):
+                continue
+            for block in elt.iter_json(doc, self.options):
+                yield block
+
+    def iter_simplify_file(
+        self, docx_file: Union[str, IO[bytes]]
+    ) -> Generator[Dict[str, Any], None, None]:
+        """
+        Coerce a .docx file (path or binary file object) to JSON, yielding each
+        top-level block of the document body as soon as it is complete.
+
+        Unlike ``iter_simplify()``, the document part is never loaded in full:
+        it is parsed incrementally and each block is discarded once it has
+        been simplified, so memory use does not grow with the document length.
+        The parts related by altChunk, subDoc and contentPart elements are
+        only parsed when they are used.
+        """
+        doc = package_document(docx_file)
+        iterators = self.session_iterators()
+        assembler = paragraph_assembler(doc, self.options)
+
+        def released(elements):
+            # DISCARD EACH BLOCK ONCE IT HAS BEEN SIMPLIFIED, UNLESS IT IS
+            # WAITING FOR THE END OF A FIELD IN THE FOLLOWING PARAGRAPHS
+            for elt in elements:
+                yield elt
+                if assembler.pending is None:
+                    release(elt.fragment)
+
+        try:
+            for JSON in body(None, iterators).iter_json(
+                doc,
+                self.options,
+                assembler,
+                released(xml_iter(None, "CT_Body", None, iterators, doc.iter_body())),
+            ):
+                yield JSON
+        finally:
+            doc.close()
+
+    def simplify_to_stream(
+        self,
+        doc: Union[documentPart, str, IO[bytes]],
+        fp: IO[str],
+        indent: Optional[int] = None,
+    ) -> None:
+        """
+        Coerce a Docx Document (or .docx file) to JSON, writing it to the text
+        file object ``fp`` block by block.  The output is the same as
+        ``json.dump(self.simplify(doc), fp, indent=indent)``, except that it is
+        compact (without white space) when ``indent`` is ``None``.
+        """
+        writer = json_writer(fp, indent)
+        names = get_type_names(self.options)
+
+        if isinstance(doc, str) or hasattr(doc, "read"):
+            blocks = self.iter_simplify_file(doc)
+            writer.write_container(
+                names["CT_Document"],
+                [blocks],
+                0,
+                lambda blocks, depth: writer.write_container(
+                    names["CT_Body"], blocks, depth
+                ),
+            )
+            return
+
+        refresh_style_index(doc)
+
+        def write_child(elt, depth: int) -> None:
+            if isinstance(elt, body):
+                writer.write_container(
+                    names["CT_Body"], elt.iter_json(doc, self.options), depth
+                )
+            else:
+                writer.write_value(elt.to_json(doc, self.options), depth)
+
+        writer.write_container(
+            names["CT_Document"],
+            document(doc.element, self.session_iterators()),
+            0,
+            write_child,
+        )
+
+    def simplify_to_jsonl(
+        self, doc: Union[documentPart, str, IO[bytes]], fp: IO[str]
+    ) -> int:
+        """
+        Coerce a Docx Document (or .docx file) to JSON Lines, writing each
+        top-level block of the document body to ``fp`` on a line of its own.
+        Returns the number of lines written.
+        """
+        if isinstance(doc, str) or hasattr(doc, "read"):
+            blocks = self.iter_simplify_file(doc)
+        else:
+            blocks = self.iter_simplify(doc)
+        count = 0
+        for block in blocks:
+            fp.write(json.dumps(block, separators=(",", ":")))
+            fp.write("\n")
+            count += 1
+        return count
+
+
+# options (as canonical JSON) -> the shared simplifier for those options,
+# least recently used first
+__simplifiers__: "OrderedDict[str, Simplifier]" = OrderedDict()
+__simplifiers_lock__ = threading.Lock()
+
+# The number of distinct option sets for which the simplifiers are kept
+__cache_size__: int = 32
+
+
+def get_simplifier(options: Optional[Dict[str, Any]] = None) -> Simplifier:
+    """
+    The shared simplifier for the given options, which is created the first
+    time it is requested, so that repeated calls of ``simplify()`` (and the
+    other module level functions) with the same options reuse its memo of
+    the related parts and its worker processes.  The simplifiers of the
+    least recently used option sets are closed once there are more than
+    ``__cache_size__``.
+    """
+    key = json.dumps(options or {}, sort_keys=True)
+    evicted = None
+    with __simplifiers_lock__:
+        try:
+            simplifier = __simplifiers__[key]
+        except KeyError:
+            simplifier = __simplifiers__[key] = Simplifier(options)
+            if len(__simplifiers__) > __cache_size__:
+                _, evicted = __simplifiers__.popitem(last=False)
+        else:
+            __simplifiers__.move_to_end(key)
+    if evicted is not None:
+        evicted.close()
+    return simplifier
+
+
+# --------------------------------------------------
+# Default Options
+# --------------------------------------------------
+__default_options__: Dict[str, Union[str, bool, int, float]] = {
+    # general
+    "friendly-names": True,
+    # flattening special content
+    "flatten-hyperlink": True,
+    "flatten-smartTag": True,
+    "flatten-customXml": True,
+    "flatten-simpleField": True,
+    "merge-consecutive-text": True,
+    "flatten-inner-spaces": False,
+    # possibly meaningful style:
+    "include-paragraph-indent": True,
+    "include-paragraph-numbering": True,
+    "include-paragraph-spacing": False,
+    "include-paragraph-outline-level": False,
+    # tables:
+    "table-as-grid": False,
+    # the number of processes simplifying the parts related by altChunk,
+    # subDoc and contentPart elements (in the calling process if 0 or 1)
+    "related-parts-workers": 0,
+    # ignoring invisible things
+    "ignore-joiners": True,
+    "ignore-left-to-right-mark": False,
+    "ignore-right-to-left-mark": False,
+    "ignore-empty-table-description": True,
+    "ignore-empty-table-caption": True,
+    "ignore-empty-paragraphs": True,
+    "ignore-empty-text": True,
+    "remove-trailing-white-space": True,
+    "remove-leading-white-space": True,
+    # forms
+    "use-checkbox-default": True,
+    "greedy-text-input": True,
+    "checkbox-as-text": False,
+    "dropdown-as-text": False,
+    "simplify-dropdown": True,
+    "simplify-textinput": True,
+    "simplify-checkbox": True,
+    "flatten-generic-field": True,
+    "trim-dropdown-options": True,
+    # special symbols
+    "empty-as-text": False,
+    "symbol-as-text": True,
+    "special-characters-as-text": True,
+    "dumb-quotes": True,
+    "dumb-hyphens": True,
+    "dumb-spaces": True,
+    "normalize-nfkc": False,
+}
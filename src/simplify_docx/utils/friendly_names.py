@@ -1,13 +1,17 @@
 """
 Utilities for applying friendly names
 """
+from typing import Any, Dict, List, Optional
 
 
-def apply_friendly_names(x: object) -> None:
+class type_names(dict):
     """
-    A utility function for applying friendly names to a simplified document
+    Maps the internal TYPE of an element to the TYPE it is emitted with.
+    Types without an entry are emitted unchanged.
     """
-    _walk(x, _apply_friendly_names)
+
+    def __missing__(self, key: str) -> str:
+        return key
 
 
 __friendly_names__ = {
@@ -16,6 +20,7 @@ __friendly_names__ = {
     "CT_Tbl": "table",
     "SymbolChar": "symbol",
     "CT_Ind": "indentation-data",
+    "CT_Spacing": "spacing-data",
     "CT_SimpleField": "simple-field",
     "CT_Hyperlink": "hyperlink",
     "CT_P": "paragraph",
@@ -35,20 +40,32 @@ __friendly_names__ = {
     "CT_Rel": "nested-file",
 }
 
+__friendly_type_names__ = type_names(__friendly_names__)
+__plain_type_names__ = type_names()
 
-def _apply_friendly_names(x):
-    x["TYPE"] = __friendly_names__.get(x["TYPE"], x["TYPE"])
+
+def get_type_names(options: Optional[Dict[str, Any]]) -> type_names:
+    """
+    The mapping from internal to emitted TYPEs for a set of options
+    """
+    if options is None or options.get("friendly-names", True):
+        return __friendly_type_names__
+    return __plain_type_names__
 
 
-def _walk(x, fun):
-    fun(x)
-    val = x.get("VALUE", None)
-    if not val:
-        return
-    if isinstance(val, dict) and val.get("TYPE", None):
-        # child is an element
-        _walk(val, fun)
-    if isinstance(val, list) and val[0].get("TYPE", None):
-        # child is a list of elements
-        for child in val:
-            _walk(child, fun)
+def apply_friendly_names(x: object) -> None:
+    """
+    A utility function for applying friendly names to a document which was
+    simplified with ``friendly-names`` turned off
+    """
+    stack: List[Any] = [x]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(node)
+            continue
+        if not isinstance(node, dict):
+            continue
+        if "TYPE" in node:
+            node["TYPE"] = __friendly_names__.get(node["TYPE"], node["TYPE"])
+        stack.extend(val for val in node.values() if isinstance(val, (dict, list)))
@@ -0,0 +1,144 @@
+"""
+An index over a simplified document for repeated queries by TYPE
+"""
+from heapq import merge
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional
+from .walk import walked_value
+
+
+class indexed_node(NamedTuple):
+    """
+    A node of a simplified document and its location
+    """
+
+    node: Dict[str, Any]  # the element
+    parent: Optional[int]  # the entry of the containing element
+    position: Optional[int]  # the position in the parent's ``VALUE`` list
+
+
+class document_index:
+    """
+    Index the elements of a simplified document once, so that queries by
+    ``TYPE`` take time proportional to the number of results, and parent and
+    ancestor lookups proportional to the depth of the element.
+
+    Elements are reached through their ``VALUE`` (either a single element or
+    a list of elements) exactly as they are by ``walk()``, and are kept in
+    document order.  The index reflects the document at the time it was
+    built: rebuild it after modifying the document structure.
+
+    :param document: The simplified document (or any element of one)
+    :type document: Dict[str, Any]
+    """
+
+    root: Dict[str, Any]
+    entries: List[indexed_node]
+
+    def __init__(self, document: Dict[str, Any]):
+        self.root = document
+        self.entries = []
+        self._entry_of: Dict[int, int] = {}
+        self._by_type: Dict[Any, List[int]] = {}
+
+        stack: List[Any] = [(document, None, None)]
+        while stack:
+            node, parent, position = stack.pop()
+            entry = len(self.entries)
+            self.entries.append(indexed_node(node, parent, position))
+            self._entry_of[id(node)] = entry
+            self._by_type.setdefault(node.get("TYPE", None), []).append(entry)
+
+            val = walked_value(node)
+            if isinstance(val, dict):
+                stack.append((val, entry, None))
+            elif val is not None:
+                stack.extend(
+                    (child, entry, i)
+                    for i, child in reversed(list(enumerate(val)))
+                    if isinstance(child, dict)
+                )
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, node: object) -> bool:
+        return id(node) in self._entry_of
+
+    def types(self) -> List[Any]:
+        """
+        The ``TYPE``s present in the document
+        """
+        return list(self._by_type)
+
+    def find(self, TYPE: Optional[str]) -> List[Dict[str, Any]]:
+        """
+        The elements with the given ``TYPE`` in document order (all elements
+        if ``TYPE`` is ``None``)
+        """
+        if TYPE is None:
+            return [entry.node for entry in self.entries]
+        return [self.entries[i].node for i in self._by_type.get(TYPE, ())]
+
+    def find_entries(self, TYPE: Optional[str]) -> List[indexed_node]:
+        """
+        Like ``find()``, but returns the ``indexed_node`` entries
+        """
+        if TYPE is None:
+            return list(self.entries)
+        return [self.entries[i] for i in self._by_type.get(TYPE, ())]
+
+    def entries_of(self, types: Optional[Iterable[str]]) -> Iterator[indexed_node]:
+        """
+        The entries with any of the given ``TYPE``s in document order (all
+        entries if ``types`` is ``None``)
+        """
+        if types is None:
+            return iter(self.entries)
+        positions = [self._by_type[TYPE] for TYPE in set(types) if TYPE in self._by_type]
+        if len(positions) == 1:
+            return (self.entries[i] for i in positions[0])
+        return (self.entries[i] for i in merge(*positions))
+
+    def entry(self, node: Dict[str, Any]) -> indexed_node:
+        """
+        The ``indexed_node`` entry of an element of the document
+        """
+        try:
+            return self.entries[self._entry_of[id(node)]]
+        except KeyError:
+            raise ValueError("node is not part of the indexed document") from None
+
+    def parent(self, node: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        The element which contains ``node`` (``None`` for the root)
+        """
+        parent = self.entry(node).parent
+        return None if parent is None else self.entries[parent].node
+
+    def position(self, node: Dict[str, Any]) -> Optional[int]:
+        """
+        The position of ``node`` in its parent's ``VALUE`` list, or ``None``
+        if ``node`` is its parent's ``VALUE``
+        """
+        return self.entry(node).position
+
+    def ancestors(
+        self, node: Dict[str, Any], TYPE: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        The elements which contain ``node``, nearest first, optionally
+        restricted to those with the given ``TYPE``
+        """
+        parent = self.entry(node).parent
+        while parent is not None:
+            entry = self.entries[parent]
+            if TYPE is None or entry.node.get("TYPE", None) == TYPE:
+                yield entry.node
+            parent = entry.parent
+
+    def closest(self, node: Dict[str, Any], TYPE: str) -> Optional[Dict[str, Any]]:
+        """
+        The nearest ancestor of ``node`` with the given ``TYPE``, if any
+        """
+        return next(self.ancestors(node, TYPE), None)
+
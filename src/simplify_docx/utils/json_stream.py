@@ -0,0 +1,86 @@
+"""
+Utilities for writing a simplified document as JSON piece by piece
+"""
+import json
+from typing import Any, Callable, IO, Iterable, Optional
+
+
+class json_writer:
+    """
+    Writes JSON to a text file object incrementally, laid out exactly as
+    ``json.dump()`` would lay out the complete value
+
+    :param fp: The text file object to write to
+    :type fp: IO[str]
+    :param indent: Optional. The indentation; compact JSON (without any
+            white space) is written if ``indent`` is ``None``
+    :type indent: int
+    """
+
+    def __init__(self, fp: IO[str], indent: Optional[int] = None):
+        self.fp = fp
+        self.indent = indent
+        self.separators = (",", ":") if indent is None else (",", ": ")
+
+    def newline(self, depth: int) -> str:
+        """
+        The white space which starts a line at ``depth``
+        """
+        if self.indent is None:
+            return ""
+        return "\n" + " " * (self.indent * depth)
+
+    def write_value(self, value: Any, depth: int = 0) -> None:
+        """
+        Write a complete value which starts at ``depth``
+        """
+        out = json.dumps(value, indent=self.indent, separators=self.separators)
+        if self.indent is not None and depth:
+            # STRINGS NEVER CONTAIN A LITERAL NEWLINE, SO EVERY NEWLINE STARTS
+            # A LINE OF THE LAYOUT
+            out = out.replace("\n", self.newline(depth))
+        self.fp.write(out)
+
+    def write_array(
+        self,
+        items: Iterable[Any],
+        depth: int = 0,
+        write: Optional[Callable[[Any, int], None]] = None,
+    ) -> None:
+        """
+        Write an array, writing each item with ``write`` (``write_value`` by
+        default) as soon as it is produced
+        """
+        if write is None:
+            write = self.write_value
+        inner = self.newline(depth + 1)
+        empty = True
+        for item in items:
+            self.fp.write("[" if empty else ",")
+            self.fp.write(inner)
+            write(item, depth + 1)
+            empty = False
+        if empty:
+            self.fp.write("[]")
+        else:
+            self.fp.write(self.newline(depth) + "]")
+
+    def write_container(
+        self,
+        TYPE: str,
+        items: Iterable[Any],
+        depth: int = 0,
+        write: Optional[Callable[[Any, int], None]] = None,
+    ) -> None:
+        """
+        Write a simplified container element, ``{"TYPE": ..., "VALUE": [...]}``,
+        whose ``VALUE`` is written by ``write_array``
+        """
+        inner = self.newline(depth + 1)
+        key_separator = self.separators[1]
+        self.fp.write(
+            "{%s\"TYPE\"%s%s,%s\"VALUE\"%s"
+            % (inner, key_separator, json.dumps(TYPE), inner, key_separator)
+        )
+        self.write_array(items, depth + 1, write)
+        self.fp.write(self.newline(depth) + "}")
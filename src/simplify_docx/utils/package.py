@@ -0,0 +1,293 @@
+"""
+Utilities for reading the parts of a .docx package without loading the
+main document part
+"""
+import posixpath
+from zipfile import ZipFile
+from typing import Any, Dict, List, NamedTuple, Optional, Iterator, IO, Tuple, Union
+from lxml import etree
+from docx.oxml import parse_xml
+from docx.oxml.ns import qn
+
+try:
+    from docx.oxml.parser import element_class_lookup
+except ImportError:  # python-docx < 1.0
+    from docx.oxml import element_class_lookup
+
+from ..types import xmlFragment
+
+RT_OFFICE_DOCUMENT = (
+    "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+)
+RT_STYLES = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles"
+RT_NUMBERING = (
+    "http://schemas.openxmlformats.org/officeDocument/2006/relationships/numbering"
+)
+RT_ALT_CHUNK = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/aFChunk"
+RT_SUB_DOCUMENT = (
+    "http://schemas.openxmlformats.org/officeDocument/2006/relationships/subDocument"
+)
+# the relationship type of the (ink) parts referred to by w:contentPart
+RT_CONTENT_PART = (
+    "http://schemas.openxmlformats.org/officeDocument/2006/relationships/customXml"
+)
+_REL_TAG = "{http://schemas.openxmlformats.org/package/2006/relationships}Relationship"
+
+
+def relationships(zipfile: ZipFile, partname: str) -> Dict[str, Tuple[str, str]]:
+    """
+    The type and package path of each (internal) relationship of
+    ``partname`` by its id (``partname`` is ``""`` for the package
+    relationships)
+    """
+    base, name = posixpath.split(partname)
+    try:
+        rels = etree.fromstring(
+            zipfile.read(posixpath.join(base, "_rels", name + ".rels"))
+        )
+    except KeyError:
+        return {}
+    return {
+        rel.get("Id"): (
+            rel.get("Type"),
+            posixpath.normpath(posixpath.join(base, rel.get("Target"))).lstrip("/"),
+        )
+        for rel in rels.iter(_REL_TAG)
+        if rel.get("TargetMode") != "External"
+    }
+
+
+def related_targets(zipfile: ZipFile, partname: str, reltype: str) -> List[str]:
+    """
+    The package paths of the (internal) parts related to ``partname`` by
+    ``reltype`` (``partname`` is ``""`` for the package relationships)
+    """
+    return [
+        target
+        for _type, target in relationships(zipfile, partname).values()
+        if _type == reltype
+    ]
+
+
+def read_related(zipfile: ZipFile, partname: str, reltype: str) -> Optional[xmlFragment]:
+    """
+    Parse the (first) part related to ``partname`` by ``reltype``
+    """
+    targets = related_targets(zipfile, partname, reltype)
+    if not targets:
+        return None
+    return parse_xml(zipfile.read(targets[0]))
+
+
+class _element_holder:
+    """
+    Stands in for a python-docx part (or ``Styles`` object) with an ``element``
+    """
+
+    def __init__(self, element: Optional[xmlFragment]):
+        self.element = element
+
+
+class package_part:
+    """
+    Stands in for the python-docx ``DocumentPart`` of a document part of a
+    ``package_document`` (the main document part, or e.g. a subDoc)
+    """
+
+    def __init__(self, package: "package_document", partname: str):
+        self._package = package
+        self.partname = partname
+        self.numbering_part = _element_holder(
+            read_related(package.zipfile, partname, RT_NUMBERING)
+        )
+        self._rels: Optional[Dict[str, "package_relationship"]] = None
+
+    @property
+    def rels(self) -> Dict[str, "package_relationship"]:
+        """
+        The (internal) relationships of this part, by id.  These are rarely
+        needed (only by altChunk, subDoc and contentPart elements), so they
+        are read the first time they are requested, and each related part is
+        only parsed when its ``element`` is used.
+        """
+        if self._rels is None:
+            package = self._package
+            self._rels = {
+                rId: package_relationship(reltype, False, package.related_part(target))
+                for rId, (reltype, target) in relationships(
+                    package.zipfile, self.partname
+                ).items()
+            }
+        return self._rels
+
+    @property
+    def related_parts(self) -> Dict[str, "related_part"]:
+        """
+        The parts related to this part, by relationship id
+        """
+        return {rId: rel.target_part for rId, rel in self.rels.items()}
+
+
+class package_relationship(NamedTuple):
+    """
+    Stands in for a python-docx relationship of a ``package_part``
+    """
+
+    reltype: str
+    is_external: bool
+    target_part: "related_part"
+
+
+class related_part:
+    """
+    Stands in for a python-docx part related to a document part of a
+    ``package_document``.  Its ``element`` (the stand-in for the ``Document``
+    of the part) is parsed the first time it is requested; like the parts
+    which python-docx does not parse, a part which is not a WordprocessingML
+    document has no ``element``.
+    """
+
+    def __init__(self, package: "package_document", partname: str):
+        self._package = package
+        self.partname = partname
+        self._element: Optional["part_document"] = None
+
+    @property
+    def element(self) -> "part_document":
+        """
+        The document of the part
+        """
+        if self._element is None:
+            try:
+                root = parse_xml(self._package.zipfile.read(self.partname))
+            except (KeyError, etree.XMLSyntaxError):
+                root = None
+            if root is None or root.tag != qn("w:document"):
+                raise AttributeError("%s is not a document part" % self.partname)
+            self._element = part_document(self._package, self.partname, root)
+        return self._element
+
+
+class part_document:
+    """
+    Stands in for a python-docx ``Document`` given a document part of a
+    ``package_document`` and its element
+    """
+
+    def __init__(self, package: "package_document", partname: str, element: xmlFragment):
+        self.element = element
+        self.styles = _element_holder(read_related(package.zipfile, partname, RT_STYLES))
+        self.part = package_part(package, partname)
+
+
+class detached_part:
+    """
+    Stands in for the python-docx ``DocumentPart`` of a ``detached_document``
+    """
+
+    def __init__(self, numbering: Optional[xmlFragment] = None):
+        self.numbering_part = _element_holder(numbering)
+        # THE REST OF THE PACKAGE IS NOT AVAILABLE
+        self.related_parts: Dict[str, Any] = {}
+
+
+class detached_document:
+    """
+    Stands in for a python-docx ``Document`` given just the elements of its
+    document, styles and numbering parts (e.g. when they have been sent to
+    another process).  The parts related to the document part are not
+    available.
+    """
+
+    def __init__(
+        self,
+        element: xmlFragment,
+        styles: Optional[xmlFragment] = None,
+        numbering: Optional[xmlFragment] = None,
+    ):
+        self.element = element
+        self.styles = _element_holder(styles)
+        self.part = detached_part(numbering)
+
+
+class package_document:
+    """
+    A light-weight stand-in for a python-docx ``Document`` which provides the
+    styles and numbering needed by the simplified elements, and streams the
+    main document part instead of parsing it.
+    """
+
+    def __init__(self, source: Union[str, IO[bytes]]):
+        # THE PACKAGE STAYS OPEN UNTIL close()
+        self.zipfile = ZipFile(source)  # pylint: disable=consider-using-with
+        self._stream: Optional[IO[bytes]] = None
+        # package path -> related part, so that each part is parsed once
+        self._parts: Dict[str, related_part] = {}
+        self.document_path = related_targets(self.zipfile, "", RT_OFFICE_DOCUMENT)[0]
+        self.styles = _element_holder(read_related(self.zipfile, self.document_path, RT_STYLES))
+        self.part = package_part(self, self.document_path)
+
+    def related_part(self, partname: str) -> related_part:
+        """
+        The related part at the package path ``partname``
+        """
+        try:
+            return self._parts[partname]
+        except KeyError:
+            part = self._parts[partname] = related_part(self, partname)
+            return part
+
+    def iter_body(self) -> Iterator[xmlFragment]:
+        """
+        Stream the main document part, yielding each child of ``w:body`` as
+        soon as it has been parsed completely.  Use ``release()`` to discard
+        the children which have been processed.
+        """
+        with self.zipfile.open(self.document_path) as self._stream:
+            context = etree.iterparse(
+                self._stream,
+                events=("start", "end"),
+                remove_blank_text=True,
+                resolve_entities=False,
+                huge_tree=True,
+            )
+            context.set_element_class_lookup(element_class_lookup)
+
+            BODY = qn("w:body")
+            depth = 0
+            in_body = False
+            for event, node in context:
+                if event == "start":
+                    depth += 1
+                    if depth == 2:
+                        in_body = node.tag == BODY
+                    continue
+                depth -= 1
+                if depth == 2 and in_body:
+                    yield node
+
+    def close(self) -> None:
+        """
+        Close the stream of the main document part (if it is still open) and
+        the underlying zip file
+        """
+        if self._stream is not None:
+            self._stream.close()
+        self.zipfile.close()
+
+
+def release(x: xmlFragment) -> None:
+    """
+    Discard the child of ``w:body`` which contains ``x``, along with all the
+    preceding children of the body
+    """
+    BODY = qn("w:body")
+    node = x
+    parent = node.getparent()
+    while parent is not None and parent.tag != BODY:
+        node, parent = parent, parent.getparent()
+    if parent is None:
+        return
+    node.clear()
+    while node.getprevious() is not None:
+        del parent[0]
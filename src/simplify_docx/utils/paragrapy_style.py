@@ -1,6 +1,209 @@
 """
 Helpers for extracting paragraph indention levels
 """
+import math
+from typing import Dict, NamedTuple, Optional, Tuple, Any, List
+from weakref import WeakKeyDictionary
+from docx.oxml.ns import qn, nsmap
+from ..types import xmlFragment
+from .friendly_names import get_type_names
+
+_STYLE = qn("w:style")
+_STYLEID = qn("w:styleId")
+_ABSTRACTNUM = qn("w:abstractNum")
+_ABSTRACTNUMID = qn("w:abstractNumId")
+_NUM = qn("w:num")
+_LVL = qn("w:lvl")
+_LVLOVERRIDE = qn("w:lvlOverride")
+_ILVL = qn("w:ilvl")
+_VAL = qn("w:val")
+
+
+class _lookup_table:
+    """
+    Look up the children of a styles or numbering part element by an
+    identifying attribute.  Hits are checked against the live XML (the
+    child is still in the part and still has the same id), so the table
+    never needs to be compared with the part's contents; a miss rebuilds the
+    table, at most once per ``refresh()``.
+    """
+
+    __slots__ = ("element", "tag", "key", "table", "fresh", "__weakref__")
+
+    def __init__(self, element: xmlFragment, tag: str, key: str):
+        self.element = element
+        self.tag = tag
+        self.key = key
+        self.table: Dict[Optional[str], xmlFragment] = {}
+        self.fresh = False
+
+    def refresh(self) -> None:
+        """
+        Allow the next miss to rebuild the table
+        """
+        self.fresh = False
+
+    def get(self, value: Optional[str]) -> Optional[xmlFragment]:
+        """
+        The (first) child with the given id, if any
+        """
+        child = self.table.get(value)
+        if (
+            child is not None
+            and child.getparent() is self.element
+            and child.get(self.key) == value
+        ):
+            return child
+        if self.fresh:
+            return None
+        self.fresh = True
+        table: Dict[Optional[str], xmlFragment] = {}
+        for child in self.element.iterchildren(self.tag):
+            table.setdefault(child.get(self.key), child)
+        self.table = table
+        return table.get(value)
+
+
+class style_index:
+    """
+    Lookup tables for the style and numbering parts of a document, along
+    with the paragraph properties resolved with them during the current
+    simplification (see ``resolve_properties()``)
+    """
+
+    __slots__ = ("styles_element", "_styles", "_nums", "_abstractNums", "resolved")
+
+    resolved: Dict[Tuple, "paragraph_properties"]
+
+    def __init__(self, styles: Optional[xmlFragment], numbering: Optional[xmlFragment]):
+        self.styles_element = styles
+        self._styles = None if styles is None else _get_table(styles, _STYLE, _STYLEID)
+        if numbering is None:
+            self._nums = self._abstractNums = None
+        else:
+            self._nums = _get_table(numbering, _NUM, qn("w:numId"))
+            self._abstractNums = _get_table(numbering, _ABSTRACTNUM, _ABSTRACTNUMID)
+        self.resolved = {}
+
+    def style(self, styleId: Optional[str]) -> Optional[xmlFragment]:
+        """
+        The ``w:style`` with the given id
+        """
+        if self._styles is None:
+            return None
+        return self._styles.get(styleId)
+
+    def level(self, numId: Optional[str], ilvl: Optional[str]) -> Optional[xmlFragment]:
+        """
+        The ``w:lvl`` of the given numbering instance and level: either a
+        level override of the ``w:num`` (the last one wins) or the level of
+        its abstract numbering definition
+        """
+        if self._nums is None or self._abstractNums is None:
+            return None
+        num = self._nums.get(numId)
+        if num is None:
+            return None
+        out = None
+        for override in num.iterchildren(_LVLOVERRIDE):
+            lvl = override.find(_LVL)
+            if lvl is not None and override.get(_ILVL) == ilvl:
+                out = lvl
+        if out is None:
+            abstractNumId = num.find(_ABSTRACTNUMID)
+            abstractNum = (
+                None if abstractNumId is None else self._abstractNums.get(abstractNumId.get(_VAL))
+            )
+            if abstractNum is not None:
+                out = next(
+                    (lvl for lvl in abstractNum.iterchildren(_LVL) if lvl.get(_ILVL) == ilvl),
+                    None,
+                )
+        return out
+
+    def iter_styles(self):
+        """
+        Iterate over the ``w:style`` elements
+        """
+        if self.styles_element is None:
+            return iter(())
+        return self.styles_element.iterchildren(_STYLE)
+
+
+# document part -> style_index
+__indexes__: "WeakKeyDictionary[object, style_index]" = WeakKeyDictionary()
+
+# styles / numbering part element -> (tag, key) -> lookup table, so that
+# parts which share a styles or numbering part (e.g. altChunks) share the
+# lookup tables too
+__tables__: "WeakKeyDictionary[object, Dict[Tuple[str, str], _lookup_table]]" = (
+    WeakKeyDictionary()
+)
+
+
+def _get_table(element: xmlFragment, tag: str, key: str) -> _lookup_table:
+    try:
+        tables = __tables__[element]
+    except KeyError:
+        tables = __tables__[element] = {}
+    try:
+        return tables[(tag, key)]
+    except KeyError:
+        table = tables[(tag, key)] = _lookup_table(element, tag, key)
+        return table
+
+
+def get_style_index(doc) -> style_index:
+    """
+    Get the lookup tables for a document's styles and numbering, which are
+    built the first time they are requested and checked against the current
+    styles and numbering by ``refresh_style_index()``
+    """
+    try:
+        return __indexes__[doc.part]
+    except KeyError:
+        return refresh_style_index(doc)
+
+
+def refresh_style_index(doc) -> style_index:
+    """
+    Start a simplification with the lookup tables for a document's styles
+    and numbering: the properties resolved during an earlier simplification
+    are dropped, and a style or numbering definition which is not found in
+    the tables may rebuild them once (to pick up edits to those parts).
+    Nothing is serialized or compared, so this is cheap enough to call once
+    per simplification (and per related part).
+    """
+    styles, numbering = style_elements(doc)
+    index = style_index(styles, numbering)
+    for element in (styles, numbering):
+        if element is not None:
+            for table in __tables__.get(element, {}).values():
+                table.refresh()
+    __indexes__[doc.part] = index
+    return index
+
+
+def _styles_element(doc) -> Optional[xmlFragment]:
+    try:
+        return doc.styles.element
+    except (AttributeError, KeyError):
+        return None
+
+
+def _numbering_element(doc) -> Optional[xmlFragment]:
+    try:
+        return doc.part.numbering_part.element
+    except (AttributeError, KeyError, NotImplementedError):
+        return None
+
+
+def style_elements(doc) -> Tuple[Optional[xmlFragment], Optional[xmlFragment]]:
+    """
+    The styles and numbering elements of a document (either may be ``None``)
+    """
+    return _styles_element(doc), _numbering_element(doc)
+
 
 def get_pStyle(p, doc):
     """
@@ -8,8 +211,7 @@ def get_pStyle(p, doc):
     """
     if getattr(p, "pPr", None) is not None and \
             p.pPr.pStyle is not None:
-        return doc.styles.element.find("w:style[@w:styleId='%s']" % p.pPr.pStyle.val,
-                doc.styles.element.nsmap)
+        return get_style_index(doc).style(p.pPr.pStyle.val)
     return None
 
 
@@ -20,16 +222,11 @@ def get_num_style(p, doc):
     if getattr(p, "pPr", None) is not None \
             and p.pPr.numPr is not None\
             and p.pPr.numPr.numId is not None:
-        # the numbering style doc
-        np = doc.part.numbering_part
-        # the map between numbering id and the numbering style
-        num = np.element.find("w:num[@w:numId='%s']" % p.pPr.numPr.numId.val,
-                               np.element.nsmap)
-        _path = "w:abstractNum[@w:abstractNumId='%s']" % num.abstractNumId.val
-        # the numbering styles themselves
-        abstractNumbering = np.element.find(_path, np.element.nsmap)
-        return abstractNumbering.find("w:lvl[@w:ilvl='%s']" % p.pPr.numPr.ilvl.val,
-                                      np.element.nsmap)
+        # the numbering style for the paragraph's numbering id and level
+        ilvl = p.pPr.numPr.ilvl
+        return get_style_index(doc).level(
+            str(p.pPr.numPr.numId.val), "0" if ilvl is None else str(ilvl.val)
+        )
     return None
 
 
@@ -64,3 +261,332 @@ def get_paragraph_ind(p, doc):
             pStyle.pPr.ind is not None:
         return pStyle.pPr.ind
     return None
+
+
+# --------------------------------------------------
+# Effective paragraph properties
+# --------------------------------------------------
+
+
+class paragraph_properties(NamedTuple):
+    """
+    The effective properties of a paragraph, as raw attribute values
+    """
+
+    ind: Dict[str, str]  # w:ind attributes (start/end as left/right)
+    numId: Optional[str]
+    ilvl: Optional[str]
+    outlineLvl: Optional[str]
+    spacing: Dict[str, str]  # w:spacing attributes
+
+
+_W = "{%s}" % nsmap["w"]
+_IND_ALIASES = {"start": "left", "end": "right"}
+_IND = qn("w:ind")
+_SPACING = qn("w:spacing")
+_NUMPR = qn("w:numPr")
+_NUMID = qn("w:numId")
+_OUTLINELVL = qn("w:outlineLvl")
+_PPR = qn("w:pPr")
+_BASEDON = qn("w:basedOn")
+_TBL = qn("w:tbl")
+_TBLPR = qn("w:tblPr")
+_TBLSTYLE = qn("w:tblStyle")
+_BODY = qn("w:body")
+
+
+def _merge_pPr(props: Dict[str, Any], pPr: Optional[xmlFragment]) -> None:
+    """
+    Apply the properties in a ``w:pPr`` element on top of ``props``
+    """
+    if pPr is None:
+        return
+    for child in pPr:
+        tag = child.tag
+        if tag == _IND:
+            ind = props["ind"]
+            for key, value in child.attrib.items():
+                if key.startswith(_W):
+                    key = key[len(_W):]
+                    key = _IND_ALIASES.get(key, key)
+                    if key == "firstLine":
+                        ind.pop("hanging", None)
+                    elif key == "hanging":
+                        ind.pop("firstLine", None)
+                    ind[key] = value
+        elif tag == _SPACING:
+            spacing = props["spacing"]
+            for key, value in child.attrib.items():
+                if key.startswith(_W):
+                    spacing[key[len(_W):]] = value
+        elif tag == _NUMPR:
+            _ilvl = child.find(_ILVL)
+            if _ilvl is not None:
+                props["ilvl"] = _ilvl.get(_VAL)
+            _numId = child.find(_NUMID)
+            if _numId is not None:
+                props["numId"] = _numId.get(_VAL)
+        elif tag == _OUTLINELVL:
+            props["outlineLvl"] = child.get(_VAL)
+
+
+def _style_chain(styles: style_index, styleId: Optional[str]) -> List[xmlFragment]:
+    """
+    The style and its ``basedOn`` ancestors, most distant ancestor first
+    """
+    chain: List[xmlFragment] = []
+    seen = set()
+    while styleId is not None and styleId not in seen:
+        seen.add(styleId)
+        style = styles.style(styleId)
+        if style is None:
+            break
+        chain.append(style)
+        basedOn = style.find(_BASEDON)
+        styleId = None if basedOn is None else basedOn.get(_VAL)
+    chain.reverse()
+    return chain
+
+
+def _default_style(styles: style_index, style_type: str) -> Optional[str]:
+    """
+    The id of the default style of the given type
+    """
+    for style in styles.iter_styles():
+        if style.get(qn("w:type")) == style_type and style.get(qn("w:default")) in (
+            "1",
+            "true",
+            "on",
+        ):
+            return style.get(_STYLEID)
+    return None
+
+
+def resolve_properties(
+    doc,
+    styleId: Optional[str],
+    numPr: Tuple[Optional[str], Optional[str]],
+    in_table: bool = False,
+    tblStyleId: Optional[str] = None,
+) -> paragraph_properties:
+    """
+    The properties of a paragraph with the given paragraph style, direct
+    numbering (``(numId, ilvl)``) and table style (if it is in a table),
+    excluding the paragraph's other direct formatting, according to the style hierarchy listed in section
+    17.7.2:
+
+    * Document defaults
+    * Table styles
+    * Numbering styles
+    * Paragraph styles (including their ``basedOn`` ancestors)
+
+    except that numbering applied directly to the paragraph takes precedence
+    over the paragraph style (as it does in Word). Each combination is
+    resolved once per document.
+    """
+    index = get_style_index(doc)
+    key = (styleId, numPr, in_table, tblStyleId)
+    try:
+        return index.resolved[key]
+    except KeyError:
+        pass
+
+    props: Dict[str, Any] = {
+        "ind": {},
+        "numId": None,
+        "ilvl": None,
+        "outlineLvl": None,
+        "spacing": {},
+    }
+
+    # DOCUMENT DEFAULTS
+    styles_element = index.styles_element
+    if styles_element is not None:
+        _merge_pPr(
+            props,
+            styles_element.find("%s/%s/%s" % (qn("w:docDefaults"), qn("w:pPrDefault"), _PPR)),
+        )
+
+    # TABLE STYLES
+    if in_table and tblStyleId is None:
+        tblStyleId = _default_style(index, "table")
+    for style in _style_chain(index, tblStyleId):
+        _merge_pPr(props, style.find(_PPR))
+
+    # THE PARAGRAPH STYLE (WHICH MAY REFERENCE A NUMBERING STYLE)
+    if styleId is None:
+        styleId = _default_style(index, "paragraph")
+    style_props: Dict[str, Any] = {
+        "ind": {},
+        "numId": None,
+        "ilvl": None,
+        "outlineLvl": None,
+        "spacing": {},
+    }
+    chain = [style.find(_PPR) for style in _style_chain(index, styleId)]
+    for pPr in chain:
+        _merge_pPr(style_props, pPr)
+
+    numId, ilvl = numPr[0], numPr[1]
+    direct_numbering = numId is not None
+    if numId is None:
+        numId = style_props["numId"]
+    if ilvl is None:
+        ilvl = style_props["ilvl"]
+    lvl = None
+    if numId is not None and numId != "0":
+        lvl = index.level(numId, "0" if ilvl is None else ilvl)
+
+    # NUMBERING AND PARAGRAPH STYLES
+    if direct_numbering:
+        for pPr in chain:
+            _merge_pPr(props, pPr)
+        if lvl is not None:
+            _merge_pPr(props, lvl.find(_PPR))
+    else:
+        if lvl is not None:
+            _merge_pPr(props, lvl.find(_PPR))
+        for pPr in chain:
+            _merge_pPr(props, pPr)
+
+    props["numId"] = numId
+    props["ilvl"] = ilvl
+
+    out = paragraph_properties(**props)
+    index.resolved[key] = out
+    return out
+
+
+def get_table_style(p: xmlFragment) -> Tuple[bool, Optional[str]]:
+    """
+    Whether the paragraph is in a table, and the style of the (innermost)
+    table containing the paragraph
+    """
+    node = p.getparent()
+    while node is not None:
+        tag = node.tag
+        if tag == _TBL:
+            tblStyle = node.find("%s/%s" % (_TBLPR, _TBLSTYLE))
+            return True, None if tblStyle is None else tblStyle.get(_VAL)
+        if tag == _BODY:
+            break
+        node = node.getparent()
+    return False, None
+
+
+def get_paragraph_properties(p: xmlFragment, doc) -> paragraph_properties:
+    """
+    The effective properties of a paragraph, including direct formatting
+    """
+    pPr = p.find(_PPR)
+    styleId: Optional[str] = None
+    numPr: Tuple[Optional[str], Optional[str]] = (None, None)
+    if pPr is not None:
+        pStyle = pPr.find(qn("w:pStyle"))
+        if pStyle is not None:
+            styleId = pStyle.get(_VAL)
+        _numPr = pPr.find(_NUMPR)
+        if _numPr is not None:
+            _numId = _numPr.find(_NUMID)
+            _ilvl = _numPr.find(_ILVL)
+            numPr = (
+                None if _numId is None else _numId.get(_VAL),
+                None if _ilvl is None else _ilvl.get(_VAL),
+            )
+
+    in_table, tblStyleId = get_table_style(p)
+    base = resolve_properties(doc, styleId, numPr, in_table, tblStyleId)
+    if pPr is None:
+        return base
+
+    props: Dict[str, Any] = {
+        "ind": dict(base.ind),
+        "numId": base.numId,
+        "ilvl": base.ilvl,
+        "outlineLvl": base.outlineLvl,
+        "spacing": dict(base.spacing),
+    }
+    _merge_pPr(props, pPr)
+    # numbering was resolved with the paragraph's own numPr above
+    props["numId"], props["ilvl"] = base.numId, base.ilvl
+    return paragraph_properties(**props)
+
+
+_UNITS = {"mm": 1440 / 25.4, "cm": 1440 / 2.54, "in": 1440.0, "pt": 20.0, "pc": 240.0, "pi": 240.0}
+_ON = ("1", "true", "on")
+
+
+def to_twips(value: str) -> Optional[int]:
+    """
+    Convert a (signed) twips measure, or a universal measure such as
+    ``1.5in``, to twips.  Fractional twips (e.g. ``720.0``) are rounded, and
+    measures which are not finite (e.g. ``INF``) are treated as missing and
+    give ``None``.
+    """
+    value = value.strip()
+    try:
+        twips = float(value)
+    except ValueError:
+        try:
+            twips = float(value[:-2]) * _UNITS[value[-2:].lower()]
+        except (KeyError, ValueError):
+            raise ValueError("Invalid measure: %r" % value) from None
+    if not math.isfinite(twips):
+        return None
+    return int(round(twips))
+
+
+def indentation_json(
+    props: paragraph_properties, options: Optional[Dict[str, Any]] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    The effective indentation of a paragraph as JSON
+    """
+    out: Dict[str, Any] = {}
+    for key in ("left", "right", "firstLine", "hanging"):
+        value = props.ind.get(key)
+        if value is not None:
+            twips = to_twips(value)
+            if twips is not None:
+                out[key] = twips
+    if not out:
+        return None
+    return dict({"TYPE": get_type_names(options)["CT_Ind"]}, **out)
+
+
+def numbering_json(
+    props: paragraph_properties, options: Optional[Dict[str, Any]] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    The effective numbering of a paragraph as JSON
+    """
+    if props.numId is None:
+        return None
+    out: Dict[str, Any] = {"TYPE": get_type_names(options)["numPr"]}
+    if props.ilvl is not None:
+        out["ilvl"] = int(props.ilvl)
+    out["numId"] = int(props.numId)
+    return out
+
+
+def spacing_json(
+    props: paragraph_properties, options: Optional[Dict[str, Any]] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    The effective spacing of a paragraph as JSON
+    """
+    if not props.spacing:
+        return None
+    out: Dict[str, Any] = {"TYPE": get_type_names(options)["CT_Spacing"]}
+    for key, value in props.spacing.items():
+        if key in ("before", "after", "line"):
+            twips = to_twips(value)
+            if twips is not None:
+                out[key] = twips
+        elif key in ("beforeLines", "afterLines"):
+            out[key] = int(value)
+        elif key in ("beforeAutospacing", "afterAutospacing"):
+            out[key] = value in _ON
+        else:
+            out[key] = value
+    return out
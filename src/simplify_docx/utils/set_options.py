@@ -2,21 +2,78 @@
 Utilities for setting options that change how the document is traversed
 """
 
+from functools import lru_cache
 from docx.oxml.ns import qn
-from typing import Dict, Union, Type
-from ..iterators.generic import register_iterator, build_iterators
+from typing import Dict, Union, Type, Tuple, Sequence, Any
+from ..iterators.generic import (
+    register_iterator,
+    build_iterators,
+    use_iterators,
+    ElementHandlers,
+    __definitions__,
+)
 from ..elements import empty, fldSimple, hyperlink, customXml, subDoc, el
 
+# The options which change how the document is traversed
+__iterator_options__: Tuple[str, ...] = (
+    "flatten-simpleField",
+    "flatten-hyperlink",
+    "flatten-smartTag",
+    "flatten-customXml",
+)
+
+# The number of distinct option sets for which the built iterators are kept
+__cache_size__: int = 32
+
+
 def set_options(options: Dict[str, Union[str, bool, int, float]]) -> None:
     """
-    Register iterators depending on the selected options
+    Register iterators depending on the selected options (not thread safe;
+    see ``get_iterators()``)
+    """
+    use_iterators(get_iterators(options))
+
+
+def get_iterators(
+    options: Dict[str, Union[str, bool, int, float]]
+) -> Dict[str, ElementHandlers]:
+    """
+    Get the built iterators for the selected options without changing the
+    default iterators.  The returned tables are shared and must not be
+    modified.
+    """
+    return __build_for_options__(options_key(options, __iterator_options__))
+
+
+def options_key(
+    options: Dict[str, Any], keys: Sequence[str]
+) -> Tuple[Tuple[str, Any], ...]:
+    """
+    A canonical, hashable representation of the named options
     """
-    __set_EG_PContents__(options)
-    __set_EG_ContentRunContents__(options)
-    build_iterators()
+    return tuple((key, options[key]) for key in keys)
 
 
-def __set_EG_PContents__(options: Dict[str, Union[str, bool, int, float]]) -> None:
+@lru_cache(maxsize=__cache_size__)
+def __build_for_options__(
+    key: Tuple[Tuple[str, Any], ...]
+) -> Dict[str, ElementHandlers]:
+    """
+    Register and build the iterators for a given set of options.  The result
+    is memoized, so repeat calls with the same options skip registration and
+    resolution entirely.
+    """
+    options = dict(key)
+    definitions = dict(__definitions__)
+    __set_EG_PContents__(options, definitions)
+    __set_EG_ContentRunContents__(options, definitions)
+    return build_iterators(definitions)
+
+
+def __set_EG_PContents__(
+    options: Dict[str, Union[str, bool, int, float]],
+    definitions: Dict[str, ElementHandlers],
+) -> None:
     """
     group:"EG_PContent"
     """
@@ -44,11 +101,13 @@ def __set_EG_PContents__(options: Dict[str, Union[str, bool, int, float]]) -> No
         TAGS_TO_IGNORE=[qn("w:customXmlPr"), qn("w:smartTagPr")],
         extends=["EG_RunLevelElts"],
         check_name=False,
+        definitions=definitions,
     )
 
 
 def __set_EG_ContentRunContents__(
-    options: Dict[str, Union[str, bool, int, float]]
+    options: Dict[str, Union[str, bool, int, float]],
+    definitions: Dict[str, ElementHandlers],
 ) -> None:
     """
     group: EG_ContentRunContent
@@ -81,4 +140,5 @@ def __set_EG_ContentRunContents__(
         },
         extends=["EG_RunLevelElts"],
         check_name=False,
+        definitions=definitions,
     )
@@ -2,9 +2,24 @@
 A utility function for walking a simplified document
 """
 from inspect import signature
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
 
+Location = Tuple[Dict[str, Any], Any, Optional[int]]
 
-def walk(document, fun, TYPE="document", no_iter=None):
+
+def _takes_location(fun) -> bool:
+    """
+    Whether ``fun`` is called with the parent and position of the node as
+    well as the node itself
+    """
+    _params = signature(fun).parameters
+    return len(_params) > 1 or any(
+        param.kind in (param.VAR_KEYWORD, param.VAR_POSITIONAL)
+        for param in _params.values()
+    )
+
+
+def walk(document, fun, TYPE="document", no_iter=None, index=None):
     """
     Walk an document tree and apply a function to matching nodes
 
@@ -25,67 +40,183 @@ def walk(document, fun, TYPE="document", no_iter=None):
             ``no_iter=["paragraph"]`` would prevent the walker from traversing
             children (``VALUE``s) paragraph nodes.
     :type no_iter: Sequence[str]
+    :param index: Optional. A ``document_index`` of ``document``, in which
+            case the matching nodes are looked up rather than searched for
+    :type index: document_index
 
     :return: ``None``
     :return type: None
     """
-    _sig = signature(fun)
-    _params = _sig.parameters
+    has_multiple_parameters = _takes_location(fun)
 
-    has_multiple_parameters = len(_params) > 1 or any(
-        param.kind in (param.VAR_KEYWORD, param.VAR_POSITIONAL)
-        for param in _params.values()
-    )
+    if index is not None:
+        nodes = _iter_index(index, document, None if TYPE is None else (TYPE,), no_iter)
+    else:
+        nodes = _iter_tree(document, no_iter)
 
-    stack = [(document, None)]
-    while True:
-        try:
-            current, index = stack.pop()
-        except IndexError:
-            break
+    for current, parent, position in nodes:
+        if TYPE is None or current.get("TYPE", None) == TYPE:
+            if has_multiple_parameters:
+                out = fun(current, parent, position)
+            else:
+                out = fun(current)
+            if out is not None:
+                return out
+    return None
+
+
+Visitors = Dict[Optional[str], Union[Callable, Sequence[Callable]]]
+
+
+def walk_many(document, visitors: Visitors, no_iter=None, index=None):
+    """
+    Apply several functions to the nodes of a document tree in a single walk
+
+    :param document: Simplified Docx element to walk
+    :type document:object
+    :param visitors: A mapping from node ``TYPE``s to a function (or a list
+            of functions) to apply at each node of that ``TYPE``.  The
+            functions under the key ``None`` are applied at every node.  Each
+            function is called as it would be by ``walk()``, and once it
+            returns a value other than ``None`` it is not called again.
+    :type visitors: Dict[Optional[str], Union[Callable, Sequence[Callable]]]
+    :param no_iter: Optional. As for ``walk()``
+    :type no_iter: Sequence[str]
+    :param index: Optional. A ``document_index`` of ``document``
+    :type index: document_index
+
+    :return: The value returned by each function which stopped early (or
+            ``None``), in the shape of ``visitors``
+    :return type: Dict[Optional[str], List[Any]]
+    """
+    results: Dict[Optional[str], List[Any]] = {}
+    plan: Dict[Optional[str], List[Tuple[Callable, bool, List[Any], int]]] = {}
+    for TYPE, funs in visitors.items():
+        if callable(funs):
+            funs = [funs]
+        results[TYPE] = [None] * len(funs)
+        plan[TYPE] = [
+            (fun, _takes_location(fun), results[TYPE], i) for i, fun in enumerate(funs)
+        ]
+    active = sum(len(handlers) for handlers in plan.values())
+    if not active:
+        return results
 
-        if index is None:
-            # CURRENT IS AN OBJECT:
+    if index is not None:
+        nodes = _iter_index(
+            index, document, None if None in plan else tuple(plan), no_iter
+        )
+    else:
+        nodes = _iter_tree(document, no_iter)
 
-            # APPLY THE FUNCTION
-            if TYPE is None or current.get("TYPE", None) == TYPE:
+    catch_all = plan.get(None)
+    for current, parent, position in nodes:
+        TYPE = current.get("TYPE", None)
+        for handlers in (plan.get(TYPE) if TYPE is not None else None, catch_all):
+            if not handlers:
+                continue
+            finished = None
+            for handler in handlers:
+                fun, has_multiple_parameters, out, i = handler
                 if has_multiple_parameters:
-                    try:
-                        parent, parent_index = stack[-1]
-                    except IndexError:
-                        out = fun(current, None, None)
-                    else:
-                        out = fun(current, parent, parent_index - 1)
+                    value = fun(current, parent, position)
                 else:
-                    out = fun(current)
-                if out is not None:
-                    return out
-
-            val = current.get("VALUE", None)
-            if isinstance(val, dict) and current.get("TYPE", None):
-                # CHILD IS AN ELEMENT TO BE WAKLED
-                stack.append((val, None))
-                continue
+                    value = fun(current)
+                if value is not None:
+                    out[i] = value
+                    if finished is None:
+                        finished = []
+                    finished.append(handler)
+            if finished:
+                # RETIRE THE VISITORS WHICH RETURNED A VALUE
+                handlers[:] = [h for h in handlers if h not in finished]
+                active -= len(finished)
+                if not active:
+                    return results
+    return results
+
+
+def _iter_tree(document, no_iter=None) -> Iterator[Location]:
+    """
+    Traverse a document tree (depth first, in document order), yielding each
+    node with its containing element (or ``VALUE`` list) and position.  The
+    children of a node are read after it has been yielded, so that changes
+    made by the caller are taken into account.
+    """
+    stack: List[Iterator[Location]] = [iter(((document, None, None),))]
+    while stack:
+        for current, parent, position in stack[-1]:
+            yield current, parent, position
 
-            if (
-                isinstance(val, list)
-                and val
-                and val[0].get("TYPE", None)
-                and (no_iter is None or current["TYPE"] not in no_iter)
-            ):
+            val = walked_value(current)
+            if isinstance(val, dict):
+                # CHILD IS AN ELEMENT TO BE WALKED
+                stack.append(iter(((val, current, None),)))
+            elif val is not None and (no_iter is None or current["TYPE"] not in no_iter):
                 # CHILD IS A LIST OF ELEMENTS
-                stack.append((val, 0))
+                stack.append(_iter_list(val))
+            break
+        else:
+            stack.pop()
+
+
+def walked_value(node: Dict[str, Any]) -> Any:
+    """
+    The ``VALUE`` of a node if the walker descends into it (either an
+    element, or a list of elements whose first item is an element), and
+    ``None`` otherwise
+    """
+    val = node.get("VALUE", None)
+    if isinstance(val, dict):
+        return val if node.get("TYPE", None) else None
+    if (
+        isinstance(val, list)
+        and val
+        and isinstance(val[0], dict)
+        and val[0].get("TYPE", None)
+    ):
+        return val
+    return None
+
+
+def _iter_list(val: List[Any]) -> Iterator[Location]:
+    """
+    Yield the elements of a ``VALUE`` list with their location
+    """
+    for i, child in enumerate(val):
+        if isinstance(child, dict):
+            yield child, val, i
+
+
+def _iter_index(index, document, types, no_iter=None) -> Iterator[Location]:
+    """
+    Yield the indexed nodes with the given ``TYPE``s (all nodes if ``types``
+    is ``None``) as they would be yielded by ``_iter_tree()``
+    """
+    if index.root is not document:
+        raise ValueError("the index was not built for this document")
+
+    entries = index.entries
+    for entry in index.entries_of(types):
+        if no_iter is not None:
+            # SKIP NODES WITHIN THE VALUES OF A no_iter ELEMENT
+            current = entry
+            while current.parent is not None:
+                parent = entries[current.parent]
+                if current.position is not None and parent.node.get("TYPE", None) in no_iter:
+                    break
+                current = parent
+            else:
+                current = None
+            if current is not None:
                 continue
 
+        if entry.parent is None:
+            yield entry.node, None, None
         else:
-            # CURRENT IS A LIST
-            try:
-                nxt = current[index]
-            except IndexError:
-                pass
+            parent_node = entries[entry.parent].node
+            if entry.position is None:
+                yield entry.node, parent_node, None
             else:
-                stack.append((current, index + 1))
-                stack.append((nxt, None))
-                del nxt
+                yield entry.node, parent_node["VALUE"], entry.position
 
-        del current, index
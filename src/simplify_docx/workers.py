@@ -0,0 +1,35 @@
+"""
+The state of the worker processes which simplify documents (for
+``simplify_many()``) and related parts (when ``related-parts-workers`` is
+more than 1)
+"""
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# the simplifier (and result cache) used by each worker process
+__worker_simplifier__: Any = None
+__worker_cache__: Any = None
+
+
+def init_worker(
+    factory: Callable[[Optional[Dict[str, Any]]], Any],
+    options: Optional[Dict[str, Any]],
+    cache: Any = None,
+) -> None:
+    """
+    Build the simplifier for the requested options once per worker process
+
+    :param factory: The class of the simplifier (``Simplifier``)
+    :param options: Optional. The simplification options
+    :type options: Dict[str, Any]
+    :param cache: Optional. The ``result_cache`` of the worker
+    """
+    global __worker_simplifier__, __worker_cache__  # pylint: disable=global-statement
+    __worker_simplifier__ = factory(options)
+    __worker_cache__ = cache
+
+
+def worker_state() -> Tuple[Any, Any]:
+    """
+    The simplifier and result cache built by ``init_worker()``
+    """
+    return __worker_simplifier__, __worker_cache__
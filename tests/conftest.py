@@ -0,0 +1,52 @@
+"""
+Shared fixtures for the tests
+"""
+import os
+import sys
+
+import docx
+import pytest
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.opc.packuri import PackURI
+from docx.opc.part import Part
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+
+class chunk_part(Part):
+    """
+    A related part whose ``element`` is the Document of the part, as the
+    altChunk and subDoc elements expect
+    """
+
+    def __init__(self, partname: str, document, package):
+        super().__init__(PackURI(partname), "application/xml", b"", package)
+        self.element = document
+
+
+@pytest.fixture
+def add_chunk():
+    """
+    Add a reference to a related document at the end of a document's body,
+    returning the related document
+    """
+    count = [0]
+
+    def add(main, text=None, chunk=None, tag="w:altChunk"):
+        if chunk is None:
+            chunk = docx.Document()
+            chunk.add_paragraph(text)
+        count[0] += 1
+        part = chunk_part("/word/chunk%d.xml" % count[0], chunk, main.part.package)
+        rId = main.part.relate_to(part, RT.A_F_CHUNK)
+        body = main.element.body
+        body.insert(
+            len(body) - 1,
+            parse_xml('<%s %s r:id="%s"/>' % (tag, nsdecls("w", "r"), rId)),
+        )
+        return chunk
+
+    return add
+
@@ -0,0 +1,112 @@
+"""
+Tests for the simplification of many documents in parallel
+"""
+import os
+import threading
+import time
+
+import docx
+import pytest
+from simplify_docx import batch, simplify
+
+
+def _save(path, text):
+    doc = docx.Document()
+    doc.add_paragraph(text)
+    doc.save(path)
+    return path
+
+
+@pytest.fixture
+def sources(tmp_path):
+    paths = [_save(str(tmp_path / ("%d.docx" % i)), "document %d" % i) for i in range(4)]
+    with open(paths[1], "rb") as fh:
+        contents = fh.read()
+    return [paths[0], contents, b"not a docx", paths[2], paths[3]]
+
+
+@pytest.mark.parametrize("max_workers,chunksize", [(1, 1), (2, 1), (2, 2)])
+def test_results_in_order(sources, max_workers, chunksize):
+    results = list(
+        batch.simplify_many(sources, max_workers=max_workers, chunksize=chunksize)
+    )
+    assert [result.index for result in results] == list(range(len(sources)))
+    assert [result.path for result in results] == [
+        source if isinstance(source, str) else None for source in sources
+    ]
+    # A DOCUMENT WHICH FAILS DOES NOT INTERRUPT THE BATCH
+    assert results[2].value is None and "Traceback" in results[2].error
+    for result in results[:2] + results[3:]:
+        assert result.error is None
+    assert results[0].value == simplify(docx.Document(sources[0]))
+
+
+def test_unordered_results(sources):
+    results = list(batch.simplify_many(sources, max_workers=2, ordered=False))
+    assert sorted(result.index for result in results) == list(range(len(sources)))
+
+
+def test_results_are_cached(sources, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    first = list(batch.simplify_many(sources, max_workers=1, cache_dir=cache_dir))
+    assert os.listdir(cache_dir)
+    second = list(batch.simplify_many(sources, max_workers=2, cache_dir=cache_dir))
+    assert [result.value for result in second] == [result.value for result in first]
+
+
+def test_chunksize_must_be_positive():
+    with pytest.raises(ValueError):
+        list(batch.simplify_many([], chunksize=0))
+
+
+class _crash(str):
+    """
+    A source which kills the worker process which receives it
+    """
+
+    def __reduce__(self):
+        return (os._exit, (1,))  # pylint: disable=protected-access
+
+
+class _hang(str):
+    """
+    A source which the worker process which receives it never gets to
+    """
+
+    def __reduce__(self):
+        return (time.sleep, (60,))
+
+
+def _simplify_many(*args, **kwargs):
+    """
+    Run ``simplify_many()``, failing (instead of hanging) if it does not
+    complete in time
+    """
+    out = []
+    thread = threading.Thread(
+        target=lambda: out.extend(batch.simplify_many(*args, **kwargs)), daemon=True
+    )
+    thread.start()
+    thread.join(120)
+    assert not thread.is_alive(), "simplify_many() did not complete"
+    return sorted(out)
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+@pytest.mark.parametrize("chunksize", [1, 2])
+def test_a_crashed_worker_fails_only_its_document(sources, ordered, chunksize):
+    sources = sources[:2] + [_crash("crash")] + sources[3:] + [_crash("crash")]
+    results = _simplify_many(sources, max_workers=2, chunksize=chunksize, ordered=ordered)
+    assert [result.index for result in results] == list(range(len(sources)))
+    for index in (2, 5):
+        assert "BrokenProcessPool" in results[index].error
+    for result in results[:2] + results[3:5]:
+        assert result.error is None and result.value is not None
+
+
+def test_a_stuck_worker_times_out(sources):
+    sources = sources[:2] + [_hang("hang")]
+    results = _simplify_many(sources, max_workers=2, timeout=3)
+    assert "TimeoutError" in results[2].error
+    for result in results[:2]:
+        assert result.error is None and result.value is not None
@@ -0,0 +1,96 @@
+"""
+Tests for the on-disk result cache
+"""
+import io
+import zipfile
+
+import docx
+from simplify_docx import result_cache, simplify
+from simplify_docx.cache import package_digest
+
+_RELS = (
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    "%s</Relationships>"
+)
+_REL = (
+    '<Relationship Id="%s" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+    'relationships/%s" Target="%s"/>'
+)
+
+
+def test_overwriting_an_entry_does_not_grow_the_size(tmp_path):
+    cache = result_cache(str(tmp_path))
+    cache.put("a", {"TYPE": "document", "VALUE": []})
+    size = cache._size  # pylint: disable=protected-access
+    for _ in range(5):
+        cache.put("a", {"TYPE": "document", "VALUE": []})
+    assert cache._size == size  # pylint: disable=protected-access
+    assert cache._size == sum(s for _, s, _ in cache._entries())  # pylint: disable=protected-access
+
+
+def test_simplify_uses_the_cached_result(tmp_path):
+    document = docx.Document()
+    document.add_paragraph("Hello")
+    path = str(tmp_path / "hello.docx")
+    document.save(path)
+
+    cache = result_cache(str(tmp_path / "cache"))
+    first = cache.simplify(path)
+    assert first == simplify(docx.Document(path))
+    key = cache.key(path)
+    assert cache.get(key) == first
+
+    # A DIFFERENT OPTION SET HAS A DIFFERENT KEY
+    assert cache.key(path, {"friendly-names": False}) != key
+
+    # THE CACHED VALUE IS RETURNED WITHOUT SIMPLIFYING AGAIN
+    cache.put(key, {"TYPE": "document", "VALUE": ["cached"]})
+    assert cache.simplify(path) == {"TYPE": "document", "VALUE": ["cached"]}
+
+
+def test_corrupt_entries_are_removed(tmp_path):
+    cache = result_cache(str(tmp_path))
+    cache.put("a", {"TYPE": "document", "VALUE": []})
+    with open(cache._path("a"), "wb") as fh:  # pylint: disable=protected-access
+        fh.write(b"not gzip")
+    assert cache.get("a") is None
+    assert not cache._entries()  # pylint: disable=protected-access
+
+
+def _package(sub_styles=b"<styles/>", ink=b"<ink/>"):
+    """
+    A package whose document refers to a subDoc (with styles of its own) and
+    to an ink content part
+    """
+    source = io.BytesIO()
+    docx.Document().save(source)
+    out = io.BytesIO()
+    with zipfile.ZipFile(source) as zin, zipfile.ZipFile(out, "w") as zout:
+        for item in zin.infolist():
+            data = zin.read(item.filename)
+            if item.filename == "word/_rels/document.xml.rels":
+                data = data.replace(
+                    b"</Relationships>",
+                    (
+                        _REL % ("rIdSub", "subDocument", "sub.xml")
+                        + _REL % ("rIdInk", "customXml", "ink/ink1.xml")
+                        + "</Relationships>"
+                    ).encode("utf-8"),
+                )
+            zout.writestr(item, data)
+        zout.writestr("word/sub.xml", b"<document/>")
+        zout.writestr(
+            "word/_rels/sub.xml.rels", (_RELS % _REL % ("rId1", "styles", "subStyles.xml")).encode()
+        )
+        zout.writestr("word/subStyles.xml", sub_styles)
+        zout.writestr("word/ink/ink1.xml", ink)
+    return out.getvalue()
+
+
+def test_the_parts_of_related_documents_are_digested():
+    digest = package_digest(_package())
+    assert package_digest(_package()) == digest
+    # THE STYLES OF A SUBDOC
+    assert package_digest(_package(sub_styles=b"<styles><style/></styles>")) != digest
+    # A CONTENT PART
+    assert package_digest(_package(ink=b"<ink><trace/></ink>")) != digest
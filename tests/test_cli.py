@@ -0,0 +1,109 @@
+"""
+Tests for the command line interface
+"""
+import json
+import os
+
+import docx
+import pytest
+from simplify_docx import cli, simplify
+from simplify_docx.cli import MANIFEST, main
+
+
+def _save(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    doc = docx.Document()
+    doc.add_paragraph(text)
+    doc.save(path)
+    return path
+
+
+def test_json_output_mirrors_the_input_tree(tmp_path, capsys):
+    source = str(tmp_path / "in")
+    first = _save(os.path.join(source, "a.docx"), "a")
+    _save(os.path.join(source, "sub", "b.docx"), "b")
+    out = str(tmp_path / "out")
+
+    assert main([source, "-o", out]) == 0
+    with open(os.path.join(out, "a.json"), encoding="utf-8") as fh:
+        assert json.load(fh) == simplify(docx.Document(first))
+    assert os.path.exists(os.path.join(out, "sub", "b.json"))
+    assert os.path.exists(os.path.join(out, MANIFEST))
+    assert "2 converted, 0 up to date" in capsys.readouterr().err
+
+    # UNCHANGED DOCUMENTS ARE NOT CONVERTED AGAIN
+    assert main([source, "-o", out]) == 0
+    assert "0 converted, 2 up to date" in capsys.readouterr().err
+
+    # UNLESS THE OPTIONS CHANGE
+    assert main([source, "-o", out, "--options", '{"friendly-names": false}']) == 0
+    assert "2 converted, 0 up to date" in capsys.readouterr().err
+
+
+def test_jsonl_output(tmp_path, capsys):
+    paths = [_save(str(tmp_path / name), name) for name in ("a.docx", "b.docx")]
+    out = str(tmp_path / "out.jsonl")
+    assert main(paths + ["-f", "jsonl", "-o", out, "-j", "2"]) == 0
+    with open(out, encoding="utf-8") as fh:
+        lines = [json.loads(line) for line in fh]
+    assert [line["path"] for line in lines] == paths
+    assert lines[0]["document"] == simplify(docx.Document(paths[0]))
+    assert "2 converted" in capsys.readouterr().err
+
+
+def test_failures_are_reported(tmp_path, capsys):
+    bad = tmp_path / "bad.docx"
+    bad.write_bytes(b"not a docx")
+    assert main([str(bad), "-o", str(tmp_path / "out")]) == 1
+    err = capsys.readouterr().err
+    assert "failed to convert" in err and "1 failed" in err
+
+
+def test_unknown_options_are_rejected(tmp_path, capsys):
+    path = _save(str(tmp_path / "a.docx"), "a")
+    try:
+        main([path, "--options", '{"no-such-option": true}'])
+    except SystemExit as error:
+        assert error.code == 2
+    else:
+        raise AssertionError("expected the options to be rejected")
+    assert "no-such-option" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize(
+    "args, message",
+    [
+        (["-j", "0"], "--jobs"),
+        (["--jobs", "-2"], "--jobs"),
+        (["--chunksize", "0"], "--chunksize"),
+        (["--options", "{not json"], "not valid JSON"),
+        (["--options", "[1]"], "must be a JSON object"),
+        (["--options", "@no-such-file.json"], "cannot read --options"),
+    ],
+)
+def test_invalid_arguments_are_rejected(tmp_path, capsys, args, message):
+    path = _save(str(tmp_path / "a.docx"), "a")
+    with pytest.raises(SystemExit) as error:
+        main([path] + args)
+    assert error.value.code == 2
+    assert message in capsys.readouterr().err
+
+
+def test_sources_edited_during_the_run_are_converted_again(tmp_path, capsys, monkeypatch):
+    path = _save(str(tmp_path / "in" / "a.docx"), "before")
+    out = str(tmp_path / "out")
+
+    convert = cli.simplify_many
+
+    def simplify_many(*args, **kwargs):
+        for result in convert(*args, **kwargs):
+            _save(path, "edited while it was converted")
+            yield result
+
+    with monkeypatch.context() as patch:
+        patch.setattr(cli, "simplify_many", simplify_many)
+        assert main([path, "-o", out]) == 0
+    assert "1 converted" in capsys.readouterr().err
+
+    assert main([path, "-o", out]) == 0
+    assert "1 converted, 0 up to date" in capsys.readouterr().err
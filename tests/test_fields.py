@@ -0,0 +1,204 @@
+"""
+Tests for the assembly of complex fields and of the paragraphs they span
+"""
+import warnings
+
+import docx
+import pytest
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls
+
+from simplify_docx import iter_simplify_file, simplify
+
+BEGIN = '<w:r><w:fldChar w:fldCharType="begin"/></w:r>'
+SEPARATE = '<w:r><w:fldChar w:fldCharType="separate"/></w:r>'
+END = '<w:r><w:fldChar w:fldCharType="end"/></w:r>'
+
+
+def _form_field(ff_data, result):
+    """
+    The runs of a form field with the given ``w:ffData`` children
+    """
+    return [
+        '<w:r><w:fldChar w:fldCharType="begin"><w:ffData><w:name w:val="field"/>'
+        '<w:enabled/><w:calcOnExit w:val="0"/>%s</w:ffData></w:fldChar></w:r>' % ff_data,
+        _code("FORM"),
+        SEPARATE,
+        _text(result),
+        END,
+    ]
+
+
+def _text(text):
+    return '<w:r><w:t xml:space="preserve">%s</w:t></w:r>' % text
+
+
+def _code(code):
+    return '<w:r><w:instrText xml:space="preserve">%s</w:instrText></w:r>' % code
+
+
+def _document(*paragraphs):
+    """
+    A document with a paragraph of the given runs for each of ``paragraphs``
+    (or a table for each ``None``)
+    """
+    doc = docx.Document()
+    for runs in paragraphs:
+        if runs is None:
+            doc.add_table(rows=1, cols=1).cell(0, 0).text = "table"
+            continue
+        body = doc.element.body
+        body.insert(
+            len(body) - 1,
+            parse_xml("<w:p %s>%s</w:p>" % (nsdecls("w"), "".join(runs))),
+        )
+    return doc
+
+
+def _texts(JSON):
+    return [
+        "".join(elt["VALUE"] for elt in block["VALUE"] if elt["TYPE"] == "text")
+        if block["TYPE"] == "paragraph"
+        else block["TYPE"]
+        for block in JSON["VALUE"][0]["VALUE"]
+    ]
+
+
+def test_generic_fields_are_flattened():
+    doc = _document(
+        [_text("before "), BEGIN, _code("REF x"), SEPARATE, _text("result"), END, _text(" after")]
+    )
+    assert _texts(simplify(doc)) == ["before result after"]
+
+
+def test_nested_fields():
+    doc = _document(
+        [
+            # A FIELD NESTED IN THE CODES OF ANOTHER
+            BEGIN, _code("IF "), BEGIN, _code("REF x"), SEPARATE, _text("x"), END,
+            _code(' = 1 "yes"'), SEPARATE, _text("yes"), END,
+            _text(" / "),
+            # A FIELD NESTED IN THE RESULTS OF ANOTHER
+            BEGIN, SEPARATE, _text("a"), BEGIN, SEPARATE, _text("b"), END, _text("c"), END,
+        ]
+    )
+    assert _texts(simplify(doc)) == ["yes / abc"]
+
+
+def test_stray_field_characters_are_ignored():
+    doc = _document([END, _text("text"), SEPARATE])
+    with pytest.warns(UserWarning, match="outside of a field"):
+        assert _texts(simplify(doc)) == ["text"]
+
+
+def test_fields_spanning_paragraphs_are_merged():
+    doc = _document(
+        [_text("first "), BEGIN, SEPARATE, _text("one")],
+        [_text("two")],
+        [_text("three"), END, _text(" last")],
+        [_text("next")],
+    )
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert _texts(simplify(doc)) == ["first one\rtwo\rthree last", "next"]
+
+
+def test_fields_spanning_paragraphs_without_greedy_text_input():
+    doc = _document([_text("open "), BEGIN, SEPARATE, _text("one")], [_text("two"), END])
+    with pytest.warns(UserWarning) as record:
+        texts = _texts(simplify(doc, {"greedy-text-input": False}))
+    # THE FIELD IS DROPPED, AND ITS END IS OUTSIDE OF A FIELD
+    assert texts == ["open", "two"]
+    messages = [str(warning.message) for warning in record]
+    assert any("un-closed form-field" in message for message in messages)
+    assert any("outside of a field" in message for message in messages)
+
+
+def test_unclosed_fields_end_at_the_next_table():
+    doc = _document([_text("open "), BEGIN, SEPARATE, _text("one")], [_text("two")], None)
+    # THE INCOMPLETE FIELD IS DROPPED
+    with pytest.warns(UserWarning, match="followed by a table element"):
+        assert _texts(simplify(doc)) == ["open", "table"]
+
+
+def test_unclosed_fields_end_at_the_end_of_the_body():
+    doc = _document([_text("open "), BEGIN, SEPARATE, _text("one")])
+    with pytest.warns(UserWarning, match="end of its container"):
+        assert _texts(simplify(doc)) == ["open"]
+
+
+def test_moved_text_is_skipped():
+    doc = _document(
+        [
+            _text("kept "),
+            '<w:moveFromRangeStart w:id="1" w:name="move"/>',
+            _text("moved range "),
+            '<w:moveFromRangeEnd w:id="1"/>',
+            '<w:moveFrom w:id="2" w:author="a">%s</w:moveFrom>' % _text("moved"),
+            _text("text"),
+        ]
+    )
+    assert _texts(simplify(doc)) == ["kept text"]
+
+
+def test_streamed_files_keep_the_paragraphs_of_open_fields(tmp_path):
+    doc = _document(
+        [_text("first "), BEGIN, SEPARATE, _text("one")],
+        [_text("two"), END],
+        [_text("next")],
+    )
+    path = str(tmp_path / "fields.docx")
+    doc.save(path)
+    assert list(iter_simplify_file(path)) == simplify(docx.Document(path))["VALUE"][0]["VALUE"]
+    assert _texts(simplify(docx.Document(path))) == ["first one\rtwo", "next"]
+
+
+def _field(JSON):
+    return JSON["VALUE"][0]["VALUE"][0]["VALUE"][0]
+
+
+def test_checkbox():
+    doc = _document(_form_field('<w:checkBox><w:default w:val="1"/></w:checkBox>', ""))
+    assert _field(simplify(doc)) == {"TYPE": "check-box", "VALUE": True, "default": True}
+    doc = _document(
+        _form_field(
+            '<w:checkBox><w:default w:val="1"/><w:checked w:val="false"/></w:checkBox>', ""
+        )
+    )
+    assert _field(simplify(doc))["VALUE"] is False
+    assert _field(simplify(doc, {"checkbox-as-text": True})) == {
+        "TYPE": "text",
+        "VALUE": "[Checkbox:False]",
+        "fldCharType": "begin",
+    }
+
+
+def test_dropdown():
+    ff_data = (
+        '<w:ddList><w:result w:val="1"/><w:listEntry w:val=" one "/>'
+        '<w:listEntry w:val="two "/></w:ddList>'
+    )
+    doc = _document(_form_field(ff_data, "two"))
+    assert _field(simplify(doc)) == {
+        "TYPE": "drop-down",
+        "VALUE": "two",
+        "result": 1,
+        "options": ["one", "two"],
+    }
+    field = _field(simplify(doc, {"simplify-dropdown": False, "trim-dropdown-options": False}))
+    assert field["VALUE"] == "two "
+    assert field["ffData"] == {
+        "TYPE": "form-field-data",
+        "name": "field",
+        "enabled": True,
+        "calcOnExit": False,
+        "ddList": {"TYPE": "drop-down-data", "result": 1, "listEntry_lst": [" one ", "two "]},
+    }
+    assert field["fieldResults"] == [{"TYPE": "text", "VALUE": "two"}]
+
+
+def test_text_input():
+    doc = _document(
+        _form_field('<w:textInput><w:default w:val="value"/></w:textInput>', "entered")
+    )
+    assert _field(simplify(doc)) == {"TYPE": "text-input", "VALUE": "entered", "default": "value"}
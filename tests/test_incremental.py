@@ -0,0 +1,73 @@
+"""
+Tests for the incremental re-simplification of edited documents
+"""
+import docx
+from simplify_docx import Simplifier, simplify
+
+
+def _blocks(result):
+    return result.document["VALUE"][0]["VALUE"]
+
+
+def test_matches_simplify():
+    doc = docx.Document()
+    doc.add_paragraph("one")
+    doc.add_paragraph("")
+    doc.add_table(rows=2, cols=2).cell(0, 0).text = "cell"
+    options = {"ignore-empty-paragraphs": True}
+    assert Simplifier(options).simplify_incremental(doc).document == simplify(doc, options)
+
+
+def test_unchanged_blocks_are_reused():
+    doc = docx.Document()
+    doc.add_paragraph("one")
+    doc.add_paragraph("two")
+    simplifier = Simplifier()
+    first = simplifier.simplify_incremental(doc)
+    assert (first.reused, first.computed) == (0, 2)
+
+    doc.paragraphs[1].text = "changed"
+    doc.add_paragraph("three")
+    second = simplifier.simplify_incremental(doc, first)
+    assert (second.reused, second.computed) == (1, 2)
+    assert second.document == simplify(doc)
+
+
+def test_identical_blocks_are_copies():
+    doc = docx.Document()
+    doc.add_paragraph("same")
+    doc.add_paragraph("same")
+    result = Simplifier().simplify_incremental(doc)
+    blocks = _blocks(result)
+    assert result.reused == 1
+    assert blocks[0] == blocks[1] and blocks[0] is not blocks[1]
+    blocks[0]["VALUE"].clear()
+    assert blocks[1]["VALUE"]
+
+    again = _blocks(Simplifier().simplify_incremental(doc, result))
+    assert again[1]["VALUE"] and again[1] is not blocks[1]
+
+
+def test_changed_options_are_simplified_again():
+    doc = docx.Document()
+    doc.add_paragraph("one")
+    simplifier = Simplifier()
+    first = simplifier.simplify_incremental(doc)
+    second = Simplifier({"friendly-names": False}).simplify_incremental(doc, first)
+    assert (second.reused, second.computed) == (0, 1)
+
+
+def test_edited_related_parts_are_simplified_again(add_chunk):
+    main = docx.Document()
+    paragraph = main.add_paragraph("main")
+    chunk = add_chunk(main, "before", tag="w:contentPart")
+    # MOVE THE REFERENCE INTO A RUN OF THE PARAGRAPH
+    body = main.element.body
+    paragraph.add_run()._r.append(body[len(body) - 2])
+
+    simplifier = Simplifier()
+    first = simplifier.simplify_incremental(main)
+    chunk.paragraphs[0].text = "after"
+    second = simplifier.simplify_incremental(main, first)
+    assert (second.reused, second.computed) == (0, 1)
+    assert second.document == simplify(main)
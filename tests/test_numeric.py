@@ -0,0 +1,84 @@
+"""
+Tests for the extraction of the numbers in tables
+"""
+import docx
+import pytest
+
+from simplify_docx import Simplifier
+from simplify_docx.elements import body, document, table
+from simplify_docx.elements.table import plain_text_grid
+
+np = pytest.importorskip("numpy")
+from simplify_docx.numeric import numeric_tables, parse_numbers  # pylint: disable=wrong-import-position
+
+
+def test_parse_numbers():
+    values = parse_numbers(
+        ["1,234.5", "$(1,234)", "(12)", "45%", "(12.5 %)", "− 4", "€ 3", "abc", "", "((1))", "()", "1.2.3"]
+    )
+    expected = [1234.5, -1234, -12, 0.45, -0.125, -4, 3] + [np.nan] * 5
+    np.testing.assert_array_equal(values, expected)
+
+
+def _tricky_tables(doc):
+    # MERGED CELLS
+    merged = doc.add_table(rows=3, cols=3)
+    merged.cell(0, 0).merge(merged.cell(0, 1))
+    merged.cell(1, 2).merge(merged.cell(2, 2))
+    merged.cell(1, 2).text = "merged"
+    merged.cell(1, 0).text = "  padded  "
+    # PARAGRAPHS, EMPTY PARAGRAPHS AND RUNS
+    cell = merged.cell(2, 0)
+    cell.text = "first"
+    cell.add_paragraph("")
+    cell.add_paragraph("  ")
+    paragraph = cell.add_paragraph("sec")
+    paragraph.add_run("ond ‘quoted’")
+    # A TAB, WHICH IS NOT PLAIN TEXT
+    tab = doc.add_table(rows=1, cols=2)
+    tab.cell(0, 0).text = "a\tb"
+    # A NESTED TABLE
+    nested = doc.add_table(rows=1, cols=1)
+    nested.cell(0, 0).add_table(rows=1, cols=1).cell(0, 0).text = "inner"
+    # A LINE BREAK
+    run = doc.add_table(rows=1, cols=1).cell(0, 0).paragraphs[0].add_run("a")
+    run.add_break()
+    run.add_text("b")
+
+
+@pytest.mark.parametrize("ignore_empty", [True, False])
+def test_plain_text_grid_matches_simplified(ignore_empty):
+    doc = docx.Document()
+    _tricky_tables(doc)
+    simplifier = Simplifier({"table-as-grid": True, "ignore-empty-paragraphs": ignore_empty})
+    plain = []
+    for elt in document(doc.element, simplifier.session_iterators()):
+        if isinstance(elt, body):
+            for block in elt:
+                if isinstance(block, table):
+                    grid = plain_text_grid(block.fragment, simplifier.options)
+                    if grid is not None:
+                        JSON = block.to_json(doc, simplifier.options)
+                        assert grid == (JSON["VALUE"], JSON["cols"])
+                    plain.append(grid is not None)
+    assert plain == [True, False, False, False]
+
+
+def test_numeric_tables():
+    doc = docx.Document()
+    tbl = doc.add_table(rows=3, cols=3)
+    for r, row in enumerate([["", "2023", "2022"], ["Sales", "$1,234", "(5)"], ["Margin", "12%", "n/a"]]):
+        for c, text in enumerate(row):
+            tbl.cell(r, c).text = text
+    _tricky_tables(doc)
+
+    tables = numeric_tables(doc)
+    assert len(tables) == 5
+    first = tables[0]
+    assert first.header_rows == 1
+    assert first.header.tolist() == [["", "2023", "2022"]]
+    np.testing.assert_array_equal(first.data, [[np.nan, 1234, -5], [np.nan, 0.12, np.nan]])
+    assert tables[1].text[1, 2] == "merged" and tables[1].text[2, 2] == ""
+    assert tables[2].text.tolist() == [["a\tb", ""]]
+    assert tables[3].text.tolist() == [["inner"]]
+    assert tables[4].text.tolist() == [["a\rb"]]
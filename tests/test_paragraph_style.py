@@ -0,0 +1,70 @@
+"""
+Tests for the style and numbering lookups, which must follow edits to the
+styles and numbering parts between simplifications
+"""
+import docx
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls, qn
+
+from simplify_docx import simplify
+
+
+def _style(styleId, left):
+    return parse_xml(
+        '<w:style %s w:type="paragraph" w:styleId="%s"><w:name w:val="%s"/>'
+        '<w:pPr><w:ind w:left="%s"/></w:pPr></w:style>' % (nsdecls("w"), styleId, styleId, left)
+    )
+
+
+def _indents(doc):
+    return [
+        paragraph.get("style", {}).get("indent", {}).get("left")
+        for paragraph in simplify(doc)["VALUE"][0]["VALUE"]
+    ]
+
+
+def test_edited_styles_are_used():
+    doc = docx.Document()
+    styles = doc.styles.element
+    styles.append(_style("Indented", 720))
+    doc.add_paragraph("text", style="Indented")
+    assert _indents(doc) == [720]
+
+    # AN EDITED STYLE
+    styles[-1].find("%s/%s" % (qn("w:pPr"), qn("w:ind"))).set(qn("w:left"), "1440")
+    assert _indents(doc) == [1440]
+
+    # A REPLACED STYLE
+    styles.remove(styles[-1])
+    styles.append(_style("Indented", 360))
+    assert _indents(doc) == [360]
+
+    # A NEW STYLE
+    styles.append(_style("Other", 180))
+    doc.add_paragraph("other").style = "Other"
+    assert _indents(doc) == [360, 180]
+
+    # A REMOVED STYLE
+    styles.remove(styles[-1])
+    assert _indents(doc) == [360, None]
+
+
+def test_edited_numbering_is_used():
+    doc = docx.Document()
+    doc.add_paragraph("item", style="List Number")
+    before = _indents(doc)
+    assert before[0] is not None
+
+    # A LEVEL OVERRIDE OF THE PARAGRAPH'S NUMBERING INSTANCE
+    numbering = doc.part.numbering_part.element
+    num = [num for num in numbering.iterchildren(qn("w:num")) if num.get(qn("w:numId")) == "5"][0]
+    num.append(
+        parse_xml(
+            '<w:lvlOverride %s w:ilvl="0"><w:lvl w:ilvl="0"><w:pPr><w:ind w:left="2880"/>'
+            "</w:pPr></w:lvl></w:lvlOverride>" % nsdecls("w")
+        )
+    )
+    assert _indents(doc) == [2880]
+
+    num.remove(num[-1])
+    assert _indents(doc) == before
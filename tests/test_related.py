@@ -0,0 +1,82 @@
+"""
+Tests for the simplification of related parts (altChunks)
+"""
+import warnings
+
+import docx
+from simplify_docx import simplify, Simplifier, get_simplifier
+
+
+def _chunks(JSON):
+    return [
+        block["VALUE"]["VALUE"][0]["VALUE"][0]["VALUE"]
+        for block in JSON["VALUE"][0]["VALUE"]
+        if block["TYPE"] == "nested-file"
+    ]
+
+
+def test_alt_chunks_are_simplified(add_chunk):
+    main = docx.Document()
+    main.add_paragraph("main")
+    for text in ("a", "b", "a"):
+        add_chunk(main, text)
+    assert [chunk[0]["VALUE"] for chunk in _chunks(simplify(main))] == ["a", "b", "a"]
+
+
+def test_identical_parts_are_memoized_per_simplifier(add_chunk):
+    main = docx.Document()
+    for text in ("a", "b", "a", "a"):
+        add_chunk(main, text)
+    simplifier = Simplifier()
+    first = simplifier.simplify(main)
+    assert len(simplifier.related_parts.memo) == 2
+    # EACH REFERENCE GETS ITS OWN COPY
+    chunks = first["VALUE"][0]["VALUE"]
+    assert chunks[0] == chunks[2] and chunks[0] is not chunks[2]
+    assert chunks[0]["VALUE"] is not chunks[2]["VALUE"]
+    # A NEW SIMPLIFIER DOES NOT SHARE THE MEMO
+    assert len(Simplifier().related_parts.memo) == 0
+
+
+def test_module_functions_share_a_simplifier_per_option_set(add_chunk):
+    main = docx.Document()
+    add_chunk(main, "a")
+    options = {"dumb-quotes": False, "friendly-names": True}
+    simplify(main, options)
+    simplifier = get_simplifier({"friendly-names": True, "dumb-quotes": False})
+    assert len(simplifier.related_parts.memo) == 1
+    assert get_simplifier(options) is simplifier
+    assert get_simplifier({"dumb-quotes": True}) is not simplifier
+
+
+def test_edited_parts_are_simplified_again(add_chunk):
+    main = docx.Document()
+    chunk = add_chunk(main, "before")
+    simplifier = Simplifier()
+    assert _chunks(simplifier.simplify(main))[0][0]["VALUE"] == "before"
+    chunk.paragraphs[0].text = "after"
+    assert _chunks(simplifier.simplify(main))[0][0]["VALUE"] == "after"
+
+
+def test_worker_pool_matches_in_process(add_chunk):
+    main = docx.Document()
+    main.add_paragraph("main")
+    for text in ("a", "b", "a", "c"):
+        add_chunk(main, text)
+    # A PART WITH A PART OF ITS OWN IS SIMPLIFIED IN THE CALLING PROCESS
+    outer = docx.Document()
+    outer.add_paragraph("outer")
+    add_chunk(outer, "inner")
+    add_chunk(main, chunk=outer)
+
+    expected = simplify(main)
+    with Simplifier({"related-parts-workers": 2}) as simplifier:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            assert simplifier.simplify(main) == expected
+        executor = simplifier.related_parts._executor  # pylint: disable=protected-access
+        assert executor is not None
+        # THE POOL IS SHARED BY THE SIMPLIFICATIONS OF THE SIMPLIFIER
+        assert simplifier.simplify(main) == expected
+        assert simplifier.related_parts._executor is executor  # pylint: disable=protected-access
+    assert simplifier.related_parts._executor is None  # pylint: disable=protected-access
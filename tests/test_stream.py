@@ -0,0 +1,129 @@
+"""
+Tests for the streaming and JSON Lines output
+"""
+import io
+import json
+import warnings
+
+import docx
+import pytest
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.opc.packuri import PackURI
+from docx.opc.part import Part
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls
+from docx.opc.oxml import serialize_part_xml
+from simplify_docx import (
+    get_simplifier,
+    iter_simplify,
+    iter_simplify_file,
+    simplify,
+    simplify_to_jsonl,
+    simplify_to_stream,
+)
+
+
+@pytest.fixture
+def sample(tmp_path):
+    doc = docx.Document()
+    doc.add_paragraph("one")
+    doc.add_paragraph("")
+    table = doc.add_table(rows=2, cols=2)
+    table.cell(0, 0).text = "cell"
+    doc.add_paragraph("two ‘quoted’")
+    path = str(tmp_path / "sample.docx")
+    doc.save(path)
+    return path
+
+
+def _body(JSON):
+    return JSON["VALUE"][0]["VALUE"]
+
+
+def test_iter_simplify_matches_simplify(sample):
+    doc = docx.Document(sample)
+    assert list(iter_simplify(doc)) == _body(simplify(doc))
+    assert list(iter_simplify_file(sample)) == _body(simplify(doc))
+    with open(sample, "rb") as fh:
+        assert list(iter_simplify_file(fh)) == _body(simplify(doc))
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test_simplify_to_stream_matches_simplify(sample, indent):
+    doc = docx.Document(sample)
+    expected = simplify(doc)
+    for source in (doc, sample):
+        fp = io.StringIO()
+        simplify_to_stream(source, fp, indent=indent)
+        assert json.loads(fp.getvalue()) == expected
+        if indent is not None:
+            assert fp.getvalue() == json.dumps(expected, indent=indent)
+
+
+def test_simplify_to_jsonl(sample):
+    doc = docx.Document(sample)
+    expected = _body(simplify(doc))
+    for source in (doc, sample):
+        fp = io.StringIO()
+        assert simplify_to_jsonl(source, fp) == len(expected)
+        lines = fp.getvalue().splitlines()
+        assert [json.loads(line) for line in lines] == expected
+
+
+def test_options_are_applied_to_files(sample):
+    options = {"ignore-empty-paragraphs": False, "friendly-names": False}
+    expected = _body(simplify(docx.Document(sample), options))
+    assert list(iter_simplify_file(sample, options)) == expected
+    assert len(expected) == len(_body(simplify(docx.Document(sample)))) + 1
+
+
+@pytest.fixture
+def chunked(tmp_path):
+    """
+    A document with a moved block and an altChunk whose part is a document
+    """
+    doc = docx.Document()
+    doc.add_paragraph("before")
+    doc.add_paragraph("after")
+    chunk = docx.Document()
+    chunk.add_paragraph("chunk")
+    part = Part(
+        PackURI("/word/chunk.xml"),
+        "application/xml",
+        serialize_part_xml(chunk.element),
+        doc.part.package,
+    )
+    rId = doc.part.relate_to(part, RT.A_F_CHUNK)
+    body = doc.element.body
+    for position, xml in enumerate((
+        '<w:moveFromRangeStart %s w:id="7" w:name="move"/>' % nsdecls("w"),
+        "<w:p %s><w:r><w:t>moved away</w:t></w:r></w:p>" % nsdecls("w"),
+        '<w:moveFromRangeEnd %s w:id="7"/>' % nsdecls("w"),
+        '<w:altChunk %s r:id="%s"/>' % (nsdecls("w", "r"), rId),
+    )):
+        # AFTER THE FIRST PARAGRAPH
+        body.insert(1 + position, parse_xml(xml))
+    path = str(tmp_path / "chunked.docx")
+    doc.save(path)
+    return path
+
+
+def _texts(blocks):
+    return [
+        block["VALUE"]["VALUE"][0]["VALUE"][0]["VALUE"][0]["VALUE"]
+        if block["TYPE"] == "nested-file"
+        else block["VALUE"][0]["VALUE"]
+        for block in blocks
+    ]
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_streamed_files_with_related_parts(chunked, workers):
+    options = {"related-parts-workers": workers}
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            blocks = list(iter_simplify_file(chunked, options))
+    finally:
+        get_simplifier(options).close()
+    assert _texts(blocks) == ["before", "chunk", "after"]
@@ -0,0 +1,176 @@
+"""
+Tests for the simplification of tables as grids
+"""
+import docx
+import pytest
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls
+from simplify_docx import Simplifier, simplify
+from simplify_docx.elements import body, document, table
+from simplify_docx.elements.table import plain_text_grid
+
+
+def _table(JSON):
+    return JSON["VALUE"][0]["VALUE"][0]
+
+
+def test_table_as_grid():
+    doc = docx.Document()
+    table = doc.add_table(rows=3, cols=3)
+    for r in range(3):
+        for c in range(3):
+            table.cell(r, c).text = "%d%d" % (r, c)
+    table.cell(0, 0).merge(table.cell(0, 1))
+    table.cell(1, 2).merge(table.cell(2, 2))
+    table.cell(2, 0).add_paragraph("second line")
+
+    grid = _table(simplify(doc, {"table-as-grid": True}))
+    assert (grid["rows"], grid["cols"]) == (3, 3)
+    assert grid["VALUE"] == [
+        ["00\n01", None, "02"],
+        ["10", "11", "12\n22"],
+        ["20\nsecond line", "21", None],
+    ]
+    assert sorted(grid["spans"]) == [[0, 0, 1, 2], [1, 2, 2, 1]]
+
+
+def test_nested_tables_are_text():
+    doc = docx.Document()
+    cell = doc.add_table(rows=1, cols=1).cell(0, 0)
+    cell.text = "outer"
+    inner = cell.add_table(rows=2, cols=2)
+    inner.cell(0, 0).text = "a"
+    inner.cell(1, 1).text = "b"
+    grid = _table(simplify(doc, {"table-as-grid": True}))
+    assert grid["VALUE"] == [["outer\na\t\n\tb"]]
+
+
+def test_nested_json_by_default():
+    doc = docx.Document()
+    doc.add_table(rows=1, cols=2).cell(0, 1).text = "x"
+    table = _table(simplify(doc))
+    assert [[cell["TYPE"] for cell in row["VALUE"]] for row in table["VALUE"]] == [
+        ["table-cell", "table-cell"]
+    ]
+    assert "rows" not in table
+
+
+def _cell(*paragraphs, tcPr=""):
+    return "<w:tc><w:tcPr>%s</w:tcPr>%s</w:tc>" % (
+        tcPr,
+        "".join("<w:p>%s</w:p>" % paragraph for paragraph in paragraphs) or "<w:p/>",
+    )
+
+
+def _run(text, rPr=""):
+    return '<w:r>%s<w:t xml:space="preserve">%s</w:t></w:r>' % (rPr, text)
+
+
+# ROWS OF CELLS WHICH HOLD NOTHING BUT PLAIN TEXT
+__plain_tables__ = [
+    # EMPTY CELLS, EMPTY PARAGRAPHS AND WHITE SPACE
+    [
+        "<w:tr>%s%s</w:tr>" % (_cell(), _cell(_run("  padded  "), "", _run("   "))),
+        "<w:tr>%s%s</w:tr>" % (_cell(_run("a ") + _run(" b")), _cell("", "")),
+    ],
+    # MERGED CELLS, WITH TEXT IN THE CONTINUED CELL, AND GRID BEFORE A ROW
+    [
+        "<w:tr>%s%s</w:tr>"
+        % (
+            _cell(_run("wide"), tcPr='<w:gridSpan w:val="2"/>'),
+            _cell(_run("tall"), tcPr='<w:vMerge w:val="restart"/>'),
+        ),
+        '<w:tr><w:trPr><w:gridBefore w:val="1"/></w:trPr>%s%s</w:tr>'
+        % (_cell(_run("after")), _cell(_run("more"), tcPr="<w:vMerge/>")),
+        "<w:tr>%s</w:tr>" % _cell(_run("short")),
+    ],
+    # FORMATTING, BOOKMARKS, PROOFING MARKS AND SPECIAL CHARACTERS
+    [
+        "<w:tr>%s%s</w:tr>"
+        % (
+            _cell(
+                '<w:pPr><w:jc w:val="center"/></w:pPr>'
+                + _run("bold", "<w:rPr><w:b/></w:rPr>")
+                + '<w:bookmarkStart w:id="0" w:name="mark"/>'
+                + _run(" ‘quoted’ “double”")
+                + '<w:bookmarkEnd w:id="0"/>'
+            ),
+            _cell(
+                '<w:proofErr w:type="spellStart"/>'
+                + _run("1 234 – 5‍6")
+                + '<w:proofErr w:type="spellEnd"/>',
+                _run("many    inner spaces ﬁ"),
+            ),
+        ),
+    ],
+]
+
+# ROWS OF CELLS WHICH DO NOT HOLD PLAIN TEXT
+__other_tables__ = [
+    ["<w:tr>%s</w:tr>" % _cell("<w:r><w:t>a</w:t><w:tab/><w:t>b</w:t></w:r>")],
+    ["<w:tr>%s</w:tr>" % _cell('<w:hyperlink w:anchor="x">%s</w:hyperlink>' % _run("link"))],
+    ["<w:tr>%s</w:tr>" % _cell('<w:fldSimple w:instr="PAGE">%s</w:fldSimple>' % _run("1"))],
+]
+
+
+def _tables(rows_list):
+    doc = docx.Document()
+    body = doc.element.body
+    for rows in rows_list:
+        body.insert(
+            len(body) - 1,
+            parse_xml(
+                "<w:tbl %s><w:tblPr/><w:tblGrid>%s</w:tblGrid>%s</w:tbl>"
+                % (nsdecls("w"), "<w:gridCol/>" * 3, "".join(rows))
+            ),
+        )
+    return doc
+
+
+def _grids(doc, options):
+    simplifier = Simplifier(dict(options, **{"table-as-grid": True}))
+    for elt in document(doc.element, simplifier.session_iterators()):
+        if isinstance(elt, body):
+            for block in elt:
+                if isinstance(block, table):
+                    JSON = block.to_json(doc, simplifier.options)
+                    yield (
+                        plain_text_grid(block.fragment, simplifier.options),
+                        (JSON["VALUE"], JSON["cols"]),
+                    )
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"ignore-empty-paragraphs": False},
+        {"friendly-names": False},
+        {"dumb-quotes": False, "dumb-hyphens": False, "dumb-spaces": False},
+        {"ignore-joiners": False},
+        {"flatten-inner-spaces": True},
+        {"normalize-nfkc": True},
+    ],
+)
+def test_plain_text_grid_matches_simplified(options):
+    doc = _tables(__plain_tables__ + __other_tables__)
+    grids = list(_grids(doc, options))
+    assert len(grids) == len(__plain_tables__) + len(__other_tables__)
+    for plain, simplified in grids[: len(__plain_tables__)]:
+        assert plain == simplified
+    for plain, _ in grids[len(__plain_tables__) :]:
+        assert plain is None
+
+
+@pytest.mark.parametrize(
+    "name",
+    [
+        "ignore-empty-text",
+        "merge-consecutive-text",
+        "remove-leading-white-space",
+        "remove-trailing-white-space",
+    ],
+)
+def test_plain_text_grid_declines_other_text_options(name):
+    for plain, _ in _grids(_tables(__plain_tables__), {name: False}):
+        assert plain is None
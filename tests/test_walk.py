@@ -0,0 +1,91 @@
+"""
+Tests for walk(), walk_many() and document_index
+"""
+from simplify_docx import walk, walk_many, document_index
+
+MIXED = {
+    "TYPE": "document",
+    "VALUE": [
+        {
+            "TYPE": "body",
+            "VALUE": [
+                {"TYPE": "paragraph", "VALUE": [{"TYPE": "text", "VALUE": "a"}]},
+                # A LIST WHOSE FIRST ITEM IS NOT AN ELEMENT IS NOT WALKED
+                {"TYPE": "mixed", "VALUE": ["x", {"TYPE": "text", "VALUE": "b"}]},
+                # NOR IS A LIST WHOSE FIRST ITEM IS A DICT WITHOUT A TYPE
+                {"TYPE": "untyped", "VALUE": [{"a": 1}, {"TYPE": "text", "VALUE": "c"}]},
+                # A DICT VALUE IS WALKED IF ITS PARENT HAS A TYPE
+                {"TYPE": "wrapper", "VALUE": {"TYPE": "text", "VALUE": "d"}},
+                {"VALUE": {"TYPE": "text", "VALUE": "e"}},
+                # ITEMS WHICH ARE NOT DICTS ARE SKIPPED
+                {"TYPE": "list", "VALUE": [{"TYPE": "text", "VALUE": "f"}, "g"]},
+            ],
+        }
+    ],
+}
+
+
+def _visits(document, **kwargs):
+    nodes = []
+    walk(document, lambda node, parent, position: nodes.append((id(node), id(parent), position)), TYPE=None, **kwargs)
+    return nodes
+
+
+def test_index_visits_the_same_nodes_as_walk():
+    index = document_index(MIXED)
+    assert _visits(MIXED, index=index) == _visits(MIXED)
+    assert [entry.node for entry in index.entries] == [
+        node for node in _walked(MIXED)
+    ]
+
+
+def test_index_visits_the_same_nodes_with_no_iter():
+    index = document_index(MIXED)
+    for no_iter in (["paragraph"], ["body"], ["list", "wrapper"]):
+        assert _visits(MIXED, index=index, no_iter=no_iter) == _visits(
+            MIXED, no_iter=no_iter
+        )
+
+
+def test_index_finds_types_like_walk():
+    index = document_index(MIXED)
+    texts = []
+    walk(MIXED, lambda node: texts.append(node["VALUE"]), TYPE="text")
+    assert [node["VALUE"] for node in index.find("text")] == texts == ["a", "d", "f"]
+
+
+def test_walk_accepts_unhashable_callables():
+    class visitor:
+        __hash__ = None  # type: ignore
+
+        def __init__(self):
+            self.count = 0
+
+        def __call__(self, node):
+            self.count += 1
+
+    fun = visitor()
+    walk(MIXED, fun, TYPE=None)
+    walked = len(list(_walked(MIXED)))
+    assert fun.count == walked
+    walk_many(MIXED, {None: fun})
+    assert fun.count == 2 * walked
+
+
+def test_walk_many_matches_separate_walks():
+    counts = {}
+
+    def count(node):
+        counts[node["TYPE"]] = counts.get(node["TYPE"], 0) + 1
+
+    results = walk_many(
+        MIXED, {"text": [count, lambda node: node["VALUE"] if node["VALUE"] == "d" else None]}
+    )
+    assert counts == {"text": 3}
+    assert results == {"text": [None, "d"]}
+
+
+def _walked(document):
+    nodes = []
+    walk(document, nodes.append, TYPE=None)
+    return nodes